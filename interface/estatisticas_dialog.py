@@ -0,0 +1,149 @@
+"""
+Diálogo de estatísticas de uso (Pedido por setor e itens mais solicitados).
+"""
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QComboBox, QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PySide6.QtCore import Qt
+from service.config_service import ConfigService
+from service.estatisticas_service import EstatisticasService
+from .tarefas import executar_em_segundo_plano
+
+
+class EstatisticasDialog(QDialog):
+    """Exibe os agregados de uso, sem abrir as planilhas."""
+
+    TODO_PERIODO = "Todo o período"
+
+    def __init__(self, config_service: ConfigService, estatisticas: EstatisticasService, parent=None):
+        super().__init__(parent)
+        self.config_service = config_service
+        self.estatisticas = estatisticas
+        self.init_ui()
+        self.carregar_meses()
+
+    def init_ui(self):
+        """Inicializa a interface do diálogo."""
+        self.setWindowTitle("Estatísticas")
+        self.setFixedSize(650, 480)
+        self.setModal(True)
+
+        layout = QVBoxLayout()
+        layout.setSpacing(12)
+        layout.setContentsMargins(30, 25, 30, 25)
+
+        # Título e período
+        topo_layout = QHBoxLayout()
+        titulo = QLabel("Estatísticas de Uso")
+        titulo.setObjectName("dialogTitle")
+        topo_layout.addWidget(titulo)
+        topo_layout.addStretch()
+
+        self.combo_mes = QComboBox()
+        self.combo_mes.setFixedWidth(160)
+        self.combo_mes.currentIndexChanged.connect(self.atualizar_tabelas)
+        topo_layout.addWidget(self.combo_mes)
+        layout.addLayout(topo_layout)
+
+        self.total_label = QLabel("")
+        self.total_label.setStyleSheet("color: #666666; font-size: 12px;")
+        layout.addWidget(self.total_label)
+
+        # Tabelas lado a lado
+        tabelas_layout = QHBoxLayout()
+        tabelas_layout.setSpacing(15)
+
+        self.tabela_setores = self._criar_tabela(["Setor", "Pedido"])
+        tabelas_layout.addWidget(self.tabela_setores)
+
+        self.tabela_itens = self._criar_tabela(["Item", "Quantidade"])
+        tabelas_layout.addWidget(self.tabela_itens)
+
+        layout.addLayout(tabelas_layout)
+
+        # Botões de ação
+        botoes_layout = QHBoxLayout()
+
+        self.btn_recalcular = QPushButton("Recalcular das Pastas")
+        self.btn_recalcular.setMinimumHeight(38)
+        self.btn_recalcular.setToolTip("Relê todas as Pedido das pastas do histórico (pode demorar)")
+        self.btn_recalcular.clicked.connect(self.recalcular)
+        botoes_layout.addWidget(self.btn_recalcular)
+
+        botoes_layout.addStretch()
+
+        btn_fechar = QPushButton("Fechar")
+        btn_fechar.setObjectName("primaryButton")
+        btn_fechar.setFixedWidth(110)
+        btn_fechar.setMinimumHeight(38)
+        btn_fechar.clicked.connect(self.accept)
+        botoes_layout.addWidget(btn_fechar)
+
+        layout.addLayout(botoes_layout)
+        self.setLayout(layout)
+
+    def _criar_tabela(self, colunas: list) -> QTableWidget:
+        """Cria uma tabela somente leitura."""
+        tabela = QTableWidget(0, len(colunas))
+        tabela.setHorizontalHeaderLabels(colunas)
+        tabela.verticalHeader().setVisible(False)
+        tabela.setEditTriggers(QTableWidget.NoEditTriggers)
+        tabela.setSelectionMode(QTableWidget.NoSelection)
+        tabela.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        tabela.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        return tabela
+
+    def carregar_meses(self):
+        """Preenche a seleção de período."""
+        self.combo_mes.blockSignals(True)
+        self.combo_mes.clear()
+        self.combo_mes.addItem(self.TODO_PERIODO, None)
+        for mes in self.estatisticas.meses():
+            ano, numero = mes.split('-')
+            self.combo_mes.addItem(f"{numero}/{ano}", mes)
+        self.combo_mes.blockSignals(False)
+        self.atualizar_tabelas()
+
+    def _preencher(self, tabela: QTableWidget, linhas: list):
+        """Preenche uma tabela com pares (texto, valor)."""
+        tabela.setRowCount(len(linhas))
+        for i, (texto, valor) in enumerate(linhas):
+            tabela.setItem(i, 0, QTableWidgetItem(texto or "(sem setor)"))
+            valor_item = QTableWidgetItem(f"{valor:g}")
+            valor_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            tabela.setItem(i, 1, valor_item)
+
+    def atualizar_tabelas(self):
+        """Exibe os agregados do período selecionado."""
+        mes = self.combo_mes.currentData()
+        self.total_label.setText(f"Total de Pedido: {self.estatisticas.total(mes)}")
+        self._preencher(self.tabela_setores, self.estatisticas.pedidos_por_setor(mes))
+        self._preencher(self.tabela_itens, self.estatisticas.itens_mais_solicitados(mes, limite=20))
+
+    def recalcular(self):
+        """Reconstrói os agregados a partir das pastas do histórico."""
+        self.btn_recalcular.setEnabled(False)
+        self.total_label.setText("Recalculando...")
+        executar_em_segundo_plano(
+            self,
+            self._reconstruir,
+            self._recalculo_concluido,
+            self.config_service.obter_config('ultima_pasta', ''),
+            self.config_service.obter_planilha_padrao(),
+            ao_falhar=lambda erro: self._recalculo_concluido((False, erro))
+        )
+
+    def _reconstruir(self, ultima_pasta: str, planilha_padrao: str) -> tuple:
+        """Reúne as pastas do histórico e reconstrói os agregados (em segundo plano)."""
+        pastas = {pasta for _, pasta, _, _ in self.config_service.iterar_historico_completo()}
+        pastas.add(ultima_pasta)
+        return self.estatisticas.reconstruir(pastas, planilha_padrao=planilha_padrao)
+
+    def _recalculo_concluido(self, resultado):
+        """Atualiza a exibição após a reconstrução."""
+        _, mensagem = resultado
+        self.btn_recalcular.setEnabled(True)
+        self.carregar_meses()
+        self.total_label.setText(f"{self.total_label.text()}  —  {mensagem}")
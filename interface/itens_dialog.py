@@ -0,0 +1,235 @@
+"""
+Diálogo de seleção de itens do catálogo para a Pedido em criação.
+"""
+
+import os
+import time
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit,
+    QListWidget, QListWidgetItem, QDoubleSpinBox, QTableWidget,
+    QTableWidgetItem, QHeaderView, QFileDialog
+)
+from PySide6.QtCore import Qt
+from service.config_service import ConfigService
+from service.catalogo_service import CatalogoService
+from .tarefas import executar_em_segundo_plano
+
+
+class ItensDialog(QDialog):
+    """Busca no catálogo e monta a lista de itens da Pedido."""
+
+    def __init__(self, config_service: ConfigService, catalogo: CatalogoService, itens: list, parent=None):
+        """
+        Args:
+            config_service: Serviço de configuração (arquivo do catálogo)
+            catalogo: Catálogo de itens
+            itens: Itens já selecionados, como (descricao, unidade, quantidade)
+        """
+        super().__init__(parent)
+        self.config_service = config_service
+        self.catalogo = catalogo
+        self.itens = list(itens)
+        self.init_ui()
+        self.atualizar_tabela()
+        self.atualizar_catalogo()
+
+    def init_ui(self):
+        """Inicializa a interface do diálogo."""
+        self.setWindowTitle("Itens da Pedido")
+        self.setFixedSize(680, 520)
+        self.setModal(True)
+
+        layout = QVBoxLayout()
+        layout.setSpacing(10)
+        layout.setContentsMargins(25, 20, 25, 20)
+
+        titulo = QLabel("Itens da Pedido")
+        titulo.setObjectName("dialogTitle")
+        layout.addWidget(titulo)
+
+        # Catálogo
+        catalogo_layout = QHBoxLayout()
+        self.catalogo_label = QLabel("")
+        self.catalogo_label.setStyleSheet("color: #666666; font-size: 12px;")
+        catalogo_layout.addWidget(self.catalogo_label, 1)
+
+        self.btn_importar = QPushButton("Importar Catálogo")
+        self.btn_importar.setObjectName("selectButton")
+        self.btn_importar.setFixedHeight(30)
+        self.btn_importar.setToolTip("Planilha (.xlsx) ou CSV com código, descrição e unidade")
+        self.btn_importar.clicked.connect(self.importar_catalogo)
+        catalogo_layout.addWidget(self.btn_importar)
+        layout.addLayout(catalogo_layout)
+
+        # Busca
+        self.busca_input = QLineEdit()
+        self.busca_input.setObjectName("inputField")
+        self.busca_input.setPlaceholderText("Código ou descrição (ex.: luva nitr)...")
+        self.busca_input.setFixedHeight(32)
+        self.busca_input.textChanged.connect(self.buscar)
+        self.busca_input.returnPressed.connect(self.adicionar)
+        layout.addWidget(self.busca_input)
+
+        self.lista_resultados = QListWidget()
+        self.lista_resultados.setFixedHeight(140)
+        self.lista_resultados.itemDoubleClicked.connect(lambda _: self.adicionar())
+        layout.addWidget(self.lista_resultados)
+
+        adicionar_layout = QHBoxLayout()
+        self.tempo_label = QLabel("")
+        self.tempo_label.setStyleSheet("color: #888888; font-size: 11px;")
+        adicionar_layout.addWidget(self.tempo_label, 1)
+
+        adicionar_layout.addWidget(QLabel("Quantidade"))
+        self.quantidade_input = QDoubleSpinBox()
+        self.quantidade_input.setDecimals(2)
+        self.quantidade_input.setRange(0.01, 999999)
+        self.quantidade_input.setValue(1)
+        self.quantidade_input.setFixedWidth(100)
+        adicionar_layout.addWidget(self.quantidade_input)
+
+        btn_adicionar = QPushButton("Adicionar")
+        btn_adicionar.setFixedHeight(30)
+        btn_adicionar.clicked.connect(self.adicionar)
+        adicionar_layout.addWidget(btn_adicionar)
+        layout.addLayout(adicionar_layout)
+
+        # Itens selecionados
+        self.tabela = QTableWidget(0, 3)
+        self.tabela.setHorizontalHeaderLabels(["Descrição", "Unid.", "Qtd."])
+        self.tabela.verticalHeader().setVisible(False)
+        self.tabela.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tabela.setSelectionBehavior(QTableWidget.SelectRows)
+        self.tabela.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.tabela)
+
+        # Botões de ação
+        botoes_layout = QHBoxLayout()
+
+        btn_remover = QPushButton("Remover")
+        btn_remover.setMinimumHeight(36)
+        btn_remover.clicked.connect(self.remover)
+        botoes_layout.addWidget(btn_remover)
+
+        btn_limpar = QPushButton("Limpar")
+        btn_limpar.setMinimumHeight(36)
+        btn_limpar.clicked.connect(self.limpar)
+        botoes_layout.addWidget(btn_limpar)
+
+        botoes_layout.addStretch()
+
+        btn_concluir = QPushButton("Concluir")
+        btn_concluir.setObjectName("primaryButton")
+        btn_concluir.setFixedWidth(110)
+        btn_concluir.setMinimumHeight(36)
+        btn_concluir.clicked.connect(self.accept)
+        botoes_layout.addWidget(btn_concluir)
+
+        layout.addLayout(botoes_layout)
+        self.setLayout(layout)
+
+    def _exibir_situacao_catalogo(self, mensagem: str = ""):
+        """Mostra o arquivo e o tamanho do catálogo."""
+        total = self.catalogo.total()
+        if total:
+            origem = os.path.basename(self.catalogo.arquivo_origem() or '')
+            texto = f"Catálogo: {origem} ({total} itens)"
+        else:
+            texto = "Nenhum catálogo importado"
+        if mensagem:
+            texto += f" — {mensagem}"
+        self.catalogo_label.setText(texto)
+
+    def atualizar_catalogo(self):
+        """Reimporta o catálogo em segundo plano se o arquivo tiver mudado."""
+        arquivo = self.config_service.obter_config('catalogo_arquivo', '')
+        self._exibir_situacao_catalogo()
+        if not arquivo or not os.path.exists(arquivo):
+            return
+
+        self.btn_importar.setEnabled(False)
+        executar_em_segundo_plano(
+            self,
+            self.catalogo.atualizar,
+            self._catalogo_atualizado,
+            arquivo,
+            ao_falhar=lambda erro: self._catalogo_atualizado((False, erro))
+        )
+
+    def _catalogo_atualizado(self, resultado):
+        """Atualiza a situação após a importação."""
+        sucesso, mensagem = resultado
+        self.btn_importar.setEnabled(True)
+        self._exibir_situacao_catalogo("" if sucesso else mensagem)
+        if self.busca_input.text():
+            self.buscar()
+
+    def importar_catalogo(self):
+        """Seleciona e importa um novo arquivo de catálogo."""
+        arquivo, _ = QFileDialog.getOpenFileName(
+            self,
+            "Selecionar Catálogo de Itens",
+            "",
+            "Catálogo (*.xlsx *.csv)"
+        )
+        if arquivo:
+            self.config_service.definir_config('catalogo_arquivo', arquivo)
+            self.atualizar_catalogo()
+
+    def buscar(self):
+        """Busca no catálogo a cada tecla digitada."""
+        inicio = time.perf_counter()
+        resultados = self.catalogo.buscar(self.busca_input.text())
+        duracao = (time.perf_counter() - inicio) * 1000
+
+        self.lista_resultados.clear()
+        for codigo, descricao, unidade in resultados:
+            texto = f"{codigo}  —  {descricao}" + (f"  ({unidade})" if unidade else "")
+            item = QListWidgetItem(texto)
+            item.setData(Qt.UserRole, (descricao, unidade))
+            self.lista_resultados.addItem(item)
+        if resultados:
+            self.lista_resultados.setCurrentRow(0)
+
+        self.tempo_label.setText(f"{len(resultados)} resultado(s) em {duracao:.1f} ms" if self.busca_input.text() else "")
+
+    def adicionar(self):
+        """Adiciona o resultado selecionado à Pedido (somando se já estiver na lista)."""
+        item = self.lista_resultados.currentItem()
+        if item is None or item.data(Qt.UserRole) is None:
+            return
+
+        descricao, unidade = item.data(Qt.UserRole)
+        quantidade = self.quantidade_input.value()
+        for i, (d, u, q) in enumerate(self.itens):
+            if d == descricao:
+                self.itens[i] = (d, u, q + quantidade)
+                break
+        else:
+            self.itens.append((descricao, unidade, quantidade))
+
+        self.atualizar_tabela()
+        self.busca_input.selectAll()
+        self.busca_input.setFocus()
+
+    def remover(self):
+        """Remove os itens selecionados na tabela."""
+        linhas = sorted({indice.row() for indice in self.tabela.selectedIndexes()}, reverse=True)
+        for linha in linhas:
+            del self.itens[linha]
+        self.atualizar_tabela()
+
+    def limpar(self):
+        """Remove todos os itens."""
+        self.itens = []
+        self.atualizar_tabela()
+
+    def atualizar_tabela(self):
+        """Exibe os itens selecionados."""
+        self.tabela.setRowCount(len(self.itens))
+        for i, (descricao, unidade, quantidade) in enumerate(self.itens):
+            self.tabela.setItem(i, 0, QTableWidgetItem(descricao))
+            self.tabela.setItem(i, 1, QTableWidgetItem(unidade))
+            item_quantidade = QTableWidgetItem(f"{quantidade:g}")
+            item_quantidade.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            self.tabela.setItem(i, 2, item_quantidade)
@@ -5,28 +5,58 @@ Interface moderna e intuitiva com PySide6.
 
 import os
 import sys
+import time
 import subprocess
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QFileDialog,
     QMessageBox, QFrame, QListWidget, QListWidgetItem
 )
-from PySide6.QtCore import Qt, QPoint
+from PySide6.QtCore import Qt, QPoint, QTimer, QEvent
 from PySide6.QtGui import QFont
 
 from service.config_service import ConfigService
 from service.requisicao_service import PedidoService
+from service.exportacao_service import ExportacaoService
+from service.verificacao_service import VerificacaoService
+from service.indice_service import IndiceService
+from service.estatisticas_service import EstatisticasService
+from service.armazenamento_service import ArmazenamentoService
+from service.perfil_service import PerfilService
+from service.catalogo_service import CatalogoService
 from utils import get_resource_path
 from .settings_dialog import SettingsDialog
+from .estatisticas_dialog import EstatisticasDialog
+from .visualizacao_dialog import VisualizacaoDialog
+from .itens_dialog import ItensDialog
+from .tarefas import executar_em_segundo_plano
 
 
 class MainWindow(QMainWindow):
     """Janela principal da aplicação."""
     
+    # Ações medidas no modo diagnóstico (perfil de desempenho)
+    ACOES_PERFIL = ('criar_Pedido', 'selecionar_pasta', 'alternar_tema', 'abrir_configuracoes', 'abrir_itens')
+    
+    # Intervalo mínimo (s) entre as conferências do índice ao voltar para a janela
+    INTERVALO_INDICE = 30
+    
     def __init__(self):
         super().__init__()
         self.config_service = ConfigService()
+        
+        # Modo diagnóstico: envolver as ações antes de conectar os sinais
+        self.perfil = PerfilService.criar_se_ativo(self.config_service)
+        if self.perfil is not None:
+            self.perfil.envolver(self, self.ACOES_PERFIL)
+        
+        self.estatisticas = EstatisticasService(self.config_service.config_dir)
+        self.catalogo = CatalogoService(self.config_service.config_dir)
+        self.itens_pedido = []  # Itens da próxima Pedido: (descricao, unidade, quantidade)
         self.ultimo_arquivo_criado = None
+        self.indice = None  # Índice de busca da pasta de destino atual
+        self._atualizando_indice = False
+        self._ultima_atualizacao_indice = time.monotonic()
         self.tema_escuro = self.config_service.obter_config('tema_escuro', False)
         
         # Para arrastar a janela
@@ -39,6 +69,7 @@ class MainWindow(QMainWindow):
         
         # Carregar valores salvos DEPOIS de criar os widgets
         self.carregar_valores_salvos()
+        self.preparar_indice()
         
         # Configurar planilha padrão se não existir
         self.configurar_planilha_padrao_inicial()
@@ -117,6 +148,13 @@ class MainWindow(QMainWindow):
         self.btn_processar.clicked.connect(self.criar_Pedido)
         botoes_layout.addWidget(self.btn_processar)
         
+        self.btn_itens = QPushButton("Itens (0)")
+        self.btn_itens.setObjectName("viewButton")
+        self.btn_itens.setFixedHeight(36)
+        self.btn_itens.setToolTip("Buscar no catálogo os itens da Pedido")
+        self.btn_itens.clicked.connect(self.abrir_itens)
+        botoes_layout.addWidget(self.btn_itens)
+        
         botoes_layout.addStretch()
         
         self.btn_ver_arquivo = QPushButton("Ver Arquivo")
@@ -129,10 +167,43 @@ class MainWindow(QMainWindow):
         content_layout.addLayout(botoes_layout)
         
         # 4. Histórico
+        historico_header = QHBoxLayout()
+        historico_header.setSpacing(10)
+        
         historico_label = QLabel("Histórico")
         historico_label.setObjectName("historicoLabel")
         historico_label.setFixedHeight(20)  # Aumentado para não cortar
-        content_layout.addWidget(historico_label)
+        historico_header.addWidget(historico_label)
+        
+        self.busca_input = QLineEdit()
+        self.busca_input.setObjectName("buscaInput")
+        self.busca_input.setPlaceholderText("Buscar nas Pedido (item, setor, observação)...")
+        self.busca_input.setFixedHeight(22)
+        self.busca_input.setClearButtonEnabled(True)
+        historico_header.addWidget(self.busca_input, 1)
+        
+        # Busca só depois de uma pausa na digitação
+        self.timer_busca = QTimer(self)
+        self.timer_busca.setSingleShot(True)
+        self.timer_busca.setInterval(150)
+        self.timer_busca.timeout.connect(self.buscar_pedidos)
+        self.busca_input.textChanged.connect(self.timer_busca.start)
+        
+        self.btn_exportar = QPushButton("Exportar")
+        self.btn_exportar.setObjectName("linkButton")
+        self.btn_exportar.setFixedHeight(20)
+        self.btn_exportar.setToolTip("Exportar todas as Pedido criadas (CSV ou Excel)")
+        self.btn_exportar.clicked.connect(self.exportar_historico)
+        historico_header.addWidget(self.btn_exportar)
+        
+        self.btn_verificar = QPushButton("Verificar")
+        self.btn_verificar.setObjectName("linkButton")
+        self.btn_verificar.setFixedHeight(20)
+        self.btn_verificar.setToolTip("Verificar a integridade das Pedido da pasta de destino")
+        self.btn_verificar.clicked.connect(self.verificar_pasta)
+        historico_header.addWidget(self.btn_verificar)
+        
+        content_layout.addLayout(historico_header)
         
         self.lista_historico = QListWidget()
         self.lista_historico.setObjectName("historicoList")
@@ -215,6 +286,14 @@ class MainWindow(QMainWindow):
         self.btn_tema.clicked.connect(self.alternar_tema)
         layout.addWidget(self.btn_tema)
         
+        # Botão de estatísticas
+        btn_estatisticas = QPushButton("Σ")
+        btn_estatisticas.setObjectName("statsButton")
+        btn_estatisticas.setFixedSize(35, 35)
+        btn_estatisticas.setToolTip("Estatísticas")
+        btn_estatisticas.clicked.connect(self.abrir_estatisticas)
+        layout.addWidget(btn_estatisticas)
+        
         # Botão de configurações
         btn_settings = QPushButton("⚙")
         btn_settings.setObjectName("settingsButton")
@@ -249,7 +328,7 @@ class MainWindow(QMainWindow):
     
     def carregar_historico(self):
         """Carrega o histórico de Pedido criadas."""
-        ultimas = self.config_service.obter_config('ultimas_requisicoes', [])
+        ultimas = self.config_service.obter_historico()
         self.lista_historico.clear()
         # Adiciona os itens em ordem inversa para que os mais recentes apareçam no topo
         for req_info in reversed(ultimas):
@@ -266,39 +345,200 @@ class MainWindow(QMainWindow):
     
     def adicionar_historico(self, arquivo: str, pasta: str, setor: str):
         """Adiciona item ao histórico (no topo da lista)."""
-        ultimas = self.config_service.obter_config('ultimas_requisicoes', [])
-        
-        # Novo formato: armazenar o caminho completo e informações para exibição
-        item_data = [arquivo, pasta, setor]
-        
-        # Remover se já existir para evitar duplicatas e mover para o topo
-        if item_data in ultimas:
-            ultimas.remove(item_data)
-        
-        ultimas.append(item_data)
-        
-        # Manter apenas 50 últimas
-        ultimas = ultimas[-50:]
-        
-        self.config_service.definir_config('ultimas_requisicoes', ultimas)
+        self.config_service.adicionar_historico(arquivo, pasta, setor)
         self.carregar_historico() # Recarrega a lista para exibir o novo item no topo
     
     def abrir_arquivo_historico(self, item):
         """Abre arquivo do histórico ao dar duplo clique."""
         caminho = item.data(Qt.UserRole) # Obter o caminho completo do arquivo
+        # A Pedido pode ter sido compactada ou restaurada depois de registrada
+        caminho = caminho and ArmazenamentoService.localizar(caminho)
         
-        if caminho and os.path.exists(caminho):
-            self.abrir_arquivo_path(caminho)
+        if caminho:
+            self.visualizar_arquivo(caminho)
         else:
             QMessageBox.warning(self, "Aviso", "Arquivo não encontrado ou caminho inválido!")
     
     def ver_ultimo_arquivo(self):
         """Abre o último arquivo criado."""
-        if self.ultimo_arquivo_criado and os.path.exists(self.ultimo_arquivo_criado):
-            self.abrir_arquivo_path(self.ultimo_arquivo_criado)
+        caminho = self.ultimo_arquivo_criado and ArmazenamentoService.localizar(self.ultimo_arquivo_criado)
+        if caminho:
+            self.visualizar_arquivo(caminho)
         else:
             QMessageBox.warning(self, "Aviso", "Nenhum arquivo foi criado ainda!")
     
+    def exportar_historico(self):
+        """Exporta o histórico completo de Pedido para CSV ou Excel."""
+        destino, _ = QFileDialog.getSaveFileName(
+            self,
+            "Exportar Histórico",
+            os.path.join(os.path.expanduser("~"), "historico_pedidos.csv"),
+            "CSV (*.csv);;Arquivos Excel (*.xlsx)"
+        )
+        
+        if not destino:
+            return
+        
+        self.btn_exportar.setEnabled(False)
+        self.atualizar_status("Exportando histórico...", "info")
+        executar_em_segundo_plano(
+            self,
+            ExportacaoService.exportar_historico,
+            self._exportacao_concluida,
+            self.config_service,
+            destino,
+            ao_falhar=lambda erro: self._exportacao_concluida((False, erro, None))
+        )
+    
+    def _exportacao_concluida(self, resultado):
+        """Exibe o resultado da exportação."""
+        sucesso, mensagem, _ = resultado
+        self.btn_exportar.setEnabled(True)
+        self.atualizar_status(mensagem, "success" if sucesso else "error")
+    
+    def verificar_pasta(self):
+        """Verifica a integridade das Pedido da pasta de destino."""
+        pasta = self.pasta_input.text()
+        
+        if not pasta or not os.path.isdir(pasta):
+            QMessageBox.warning(
+                self,
+                "Atenção",
+                "Por favor, selecione a pasta de destino!"
+            )
+            return
+        
+        self.btn_verificar.setEnabled(False)
+        self.atualizar_status("Verificando arquivos...", "info")
+        executar_em_segundo_plano(
+            self,
+            VerificacaoService.verificar_pasta,
+            self._verificacao_concluida,
+            pasta,
+            self.config_service,
+            ao_falhar=self._verificacao_falhou
+        )
+    
+    def _verificacao_concluida(self, relatorio: dict):
+        """Exibe o relatório da verificação."""
+        self.btn_verificar.setEnabled(True)
+        
+        corrompidos = relatorio['corrompidos']
+        ausentes = relatorio['ausentes']
+        
+        if not corrompidos and not ausentes:
+            self.atualizar_status(
+                f"✓ {relatorio['total']} arquivos verificados, nenhum problema encontrado",
+                "success"
+            )
+            return
+        
+        linhas = [f"{relatorio['total']} arquivos verificados."]
+        if corrompidos:
+            linhas.append(f"\nCorrompidos ou incompletos ({len(corrompidos)}):")
+            linhas += [f"  {os.path.basename(a)}: {motivo}" for a, motivo in corrompidos[:20]]
+        if ausentes:
+            linhas.append(f"\nNo histórico, mas não encontrados ({len(ausentes)}):")
+            linhas += [f"  {os.path.basename(a)}" for a in ausentes[:20]]
+        
+        self.atualizar_status(
+            f"{len(corrompidos)} arquivo(s) com problema, {len(ausentes)} ausente(s)",
+            "error"
+        )
+        QMessageBox.warning(self, "Verificação de Arquivos", "\n".join(linhas))
+    
+    def _verificacao_falhou(self, erro: str):
+        """Exibe erro da verificação."""
+        self.btn_verificar.setEnabled(True)
+        self.atualizar_status(f"Erro ao verificar pasta: {erro}", "error")
+    
+    def preparar_indice(self):
+        """Carrega e atualiza o índice de busca da pasta de destino em segundo plano."""
+        pasta = self.pasta_input.text()
+        self.indice = None
+        if not pasta or not os.path.isdir(pasta):
+            return
+        
+        executar_em_segundo_plano(
+            self,
+            self._carregar_indice,
+            self._indice_pronto,
+            pasta,
+            self.config_service.obter_planilha_padrao()
+        )
+    
+    def _carregar_indice(self, pasta: str, planilha_padrao: str) -> IndiceService:
+        """Carrega o índice gravado e indexa as Pedido novas ou alteradas."""
+        indice = IndiceService(pasta, self.config_service.config_dir, planilha_padrao)
+        indice.atualizar()
+        return indice
+    
+    def _indice_pronto(self, indice: IndiceService):
+        """Passa a usar o índice, se a pasta ainda for a mesma."""
+        if indice.pasta == self.pasta_input.text():
+            self.indice = indice
+            if self.busca_input.text().strip():
+                self.buscar_pedidos()
+    
+    def atualizar_indice(self):
+        """
+        Reindexa em segundo plano as Pedido alteradas fora da criação
+        (edições no Excel, migração, compactação, outras estações).
+        """
+        if self.indice is None or self._atualizando_indice:
+            return
+        if self.indice.planilha_padrao != self.config_service.obter_planilha_padrao():
+            # Outra planilha padrão: o índice é recriado com as linhas dela
+            self.preparar_indice()
+            return
+        
+        self._atualizando_indice = True
+        self._ultima_atualizacao_indice = time.monotonic()
+        executar_em_segundo_plano(
+            self,
+            self.indice.atualizar,
+            self._indice_atualizado,
+            ao_falhar=self._indice_atualizado
+        )
+    
+    def _indice_atualizado(self, _):
+        """Refaz a busca exibida com o índice atualizado."""
+        self._atualizando_indice = False
+        if self.busca_input.text().strip():
+            self.buscar_pedidos()
+    
+    def changeEvent(self, event):
+        """Confere o índice ao voltar para a janela (ex.: depois de editar no Excel)."""
+        super().changeEvent(event)
+        if (
+            event.type() == QEvent.ActivationChange
+            and self.isActiveWindow()
+            and time.monotonic() - self._ultima_atualizacao_indice >= self.INTERVALO_INDICE
+        ):
+            self.atualizar_indice()
+    
+    def buscar_pedidos(self):
+        """Mostra na lista as Pedido que contêm o texto buscado."""
+        consulta = self.busca_input.text().strip()
+        if not consulta:
+            self.carregar_historico()
+            return
+        
+        self.lista_historico.clear()
+        if self.indice is None:
+            self.lista_historico.addItem("Preparando índice de busca...")
+            return
+        
+        resultados = self.indice.buscar(consulta)
+        for arquivo_path in resultados:
+            relativo = os.path.relpath(arquivo_path, self.indice.pasta)
+            item = QListWidgetItem(relativo)
+            item.setData(Qt.UserRole, arquivo_path)
+            self.lista_historico.addItem(item)
+        
+        if not resultados:
+            self.lista_historico.addItem("Nenhuma Pedido encontrada")
+    
     def verificar_configuracao_inicial(self):
         """Verifica se há uma planilha padrão configurada."""
         # A lógica de configuração inicial da planilha foi movida para configurar_planilha_padrao_inicial
@@ -333,6 +573,27 @@ class MainWindow(QMainWindow):
         """Abre o diálogo de configurações."""
         dialog = SettingsDialog(self.config_service, self)
         dialog.exec()
+        dialog.deleteLater()
+        # A migração e a compactação movem ou substituem as Pedido da pasta
+        self.atualizar_indice()
+    
+    def abrir_estatisticas(self):
+        """Abre o diálogo de estatísticas de uso."""
+        dialog = EstatisticasDialog(self.config_service, self.estatisticas, self)
+        dialog.exec()
+        dialog.deleteLater()
+    
+    def abrir_itens(self):
+        """Abre a busca no catálogo para escolher os itens da próxima Pedido."""
+        dialog = ItensDialog(self.config_service, self.catalogo, self.itens_pedido, self)
+        if dialog.exec():
+            self.definir_itens(dialog.itens)
+        dialog.deleteLater()
+    
+    def definir_itens(self, itens: list):
+        """Guarda os itens da próxima Pedido e atualiza o botão."""
+        self.itens_pedido = list(itens)
+        self.btn_itens.setText(f"Itens ({len(self.itens_pedido)})")
     
     def selecionar_pasta(self):
         """Abre diálogo para selecionar pasta de destino."""
@@ -353,6 +614,7 @@ class MainWindow(QMainWindow):
                 f"Pasta selecionada: {os.path.basename(pasta)}",
                 "info"
             )
+            self.preparar_indice()
     
     def criar_Pedido(self):
         """Cria uma nova Pedido."""
@@ -389,8 +651,10 @@ class MainWindow(QMainWindow):
             return
         
         # Criar Pedido
+        layout = self.config_service.obter_config('layout_pastas', PedidoService.LAYOUT_PLANO)
+        armazenamento = self.config_service.obter_config('armazenamento', ArmazenamentoService.COMPLETO)
         sucesso, mensagem, arquivo = PedidoService.criar_Pedido(
-            setor, pasta, planilha_padrao
+            setor, pasta, planilha_padrao, layout, armazenamento, self.itens_pedido
         )
         
         if sucesso:
@@ -402,6 +666,14 @@ class MainWindow(QMainWindow):
             
             # Adicionar ao histórico (no topo)
             self.adicionar_historico(arquivo, pasta, setor)
+            self.estatisticas.registrar_pedido(
+                setor, itens=[(descricao, quantidade) for descricao, _, quantidade in self.itens_pedido]
+            )
+            self.definir_itens([])
+            
+            # Incluir a nova Pedido no índice de busca
+            if self.indice is not None:
+                executar_em_segundo_plano(self, self.indice.indexar_arquivo, lambda _: None, arquivo)
             
             # Mostrar apenas na barra de status
             self.atualizar_status(f"✓ Pedido criado com sucesso! Arquivo: {os.path.basename(arquivo)}", "success")
@@ -413,9 +685,23 @@ class MainWindow(QMainWindow):
                 mensagem
             )
     
+    def visualizar_arquivo(self, caminho: str):
+        """Mostra a pré-visualização da Pedido (o Excel fica como ação secundária)."""
+        dialog = VisualizacaoDialog(caminho, self.config_service.config_dir, self.abrir_arquivo_path, self)
+        dialog.exec()
+        dialog.deleteLater()
+    
     def abrir_arquivo_path(self, caminho):
         """Abre um arquivo Excel pelo caminho."""
         try:
+            if ArmazenamentoService.eh_delta(caminho):
+                # Pedido compacta: gera o .xlsx real na pasta, para que as
+                # alterações feitas no Excel sejam mantidas
+                caminho = ArmazenamentoService.restaurar(caminho)
+            
+            # A próxima volta para a janela confere o índice (edições no Excel)
+            self._ultima_atualizacao_indice = -self.INTERVALO_INDICE
+            
             if sys.platform == 'win32':
                 os.startfile(caminho)
             elif sys.platform == 'darwin':  # macOS
@@ -5,11 +5,16 @@ Diálogo de configurações para definir a planilha padrão.
 import os
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QLineEdit, QFileDialog, QMessageBox
+    QPushButton, QLineEdit, QFileDialog, QMessageBox,
+    QCheckBox, QApplication
 )
 from PySide6.QtCore import Qt
 from service.config_service import ConfigService
 from service.requisicao_service import PedidoService
+from service.migracao_service import MigracaoService
+from service.armazenamento_service import ArmazenamentoService
+from service.perfil_service import PerfilService
+from .tarefas import executar_em_segundo_plano
 
 
 class SettingsDialog(QDialog):
@@ -18,13 +23,14 @@ class SettingsDialog(QDialog):
     def __init__(self, config_service: ConfigService, parent=None):
         super().__init__(parent)
         self.config_service = config_service
+        self._convertendo = False
         self.init_ui()
         self.carregar_configuracoes()
     
     def init_ui(self):
         """Inicializa a interface do diálogo."""
         self.setWindowTitle("Configurações")
-        self.setFixedSize(650, 200)
+        self.setFixedSize(650, 290)
         self.setModal(True)
         
         # Layout principal
@@ -64,6 +70,34 @@ class SettingsDialog(QDialog):
         
         layout.addLayout(planilha_layout)
         
+        # Organização da pasta de destino
+        self.check_ano_mes = QCheckBox("Organizar Pedido em subpastas por ano/mês (ex.: 2026/10/0123.xlsx)")
+        self.check_ano_mes.setToolTip(
+            "Mantém a pasta de destino pequena; a numeração continua única entre as subpastas"
+        )
+        layout.addWidget(self.check_ano_mes)
+        
+        # Armazenamento compacto
+        self.check_compacto = QCheckBox("Armazenamento compacto (gera o .xlsx somente ao abrir a Pedido)")
+        self.check_compacto.setToolTip(
+            "Guarda uma cópia da planilha padrão e, por Pedido, apenas setor, data e número"
+        )
+        layout.addWidget(self.check_compacto)
+        
+        # Opção oculta: aparece com Shift pressionado ao abrir o diálogo ou se já estiver ligada
+        self.check_perfil = QCheckBox("Modo diagnóstico: gravar perfil de desempenho das ações (reinicie o aplicativo)")
+        self.check_perfil.setToolTip(
+            f"As capturas ficam em {os.path.join(self.config_service.config_dir, 'perfil')}"
+        )
+        exibir_perfil = (
+            bool(QApplication.keyboardModifiers() & Qt.ShiftModifier)
+            or self.config_service.obter_config(PerfilService.CHAVE_CONFIG, False)
+        )
+        self.check_perfil.setVisible(exibir_perfil)
+        if exibir_perfil:
+            self.setFixedSize(650, 325)
+        layout.addWidget(self.check_perfil)
+        
         # Botões de ação
         botoes_layout = QHBoxLayout()
         botoes_layout.addStretch()
@@ -91,6 +125,13 @@ class SettingsDialog(QDialog):
         planilha = self.config_service.obter_planilha_padrao()
         if planilha:
             self.planilha_input.setText(planilha)
+        
+        layout = self.config_service.obter_config('layout_pastas', PedidoService.LAYOUT_PLANO)
+        self.check_ano_mes.setChecked(layout == PedidoService.LAYOUT_ANO_MES)
+        
+        armazenamento = self.config_service.obter_config('armazenamento', ArmazenamentoService.COMPLETO)
+        self.check_compacto.setChecked(armazenamento == ArmazenamentoService.COMPACTO)
+        self.check_perfil.setChecked(bool(self.config_service.obter_config(PerfilService.CHAVE_CONFIG, False)))
     
     def selecionar_planilha(self):
         """Abre diálogo para selecionar planilha padrão."""
@@ -134,6 +175,13 @@ class SettingsDialog(QDialog):
             )
             return
         
+        self.config_service.definir_config(PerfilService.CHAVE_CONFIG, self.check_perfil.isChecked())
+        
+        etapas = [etapa for etapa in (self.salvar_layout(), self.salvar_armazenamento(planilha)) if etapa]
+        self._executar_etapas(etapas, lambda: self._concluir_salvamento(planilha))
+    
+    def _concluir_salvamento(self, planilha: str):
+        """Grava a planilha padrão depois das conversões de pasta."""
         # Salvar configuração
         if self.config_service.definir_planilha_padrao(planilha):
             QMessageBox.information(
@@ -148,3 +196,101 @@ class SettingsDialog(QDialog):
                 "Erro",
                 "Erro ao salvar configurações."
             )
+    
+    def _executar_etapas(self, etapas: list, ao_terminar):
+        """
+        Executa as conversões de pasta em segundo plano, uma após a outra.
+        
+        O diálogo fica desabilitado (e não pode ser fechado) enquanto elas
+        rodam, pois podem percorrer milhares de arquivos na rede.
+        
+        Args:
+            etapas: Lista de (título, função que retorna (sucesso, mensagem, _))
+            ao_terminar: Chamado na thread da interface ao final de todas
+        """
+        if not etapas:
+            ao_terminar()
+            return
+        
+        titulo, funcao = etapas[0]
+        titulo_janela = self.windowTitle()
+        
+        def finalizar(sucesso: bool, mensagem: str):
+            self._convertendo = False
+            self.setEnabled(True)
+            self.setWindowTitle(titulo_janela)
+            QApplication.restoreOverrideCursor()
+            if sucesso:
+                QMessageBox.information(self, titulo, mensagem)
+            else:
+                QMessageBox.warning(self, titulo, mensagem)
+            self._executar_etapas(etapas[1:], ao_terminar)
+        
+        self._convertendo = True
+        self.setEnabled(False)
+        self.setWindowTitle(f"{titulo_janela} - {titulo}...")
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        executar_em_segundo_plano(
+            self,
+            funcao,
+            lambda resultado: finalizar(resultado[0], resultado[1]),
+            ao_falhar=lambda erro: finalizar(False, erro)
+        )
+    
+    def reject(self):
+        """Fecha o diálogo, exceto durante uma conversão de pasta."""
+        if not self._convertendo:
+            super().reject()
+    
+    def salvar_layout(self):
+        """
+        Salva o layout da pasta e oferece migrar as Pedido existentes.
+        
+        Returns:
+            Etapa (título, função) da migração a executar, ou None
+        """
+        anterior = self.config_service.obter_config('layout_pastas', PedidoService.LAYOUT_PLANO)
+        novo = PedidoService.LAYOUT_ANO_MES if self.check_ano_mes.isChecked() else PedidoService.LAYOUT_PLANO
+        self.config_service.definir_config('layout_pastas', novo)
+        
+        pasta = self.config_service.obter_config('ultima_pasta', '')
+        if novo == anterior or novo != PedidoService.LAYOUT_ANO_MES or not os.path.isdir(pasta):
+            return None
+        
+        resposta = QMessageBox.question(
+            self,
+            "Organizar Pedido",
+            f"Deseja mover as Pedido já existentes em\n{pasta}\npara subpastas por ano/mês?"
+        )
+        if resposta != QMessageBox.Yes:
+            return None
+        
+        return "Organizar Pedido", lambda: MigracaoService.migrar_para_ano_mes(pasta, self.config_service)
+    
+    def salvar_armazenamento(self, planilha: str):
+        """
+        Salva o modo de armazenamento e oferece converter as Pedido existentes.
+        
+        Returns:
+            Etapa (título, função) da conversão a executar, ou None
+        """
+        anterior = self.config_service.obter_config('armazenamento', ArmazenamentoService.COMPLETO)
+        novo = ArmazenamentoService.COMPACTO if self.check_compacto.isChecked() else ArmazenamentoService.COMPLETO
+        self.config_service.definir_config('armazenamento', novo)
+        
+        pasta = self.config_service.obter_config('ultima_pasta', '')
+        if novo == anterior or not os.path.isdir(pasta):
+            return None
+        
+        if novo == ArmazenamentoService.COMPACTO:
+            pergunta = f"Deseja compactar as Pedido já existentes em\n{pasta}?"
+            converter = lambda: MigracaoService.compactar_pasta(pasta, planilha)
+        else:
+            pergunta = f"Deseja restaurar como .xlsx as Pedido compactas de\n{pasta}?"
+            converter = lambda: MigracaoService.restaurar_pasta(pasta)
+        
+        resposta = QMessageBox.question(self, "Armazenamento", pergunta)
+        if resposta != QMessageBox.Yes:
+            return None
+        
+        return "Armazenamento", converter
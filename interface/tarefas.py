@@ -0,0 +1,63 @@
+"""
+Execução de tarefas demoradas fora da thread da interface.
+"""
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+
+class _SinaisTarefa(QObject):
+    """Sinais emitidos ao final de uma tarefa."""
+    concluida = Signal(object)
+    falhou = Signal(str)
+
+
+class Tarefa(QRunnable):
+    """Executa uma função no QThreadPool global e devolve o resultado por sinal."""
+
+    # Mantém referência às tarefas em andamento enquanto executam
+    _em_andamento = set()
+
+    def __init__(self, dono: QObject, funcao, *args, **kwargs):
+        super().__init__()
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        # Os sinais são criados na thread da interface, onde o resultado é
+        # entregue. Não ficam presos ao dono: um diálogo fechado e destruído
+        # antes do fim da tarefa só deixa de receber o resultado
+        self.sinais = _SinaisTarefa()
+        self.sinais.moveToThread(dono.thread())
+
+    def run(self):
+        """Executa a função na thread do pool."""
+        try:
+            resultado = self.funcao(*self.args, **self.kwargs)
+        except Exception as e:
+            self.sinais.falhou.emit(str(e))
+        else:
+            self.sinais.concluida.emit(resultado)
+        finally:
+            self.sinais.deleteLater()
+            Tarefa._em_andamento.discard(self)
+
+
+def executar_em_segundo_plano(dono: QObject, funcao, ao_concluir, *args, ao_falhar=None, **kwargs) -> Tarefa:
+    """
+    Executa `funcao(*args, **kwargs)` em segundo plano.
+
+    Args:
+        dono: Objeto da interface que recebe o resultado
+        funcao: Função a executar (não deve acessar widgets)
+        ao_concluir: Slot chamado na thread da interface com o resultado
+        ao_falhar: Slot opcional chamado com a mensagem de erro
+
+    Returns:
+        A tarefa agendada
+    """
+    tarefa = Tarefa(dono, funcao, *args, **kwargs)
+    tarefa.sinais.concluida.connect(ao_concluir)
+    if ao_falhar is not None:
+        tarefa.sinais.falhou.connect(ao_falhar)
+    Tarefa._em_andamento.add(tarefa)
+    QThreadPool.globalInstance().start(tarefa)
+    return tarefa
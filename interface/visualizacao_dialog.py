@@ -0,0 +1,114 @@
+"""
+Diálogo de pré-visualização de uma Pedido, sem abrir o Excel.
+"""
+
+import os
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem
+)
+from openpyxl.utils import get_column_letter
+from service.visualizacao_service import VisualizacaoService
+from .tarefas import executar_em_segundo_plano
+
+
+class VisualizacaoDialog(QDialog):
+    """Mostra as primeiras linhas da aba ativa de uma Pedido."""
+
+    def __init__(self, caminho: str, cache_dir: str, abrir_no_excel, parent=None):
+        """
+        Args:
+            caminho: Arquivo da Pedido (.xlsx ou .pedido)
+            cache_dir: Pasta do cache de Pedido materializadas
+            abrir_no_excel: Função chamada com o caminho ao clicar em "Abrir no Excel"
+        """
+        super().__init__(parent)
+        self.caminho = caminho
+        self.cache_dir = cache_dir
+        self.abrir_no_excel = abrir_no_excel
+        self.init_ui()
+        self.carregar()
+
+    def init_ui(self):
+        """Inicializa a interface do diálogo."""
+        nome = os.path.splitext(os.path.basename(self.caminho))[0]
+        self.setWindowTitle(f"Pedido {nome}")
+        self.resize(760, 480)
+        self.setModal(True)
+
+        layout = QVBoxLayout()
+        layout.setSpacing(12)
+        layout.setContentsMargins(25, 20, 25, 20)
+
+        titulo = QLabel(f"Pedido {nome}")
+        titulo.setObjectName("dialogTitle")
+        layout.addWidget(titulo)
+
+        self.status_label = QLabel("Carregando...")
+        self.status_label.setStyleSheet("color: #666666; font-size: 12px;")
+        layout.addWidget(self.status_label)
+
+        self.tabela = QTableWidget(0, 0)
+        self.tabela.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tabela.setWordWrap(False)
+        layout.addWidget(self.tabela)
+
+        # Botões de ação
+        botoes_layout = QHBoxLayout()
+
+        btn_excel = QPushButton("Abrir no Excel")
+        btn_excel.setMinimumHeight(38)
+        btn_excel.clicked.connect(self._abrir_no_excel)
+        botoes_layout.addWidget(btn_excel)
+
+        botoes_layout.addStretch()
+
+        btn_fechar = QPushButton("Fechar")
+        btn_fechar.setObjectName("primaryButton")
+        btn_fechar.setFixedWidth(110)
+        btn_fechar.setMinimumHeight(38)
+        btn_fechar.clicked.connect(self.accept)
+        botoes_layout.addWidget(btn_fechar)
+
+        layout.addLayout(botoes_layout)
+        self.setLayout(layout)
+
+    def carregar(self):
+        """Exibe a Pedido do cache ou a lê em segundo plano."""
+        tabela = VisualizacaoService.obter_em_cache(self.caminho)
+        if tabela is not None:
+            self._exibir(tabela)
+            return
+
+        executar_em_segundo_plano(
+            self,
+            VisualizacaoService.ler_linhas,
+            self._exibir,
+            self.caminho,
+            self.cache_dir,
+            ao_falhar=self._falhou
+        )
+
+    def _exibir(self, tabela: list):
+        """Preenche a tabela com as linhas lidas."""
+        colunas = len(tabela[0]) if tabela else 0
+        self.tabela.setRowCount(len(tabela))
+        self.tabela.setColumnCount(colunas)
+        self.tabela.setHorizontalHeaderLabels([get_column_letter(i + 1) for i in range(colunas)])
+
+        for i, linha in enumerate(tabela):
+            for j, valor in enumerate(linha):
+                if valor:
+                    self.tabela.setItem(i, j, QTableWidgetItem(valor))
+
+        self.tabela.resizeColumnsToContents()
+        self.status_label.setText(f"Primeiras {len(tabela)} linhas da planilha")
+
+    def _falhou(self, erro: str):
+        """Informa o erro de leitura no próprio diálogo."""
+        self.status_label.setText(f"Não foi possível ler a Pedido: {erro}")
+
+    def _abrir_no_excel(self):
+        """Fecha a pré-visualização e abre a Pedido no Excel."""
+        self.accept()
+        self.abrir_no_excel(self.caminho)
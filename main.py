@@ -4,10 +4,14 @@ Ponto de entrada da aplicação.
 """
 
 import sys
+import argparse
+import multiprocessing
 from pathlib import Path
 from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import Qt
 from interface.main_window import MainWindow
+from service.config_service import ConfigService
+from service.perfil_service import PerfilService
 from utils import get_resource_path
 
 
@@ -20,8 +24,151 @@ def carregar_estilos(app: QApplication) -> None:
             app.setStyleSheet(stylesheet)
 
 
+def executar_api(args: argparse.Namespace) -> None:
+    """Executa a API local sem interface gráfica."""
+    from service.api_service import PedidoAPIServer
+    
+    servidor = PedidoAPIServer(
+        host=args.host,
+        porta=args.porta,
+        max_workers=args.workers,
+        max_fila=args.fila,
+        verboso=args.verboso
+    )
+    print(f"API local em http://{args.host}:{args.porta} (Ctrl+C para encerrar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+def executar_verificacao(pasta: str) -> None:
+    """Verifica a integridade das Pedido de uma pasta e imprime o relatório."""
+    from service.verificacao_service import VerificacaoService
+    
+    relatorio = VerificacaoService.verificar_pasta(pasta, ConfigService())
+    print(f"Arquivos verificados: {relatorio['total']}")
+    for arquivo, motivo in relatorio['corrompidos']:
+        print(f"CORROMPIDO  {arquivo}: {motivo}")
+    for arquivo in relatorio['ausentes']:
+        print(f"AUSENTE     {arquivo}")
+    for arquivo in relatorio['fora_historico']:
+        print(f"SEM REGISTRO {arquivo}")
+    sys.exit(1 if relatorio['corrompidos'] else 0)
+
+
+def atualizar_indice(config_service: ConfigService, pasta: str) -> None:
+    """Reindexa a pasta depois de mover ou converter as Pedido."""
+    from service.indice_service import IndiceService
+    
+    IndiceService(pasta, config_service.config_dir, config_service.obter_planilha_padrao()).atualizar()
+
+
+def executar_migracao(pasta: str) -> None:
+    """Move as Pedido da pasta para subpastas por ano/mês e ativa o layout."""
+    from service.migracao_service import MigracaoService
+    from service.requisicao_service import PedidoService
+    
+    config_service = ConfigService()
+    sucesso, mensagem, _ = MigracaoService.migrar_para_ano_mes(pasta, config_service)
+    if sucesso:
+        config_service.definir_config('layout_pastas', PedidoService.LAYOUT_ANO_MES)
+    atualizar_indice(config_service, pasta)
+    print(mensagem)
+    sys.exit(0 if sucesso else 1)
+
+
+def executar_compactacao(pasta: str) -> None:
+    """Converte as Pedido da pasta para o armazenamento compacto e ativa o modo."""
+    from service.migracao_service import MigracaoService
+    from service.armazenamento_service import ArmazenamentoService
+    
+    config_service = ConfigService()
+    planilha = config_service.obter_planilha_padrao() or ''
+    sucesso, mensagem, _ = MigracaoService.compactar_pasta(pasta, planilha)
+    if sucesso:
+        config_service.definir_config('armazenamento', ArmazenamentoService.COMPACTO)
+    atualizar_indice(config_service, pasta)
+    print(mensagem)
+    sys.exit(0 if sucesso else 1)
+
+
+def executar_restauracao(pasta: str) -> None:
+    """Restaura como .xlsx as Pedido compactas da pasta e volta ao modo completo."""
+    from service.migracao_service import MigracaoService
+    from service.armazenamento_service import ArmazenamentoService
+    
+    config_service = ConfigService()
+    sucesso, mensagem, _ = MigracaoService.restaurar_pasta(pasta)
+    if sucesso:
+        config_service.definir_config('armazenamento', ArmazenamentoService.COMPLETO)
+    atualizar_indice(config_service, pasta)
+    print(mensagem)
+    sys.exit(0 if sucesso else 1)
+
+
+def executar_estatisticas(mes: str = None) -> None:
+    """Imprime as estatísticas de uso (somente os agregados, sem abrir planilhas)."""
+    from service.estatisticas_service import EstatisticasService
+    
+    estatisticas = EstatisticasService(ConfigService().config_dir)
+    periodo = mes or "todo o período"
+    print(f"Pedido em {periodo}: {estatisticas.total(mes)}")
+    print("\nPor setor:")
+    for setor, quantidade in estatisticas.pedidos_por_setor(mes):
+        print(f"  {quantidade:>6}  {setor or '(sem setor)'}")
+    print("\nItens mais solicitados:")
+    for descricao, quantidade in estatisticas.itens_mais_solicitados(mes, limite=20):
+        print(f"  {quantidade:>8g}  {descricao}")
+    if not mes:
+        print("\nPor mês:")
+        for m in estatisticas.meses():
+            print(f"  {m}  {estatisticas.total(m):>6}")
+
+
+def ler_argumentos() -> argparse.Namespace:
+    """Lê os argumentos de linha de comando (os demais ficam para o Qt)."""
+    parser = argparse.ArgumentParser(description="Sistema de Pedido de Almoxarifado")
+    parser.add_argument('--api', action='store_true', help="Executa a API local JSON/HTTP sem interface")
+    parser.add_argument('--host', default='127.0.0.1', help="Endereço local da API")
+    parser.add_argument('--porta', type=int, default=8765, help="Porta da API")
+    parser.add_argument('--workers', type=int, default=4, help="Threads de processamento da API")
+    parser.add_argument('--fila', type=int, default=32, help="Conexões em espera antes de responder 503")
+    parser.add_argument('--verboso', action='store_true', help="Registra cada requisição da API")
+    parser.add_argument('--verificar', metavar='PASTA', help="Verifica a integridade das Pedido da pasta")
+    parser.add_argument('--migrar-layout', metavar='PASTA', help="Move as Pedido da pasta para subpastas ano/mês")
+    parser.add_argument('--compactar', metavar='PASTA', help="Converte as Pedido da pasta para o armazenamento compacto")
+    parser.add_argument('--restaurar', metavar='PASTA', help="Restaura como .xlsx as Pedido compactas da pasta")
+    parser.add_argument('--estatisticas', action='store_true', help="Imprime as estatísticas de uso")
+    parser.add_argument('--mes', metavar='AAAA-MM', help="Mês das estatísticas (padrão: todo o período)")
+    args, _ = parser.parse_known_args()
+    return args
+
+
 def main():
     """Função principal da aplicação."""
+    args = ler_argumentos()
+    if args.api:
+        executar_api(args)
+        return
+    if args.verificar:
+        executar_verificacao(args.verificar)
+        return
+    if args.migrar_layout:
+        executar_migracao(args.migrar_layout)
+        return
+    if args.compactar:
+        executar_compactacao(args.compactar)
+        return
+    if args.restaurar:
+        executar_restauracao(args.restaurar)
+        return
+    if args.estatisticas:
+        executar_estatisticas(args.mes)
+        return
+    
     # Habilitar High DPI
     QApplication.setHighDpiScaleFactorRoundingPolicy(
         Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
@@ -35,13 +182,20 @@ def main():
     # Carregar estilos
     carregar_estilos(app)
     
-    # Criar e exibir janela principal
-    window = MainWindow()
-    window.show()
+    # Criar e exibir janela principal (medindo a inicialização no modo diagnóstico)
+    def criar_janela() -> MainWindow:
+        janela = MainWindow()
+        janela.show()
+        return janela
+    
+    perfil = PerfilService.criar_se_ativo(ConfigService())
+    window = perfil.perfilar('inicializacao', criar_janela) if perfil else criar_janela()
     
     # Executar aplicação
     sys.exit(app.exec())
 
 
 if __name__ == "__main__":
+    # Necessário para os processos de indexação no executável (PyInstaller)
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,106 @@
+"""
+Teste de carga da API local de Pedido.
+Dispara requisições concorrentes contra localhost e mede vazão
+(requisições por segundo) e percentis de latência.
+
+Uso:
+    python main.py --api
+    python scripts/teste_carga_api.py --rota proximo-numero --total 2000 --concorrencia 16
+    python scripts/teste_carga_api.py --rota pedidos --pasta C:/Temp/pedidos --total 200
+"""
+
+import sys
+import json
+import time
+import argparse
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+
+def percentil(valores: list, p: float) -> float:
+    """Percentil por interpolação linear de uma lista ordenada."""
+    if not valores:
+        return 0.0
+    posicao = (len(valores) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(valores) - 1)
+    return valores[inferior] + (valores[superior] - valores[inferior]) * (posicao - inferior)
+
+
+def montar_requisicao(args: argparse.Namespace, indice: int) -> urllib.request.Request:
+    """Monta a requisição HTTP da rota escolhida."""
+    base = args.url.rstrip('/')
+    if args.rota == 'proximo-numero':
+        consulta = urlencode({'pasta': args.pasta}) if args.pasta else ''
+        return urllib.request.Request(f"{base}/proximo-numero?{consulta}")
+    if args.rota == 'historico':
+        return urllib.request.Request(f"{base}/historico?limite=10")
+
+    corpo = {'setor': f"{args.setor} {indice}"}
+    if args.pasta:
+        corpo['pasta'] = args.pasta
+    if args.planilha:
+        corpo['planilha_padrao'] = args.planilha
+    return urllib.request.Request(
+        f"{base}/pedidos",
+        data=json.dumps(corpo).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+
+
+def executar(args: argparse.Namespace, indice: int):
+    """Executa uma requisição e retorna (status, latência em segundos)."""
+    requisicao = montar_requisicao(args, indice)
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(requisicao, timeout=args.timeout) as resposta:
+            resposta.read()
+            status = resposta.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        status = 'falha'
+    return status, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API local")
+    parser.add_argument('--url', default='http://127.0.0.1:8765')
+    parser.add_argument('--rota', choices=['proximo-numero', 'historico', 'pedidos'], default='proximo-numero')
+    parser.add_argument('--pasta', default='', help="Pasta de destino (padrão: última pasta configurada)")
+    parser.add_argument('--planilha', default='', help="Planilha padrão (padrão: a configurada no aplicativo)")
+    parser.add_argument('--setor', default='Teste de Carga')
+    parser.add_argument('--total', type=int, default=1000)
+    parser.add_argument('--concorrencia', type=int, default=8)
+    parser.add_argument('--timeout', type=float, default=30)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concorrencia) as executor:
+        resultados = list(executor.map(lambda i: executar(args, i), range(args.total)))
+    duracao = time.perf_counter() - inicio
+
+    status = Counter(s for s, _ in resultados)
+    latencias = sorted(t * 1000 for s, t in resultados if s in (200, 201))
+
+    print(f"Rota: /{args.rota}  Total: {args.total}  Concorrência: {args.concorrencia}")
+    print(f"Duração: {duracao:.2f} s  Vazão: {args.total / duracao:.1f} req/s")
+    print("Status: " + ", ".join(f"{s}={n}" for s, n in sorted(status.items(), key=str)))
+    if latencias:
+        print(
+            f"Latência (ms): p50={percentil(latencias, 50):.1f}  "
+            f"p90={percentil(latencias, 90):.1f}  "
+            f"p95={percentil(latencias, 95):.1f}  "
+            f"p99={percentil(latencias, 99):.1f}  "
+            f"máx={latencias[-1]:.1f}"
+        )
+
+    sys.exit(0 if latencias else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Teste de resistência (soak) da criação de Pedido.
+Executa milhares de ciclos criar_Pedido + adicionar_historico sem interface,
+acompanhando a memória com tracemalloc e o RSS do processo. Termina com
+código 1 se a memória crescer acima do limite após o aquecimento.
+
+Cada ciclo também passa pelos caches de longa duração do aplicativo: as
+Pedido alternam entre os modos completo e compacto, com itens, e são
+registradas nas estatísticas e no índice de busca. A cada --intervalo
+ciclos são consultados as estatísticas, o índice, a pré-visualização (cópias
+materializadas) e o catálogo, que é reimportado (vocabulário da busca
+aproximada). Com --dialogos, os diálogos também são abertos e fechados
+(Qt em modo offscreen).
+
+Uso:
+    python scripts/teste_resistencia.py --ciclos 3000 --limite-mb 8
+    python scripts/teste_resistencia.py --ciclos 10000 --sem-tracemalloc
+    python scripts/teste_resistencia.py --ciclos 1000 --dialogos
+
+O tracemalloc deixa o openpyxl várias vezes mais lento; para execuções
+muito longas use --sem-tracemalloc e acompanhe apenas o RSS.
+"""
+
+import os
+import gc
+import sys
+import csv
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+# Permite executar a partir da pasta scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from service.config_service import ConfigService
+from service.requisicao_service import PedidoService
+from service.armazenamento_service import ArmazenamentoService
+from service.estatisticas_service import EstatisticasService
+from service.indice_service import IndiceService
+from service.catalogo_service import CatalogoService
+from service.plano_service import PlanoService
+from service.visualizacao_service import VisualizacaoService
+from service import indice_service
+from utils import get_resource_path
+
+
+def rss_atual_mb() -> float:
+    """Memória residente (RSS) atual do processo em MB, ou 0 se indisponível."""
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ('cb', wintypes.DWORD),
+                ('PageFaultCount', wintypes.DWORD),
+                ('PeakWorkingSetSize', ctypes.c_size_t),
+                ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t),
+                ('PeakPagefileUsage', ctypes.c_size_t),
+            ]
+
+        contadores = PROCESS_MEMORY_COUNTERS()
+        contadores.cb = ctypes.sizeof(contadores)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(),
+            ctypes.byref(contadores),
+            contadores.cb
+        )
+        return contadores.WorkingSetSize / (1024 * 1024)
+
+    try:
+        with open('/proc/self/statm') as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        return 0.0
+
+
+def gravar_catalogo(caminho: str, descricoes: list, versao: int) -> None:
+    """Grava um catálogo CSV; a versão altera um item para forçar a reimportação."""
+    with open(caminho, 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.writer(f, delimiter=';')
+        escritor.writerow(['codigo', 'descricao', 'unidade'])
+        for i, descricao in enumerate(descricoes):
+            escritor.writerow([f"{10000 + i}", descricao, 'UN'])
+        escritor.writerow(['99999', f"ITEM VARIAVEL {versao}", 'UN'])
+
+
+class Dialogos:
+    """Abre e fecha os diálogos do aplicativo como a janela principal faz."""
+
+    def __init__(self):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PySide6.QtWidgets import QApplication, QWidget
+        self.app = QApplication.instance() or QApplication([])
+        self.janela = QWidget()
+
+    def ciclo(self, config_service, estatisticas, catalogo, arquivo: str) -> None:
+        """Abre cada diálogo, espera as tarefas em segundo plano e o destrói."""
+        from PySide6.QtCore import QCoreApplication, QEvent, QThreadPool
+        from PySide6.QtWidgets import QDialog
+        from interface.settings_dialog import SettingsDialog
+        from interface.estatisticas_dialog import EstatisticasDialog
+        from interface.itens_dialog import ItensDialog
+        from interface.visualizacao_dialog import VisualizacaoDialog
+
+        for criar in (
+            lambda: SettingsDialog(config_service, self.janela),
+            lambda: EstatisticasDialog(config_service, estatisticas, self.janela),
+            lambda: ItensDialog(config_service, catalogo, [], self.janela),
+            lambda: VisualizacaoDialog(arquivo, config_service.config_dir, lambda _: None, self.janela),
+        ):
+            dialogo = criar()
+            dialogo.show()
+            self.app.processEvents()
+            QThreadPool.globalInstance().waitForDone()
+            self.app.processEvents()
+            dialogo.accept()
+            dialogo.deleteLater()
+            QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+        restantes = self.janela.findChildren(QDialog)
+        if restantes:
+            raise RuntimeError(f"{len(restantes)} diálogo(s) não destruído(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de resistência da criação de Pedido")
+    parser.add_argument('--ciclos', type=int, default=2000)
+    parser.add_argument('--aquecimento', type=int, default=50, help="Ciclos ignorados antes da medição")
+    parser.add_argument('--amostragem', type=int, default=100, help="Intervalo de ciclos entre amostras")
+    parser.add_argument('--planilha', default=str(get_resource_path('resources/padrao.xlsx')))
+    parser.add_argument('--limite-mb', type=float, default=8.0, help="Crescimento máximo (tracemalloc)")
+    parser.add_argument('--limite-rss-mb', type=float, default=32.0, help="Crescimento máximo do RSS")
+    parser.add_argument('--sem-tracemalloc', action='store_true', help="Mede apenas o RSS (mais rápido)")
+    parser.add_argument('--manter-arquivos', action='store_true', help="Não apaga a pasta temporária")
+    parser.add_argument('--intervalo', type=int, default=10, help="Ciclos entre as consultas aos caches")
+    parser.add_argument('--dialogos', action='store_true', help="Abre e fecha os diálogos (requer PySide6)")
+    args = parser.parse_args()
+
+    # Pasta e configuração isoladas para não poluir o histórico real
+    pasta_teste = tempfile.mkdtemp(prefix='pedido_soak_')
+    pasta_destino = os.path.join(pasta_teste, 'pedidos')
+    os.makedirs(pasta_destino)
+    config_service = ConfigService(config_dir=os.path.join(pasta_teste, 'config'))
+    config_dir = config_service.config_dir
+    estatisticas = EstatisticasService(config_dir)
+    indice = IndiceService(pasta_destino, config_dir, args.planilha)
+    catalogo = CatalogoService(config_dir)
+    dialogos = Dialogos() if args.dialogos else None
+
+    # Produtos da planilha padrão e alguns fora da lista (linhas livres)
+    tabela = PlanoService.obter_tabela_itens(args.planilha)
+    produtos = list(tabela.descricoes.values()) if tabela else []
+    arquivo_catalogo = os.path.join(pasta_teste, 'catalogo.csv')
+    gravar_catalogo(arquivo_catalogo, produtos + [f"LUVA NITRILICA {t}" for t in 'PMG'], 0)
+    config_service.definir_config('catalogo_arquivo', arquivo_catalogo)
+
+    recentes = []  # Últimas Pedido criadas (uma completa e uma compacta)
+
+    def ciclo(i: int) -> None:
+        setor = f"Setor {i % 25}"
+        armazenamento = ArmazenamentoService.COMPACTO if i % 2 else ArmazenamentoService.COMPLETO
+        itens = []
+        if tabela:
+            itens = [(produtos[i % len(produtos)], None, 1 + i % 3), (f"Item avulso {i % 7}", 'UN', 1)]
+        sucesso, mensagem, arquivo = PedidoService.criar_Pedido(
+            setor, pasta_destino, args.planilha, armazenamento=armazenamento, itens=itens
+        )
+        if not sucesso:
+            raise RuntimeError(mensagem)
+        config_service.adicionar_historico(arquivo, pasta_destino, setor)
+        estatisticas.registrar_pedido(setor, itens=[(d, q) for d, _, q in itens])
+        indice.indexar_arquivo(arquivo)
+        recentes[:] = recentes[-1:] + [arquivo]
+
+        if i % args.intervalo == 0:
+            estatisticas.total()
+            estatisticas.itens_mais_solicitados(limite=20)
+            indice.buscar(setor)
+            indice.atualizar()
+            for recente in recentes:
+                VisualizacaoService.ler_linhas(recente, config_dir)
+            gravar_catalogo(arquivo_catalogo, produtos + [f"LUVA NITRILICA {t}" for t in 'PMG'], i)
+            catalogo.atualizar(arquivo_catalogo)
+            catalogo.buscar('luvx nitrilca')
+            if dialogos is not None:
+                dialogos.ciclo(config_service, estatisticas, catalogo, arquivo)
+
+    def memoria_atual() -> float:
+        """Memória rastreada depois da coleta cíclica (lixo pendente não é vazamento)."""
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0]
+
+    if not args.sem_tracemalloc:
+        tracemalloc.start()
+    try:
+        for i in range(args.aquecimento):
+            ciclo(i)
+
+        base_traced = memoria_atual()
+        base_snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        base_rss = rss_atual_mb()
+        inicio = time.perf_counter()
+
+        print(f"{'ciclo':>7} {'traced MB':>10} {'RSS MB':>8} {'ciclos/s':>9}")
+        for i in range(args.aquecimento, args.aquecimento + args.ciclos):
+            ciclo(i)
+            feitos = i - args.aquecimento + 1
+            if feitos % args.amostragem == 0:
+                traced = memoria_atual()
+                print(
+                    f"{feitos:>7} {(traced - base_traced) / (1024 * 1024):>+10.2f} "
+                    f"{rss_atual_mb() - base_rss:>+8.1f} "
+                    f"{feitos / (time.perf_counter() - inicio):>9.1f}"
+                )
+
+        crescimento = (memoria_atual() - base_traced) / (1024 * 1024)
+        final_snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        crescimento_rss = rss_atual_mb() - base_rss
+
+        materializadas = os.path.join(config_dir, 'materializadas')
+        print(
+            f"\nCaches: estatísticas {len(estatisticas.dados['por_dia'])} dias e "
+            f"{len(estatisticas.dados['itens_por_mes'])} meses de itens; "
+            f"modelos no índice {len(indice_service._linhas_por_modelo)}; "
+            f"pré-visualizações {len(os.listdir(materializadas)) if os.path.isdir(materializadas) else 0}; "
+            f"vocabulário {sum(map(len, (catalogo._vocabulario or {}).values()))} termos"
+        )
+    finally:
+        tracemalloc.stop()
+        catalogo.fechar()
+        if not args.manter_arquivos:
+            shutil.rmtree(pasta_teste, ignore_errors=True)
+
+    if final_snapshot is not None:
+        print("\nMaiores crescimentos de alocação:")
+        for estatistica in final_snapshot.compare_to(base_snapshot, 'lineno')[:10]:
+            print(f"  {estatistica}")
+
+    print(f"\nCrescimento tracemalloc: {crescimento:+.2f} MB (limite {args.limite_mb} MB)")
+    print(f"Crescimento RSS: {crescimento_rss:+.1f} MB (limite {args.limite_rss_mb} MB)")
+
+    if crescimento > args.limite_mb or crescimento_rss > args.limite_rss_mb:
+        print("FALHOU: crescimento de memória acima do limite")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
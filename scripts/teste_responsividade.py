@@ -0,0 +1,391 @@
+"""
+Teste de responsividade da janela principal.
+Executa as ações da MainWindow sem tela (QPA offscreen) sobre uma pasta de
+destino com latência artificial (simulando um compartilhamento de rede lento)
+e mede quanto tempo o laço de eventos fica travado em cada ação, com um timer
+de pulsação. Os resultados podem ser gravados em JSON e comparados com uma
+execução anterior; termina com código 1 se alguma ação piorar.
+
+Uso:
+    python scripts/teste_responsividade.py --latencia-ms 20 --saida base.json
+    python scripts/teste_responsividade.py --latencia-ms 20 --comparar base.json
+
+Travamento é o atraso de uma pulsação além do intervalo previsto; apenas
+atrasos a partir de --limiar-ms contam (o padrão equivale a um quadro a 60 Hz).
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import random
+import argparse
+import builtins
+import platform
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Sem tela: precisa ser definido antes de criar a QApplication
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+# Permite executar a partir da pasta scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PySide6.QtCore import Qt, QTimer, QEventLoop, QThreadPool
+from PySide6.QtWidgets import QApplication, QDialog, QFileDialog
+
+from service.requisicao_service import PedidoService
+from utils import get_resource_path
+
+
+def percentil(valores: list, p: float) -> float:
+    """Percentil por interpolação linear de uma lista ordenada."""
+    if not valores:
+        return 0.0
+    posicao = (len(valores) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(valores) - 1)
+    return valores[inferior] + (valores[superior] - valores[inferior]) * (posicao - inferior)
+
+
+class ArmazenamentoLento:
+    """Acrescenta latência às operações de arquivo feitas dentro de uma pasta."""
+
+    FUNCOES_OS = ('stat', 'listdir', 'scandir', 'remove', 'replace', 'rename', 'mkdir', 'utime')
+
+    def __init__(self, raiz: str, latencia_ms: float):
+        self.raiz = os.path.abspath(raiz)
+        self.latencia = latencia_ms / 1000
+        self.operacoes = 0
+        self._originais = {}
+
+    def _atrasar(self, args: tuple) -> None:
+        """Espera a latência se o primeiro argumento for um caminho dentro da raiz."""
+        try:
+            caminho = os.fspath(args[0]) if args else '.'
+        except TypeError:
+            return  # descritor de arquivo já aberto
+        if isinstance(caminho, bytes):
+            caminho = os.fsdecode(caminho)
+        if os.path.abspath(caminho).startswith(self.raiz):
+            self.operacoes += 1
+            time.sleep(self.latencia)
+
+    def _envolver(self, funcao):
+        def envolvida(*args, **kwargs):
+            self._atrasar(args)
+            return funcao(*args, **kwargs)
+        return envolvida
+
+    def ativar(self) -> None:
+        """Passa a atrasar open() e as funções de os usadas pelo aplicativo."""
+        if self._originais or self.latencia <= 0:
+            return
+        for nome in self.FUNCOES_OS:
+            self._originais[(os, nome)] = getattr(os, nome)
+        # zipfile (openpyxl) usa io.open; o restante do código usa open()
+        self._originais[(io, 'open')] = io.open
+        self._originais[(builtins, 'open')] = builtins.open
+        for (modulo, nome), funcao in self._originais.items():
+            setattr(modulo, nome, self._envolver(funcao))
+
+    def desativar(self) -> None:
+        """Restaura as funções originais."""
+        for (modulo, nome), funcao in self._originais.items():
+            setattr(modulo, nome, funcao)
+        self._originais = {}
+
+
+class MonitorLaco:
+    """Mede travamentos do laço de eventos com um timer de pulsação."""
+
+    def __init__(self, intervalo_ms: int):
+        self.intervalo_ms = intervalo_ms
+        self.timer = QTimer()
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(intervalo_ms)
+        self.timer.timeout.connect(self._pulso)
+        self._atrasos = []
+        self._ultimo = 0.0
+
+    def iniciar(self) -> None:
+        self._atrasos = []
+        self._ultimo = time.perf_counter()
+        self.timer.start()
+
+    def _pulso(self) -> None:
+        agora = time.perf_counter()
+        self._atrasos.append((agora - self._ultimo) * 1000 - self.intervalo_ms)
+        self._ultimo = agora
+
+    def parar(self) -> list:
+        """Para a medição e retorna os atrasos (ms) de cada pulsação."""
+        self.timer.stop()
+        self._pulso()
+        return self._atrasos
+
+
+class Bancada:
+    """Prepara os dados de teste e executa as ações medidas."""
+
+    def __init__(self, app: QApplication, args: argparse.Namespace, pasta_teste: str):
+        self.app = app
+        self.args = args
+        self.pasta_lenta = os.path.join(pasta_teste, 'rede')
+        self.pasta_destino = os.path.join(self.pasta_lenta, 'pedidos')
+        self.pasta_config = os.path.join(pasta_teste, 'local')
+        self.armazenamento = ArmazenamentoLento(self.pasta_lenta, args.latencia_ms)
+        self.monitor = MonitorLaco(args.intervalo_ms)
+        self.janela = None
+        self.resultados = {}
+
+        # Fecha os diálogos modais abertos pelas ações depois de um tempo
+        self._modal_desde = None
+        self.fechador = QTimer()
+        self.fechador.setInterval(20)
+        self.fechador.timeout.connect(self._fechar_modal)
+        self.fechador.start()
+
+    def preparar(self) -> None:
+        """Cria planilha padrão, Pedido existentes e catálogo na pasta lenta (sem latência)."""
+        os.makedirs(self.pasta_destino)
+        os.makedirs(self.pasta_config)
+        # ConfigService() usa a pasta temporária do sistema: isola a configuração real
+        tempfile.tempdir = self.pasta_config
+
+        from service.config_service import ConfigService
+        config_service = ConfigService()
+
+        self.planilha = os.path.join(self.pasta_lenta, 'padrao.xlsx')
+        shutil.copy2(self.args.planilha, self.planilha)
+        config_service.definir_planilha_padrao(self.planilha)
+
+        for i in range(self.args.pedidos):
+            setor = f"Setor {i % 25}"
+            sucesso, mensagem, arquivo = PedidoService.criar_Pedido(setor, self.pasta_destino, self.planilha)
+            if not sucesso:
+                raise RuntimeError(mensagem)
+            config_service.adicionar_historico(arquivo, self.pasta_destino, setor)
+
+        catalogo = os.path.join(self.pasta_lenta, 'catalogo.csv')
+        palavras = ['LUVA', 'NITRILICA', 'PARAFUSO', 'SEXTAVADO', 'CABO', 'ELETRICO', 'LAMPADA', 'LED',
+                    'FITA', 'ISOLANTE', 'TINTA', 'ACRILICA', 'PINCEL', 'BROCA', 'PAPEL', 'TOALHA']
+        aleatorio = random.Random(1)
+        with open(catalogo, 'w', encoding='utf-8', newline='') as f:
+            escritor = csv.writer(f, delimiter=';')
+            escritor.writerow(['Código', 'Descrição', 'Unidade'])
+            for i in range(self.args.itens_catalogo):
+                descricao = ' '.join(aleatorio.sample(palavras, 3)) + f" {i % 97}MM"
+                escritor.writerow([10000 + i, descricao, aleatorio.choice(['UN', 'CX', 'PC'])])
+
+        config_service.definir_config('catalogo_arquivo', catalogo)
+        config_service.definir_config('ultima_pasta', self.pasta_destino)
+        config_service.definir_ultimo_setor('Setor Teste')
+
+    def _fechar_modal(self) -> None:
+        """Fecha o diálogo modal aberto há mais de --tempo-dialogo-ms."""
+        modal = QApplication.activeModalWidget()
+        if not isinstance(modal, QDialog):
+            self._modal_desde = None
+            return
+        agora = time.perf_counter()
+        if self._modal_desde is None:
+            self._modal_desde = agora
+        elif (agora - self._modal_desde) * 1000 >= self.args.tempo_dialogo_ms:
+            self._modal_desde = None
+            modal.done(0)
+
+    def aguardar(self, ms: int) -> None:
+        """Roda o laço de eventos por alguns milissegundos."""
+        laco = QEventLoop()
+        QTimer.singleShot(ms, laco.quit)
+        laco.exec()
+
+    def aguardar_tarefas(self, limite_s: float = 120) -> None:
+        """Roda o laço de eventos até as tarefas em segundo plano terminarem."""
+        inicio = time.perf_counter()
+        while QThreadPool.globalInstance().activeThreadCount() and time.perf_counter() - inicio < limite_s:
+            self.aguardar(20)
+        self.aguardar(self.args.espera_ms)
+
+    def medir(self, nome: str, acao, repeticoes: int = 1) -> None:
+        """Executa a ação pelo laço de eventos, medindo os travamentos até tudo terminar."""
+        atrasos, duracoes = [], []
+        for _ in range(repeticoes):
+            self.monitor.iniciar()
+            inicio = time.perf_counter()
+            QTimer.singleShot(0, acao)
+            self.aguardar(self.args.espera_ms)
+            self.aguardar_tarefas()
+            duracoes.append((time.perf_counter() - inicio) * 1000)
+            atrasos.extend(self.monitor.parar())
+
+        travamentos = sorted(a for a in atrasos if a >= self.args.limiar_ms)
+        self.resultados[nome] = {
+            'execucoes': repeticoes,
+            'duracao_media_ms': round(sum(duracoes) / len(duracoes), 1),
+            'travamentos': len(travamentos),
+            'travamento_max_ms': round(travamentos[-1], 1) if travamentos else 0.0,
+            'travamento_p95_ms': round(percentil(travamentos, 95), 1),
+            'bloqueado_ms': round(sum(travamentos), 1),
+        }
+
+    def digitar(self, campo, texto: str) -> None:
+        """Agenda a digitação do texto, uma tecla a cada --intervalo-teclas-ms."""
+        for i in range(1, len(texto) + 1):
+            QTimer.singleShot(i * self.args.intervalo_teclas_ms, lambda parcial=texto[:i]: campo.setText(parcial))
+
+    def executar(self) -> dict:
+        """Executa todas as ações com o armazenamento lento ativo."""
+        from interface.main_window import MainWindow
+        from interface.itens_dialog import ItensDialog
+        from main import carregar_estilos
+
+        carregar_estilos(self.app)
+        # O diálogo de pasta do sistema não funciona sem tela
+        QFileDialog.getExistingDirectory = staticmethod(lambda *a, **k: self.pasta_destino)
+
+        self.armazenamento.ativar()
+        try:
+            def inicializar():
+                self.janela = MainWindow()
+                self.janela.show()
+
+            self.medir('inicializacao', inicializar)
+            janela = self.janela
+            repeticoes = self.args.repeticoes
+
+            self.medir('selecionar_pasta', janela.selecionar_pasta)
+            self.medir('carregar_historico', janela.carregar_historico, repeticoes)
+            self.medir('alternar_tema', janela.alternar_tema, repeticoes)
+            self.medir('criar_Pedido', janela.criar_Pedido, repeticoes)
+            self.medir('buscar_pedidos', lambda: self.digitar(janela.busca_input, "setor 1"))
+            janela.busca_input.clear()
+            self.aguardar_tarefas()
+            self.medir('abrir_configuracoes', janela.abrir_configuracoes)
+            self.medir('abrir_estatisticas', janela.abrir_estatisticas)
+            self.medir('abrir_itens', janela.abrir_itens)
+
+            def buscar_catalogo():
+                dialogo = ItensDialog(janela.config_service, janela.catalogo, [], janela)
+                dialogo.show()
+                self.digitar(dialogo.busca_input, "luva nitr")
+                QTimer.singleShot(len("luva nitr") * self.args.intervalo_teclas_ms + 50, dialogo.deleteLater)
+
+            self.medir('buscar_catalogo', buscar_catalogo)
+            if janela.ultimo_arquivo_criado:
+                self.medir('visualizar_arquivo', lambda: janela.visualizar_arquivo(janela.ultimo_arquivo_criado))
+        finally:
+            self.armazenamento.desativar()
+            if self.janela is not None:
+                self.janela.close()
+
+        return self.resultados
+
+
+def comparar(atual: dict, anterior: dict, tolerancia: float, margem_ms: float) -> list:
+    """
+    Compara os travamentos com uma execução anterior.
+
+    Returns:
+        Lista de mensagens das ações que pioraram
+    """
+    if atual['latencia_ms'] != anterior.get('latencia_ms'):
+        print(f"Aviso: latência diferente da execução anterior ({anterior.get('latencia_ms')} ms)")
+
+    regressoes = []
+    print(f"\n{'ação':<22} {'máx ant.':>9} {'máx':>8} {'p95 ant.':>9} {'p95':>8}")
+    for nome, medida in atual['acoes'].items():
+        antes = anterior.get('acoes', {}).get(nome)
+        if antes is None:
+            print(f"{nome:<22} {'-':>9} {medida['travamento_max_ms']:>8.1f} {'-':>9} {medida['travamento_p95_ms']:>8.1f}")
+            continue
+        print(
+            f"{nome:<22} {antes['travamento_max_ms']:>9.1f} {medida['travamento_max_ms']:>8.1f} "
+            f"{antes['travamento_p95_ms']:>9.1f} {medida['travamento_p95_ms']:>8.1f}"
+        )
+        for chave in ('travamento_max_ms', 'travamento_p95_ms'):
+            valor, base = medida[chave], antes[chave]
+            if valor > base * tolerancia and valor - base > margem_ms:
+                regressoes.append(f"{nome}: {chave} {base:.1f} -> {valor:.1f} ms")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de responsividade da janela principal")
+    parser.add_argument('--latencia-ms', type=float, default=20, help="Latência por operação de arquivo na pasta de destino")
+    parser.add_argument('--pedidos', type=int, default=200, help="Pedido existentes na pasta de destino")
+    parser.add_argument('--itens-catalogo', type=int, default=20000)
+    parser.add_argument('--repeticoes', type=int, default=5, help="Execuções de cada ação repetível")
+    parser.add_argument('--intervalo-ms', type=int, default=5, help="Intervalo do timer de pulsação")
+    parser.add_argument('--limiar-ms', type=float, default=16, help="Atraso mínimo contado como travamento")
+    parser.add_argument('--espera-ms', type=int, default=300, help="Tempo de laço de eventos após cada ação")
+    parser.add_argument('--tempo-dialogo-ms', type=int, default=300, help="Tempo até fechar os diálogos abertos")
+    parser.add_argument('--intervalo-teclas-ms', type=int, default=80, help="Intervalo entre teclas nas buscas")
+    parser.add_argument('--planilha', default=str(get_resource_path('resources/padrao.xlsx')))
+    parser.add_argument('--saida', help="Grava os resultados neste arquivo JSON")
+    parser.add_argument('--comparar', metavar='JSON', help="Resultados anteriores para comparação")
+    parser.add_argument('--tolerancia', type=float, default=1.5, help="Piora relativa aceita (1.5 = +50%%)")
+    parser.add_argument('--margem-ms', type=float, default=20, help="Piora absoluta ignorada")
+    parser.add_argument('--manter-arquivos', action='store_true', help="Não apaga a pasta temporária")
+    args = parser.parse_args()
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            anterior = json.load(f)
+
+    app = QApplication(sys.argv)
+    pasta_teste = tempfile.mkdtemp(prefix='pedido_responsividade_')
+    try:
+        bancada = Bancada(app, args, pasta_teste)
+        print(f"Preparando {args.pedidos} Pedido e catálogo de {args.itens_catalogo} itens...")
+        bancada.preparar()
+        print(f"Executando ações com latência de {args.latencia_ms:g} ms por operação de arquivo...")
+        acoes = bancada.executar()
+        operacoes = bancada.armazenamento.operacoes
+    finally:
+        if not args.manter_arquivos:
+            shutil.rmtree(pasta_teste, ignore_errors=True)
+
+    resultado = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'plataforma': platform.platform(),
+        'python': platform.python_version(),
+        'latencia_ms': args.latencia_ms,
+        'intervalo_ms': args.intervalo_ms,
+        'limiar_ms': args.limiar_ms,
+        'operacoes_lentas': operacoes,
+        'acoes': acoes,
+    }
+
+    print(f"\n{'ação':<22} {'exec':>4} {'trav.':>5} {'máx ms':>8} {'p95 ms':>8} {'bloq. ms':>9} {'duração ms':>11}")
+    for nome, medida in acoes.items():
+        print(
+            f"{nome:<22} {medida['execucoes']:>4} {medida['travamentos']:>5} "
+            f"{medida['travamento_max_ms']:>8.1f} {medida['travamento_p95_ms']:>8.1f} "
+            f"{medida['bloqueado_ms']:>9.1f} {medida['duracao_media_ms']:>11.1f}"
+        )
+    print(f"Operações de arquivo com latência: {operacoes}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        print(f"Resultados gravados em {args.saida}")
+
+    if anterior is not None:
+        regressoes = comparar(resultado, anterior, args.tolerancia, args.margem_ms)
+        if regressoes:
+            print("\nFALHOU: travamentos maiores que na execução anterior")
+            for mensagem in regressoes:
+                print(f"  {mensagem}")
+            sys.exit(1)
+        print("\nOK: nenhuma ação piorou")
+
+
+if __name__ == "__main__":
+    main()
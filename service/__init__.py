@@ -4,5 +4,6 @@ Módulo de serviços para o sistema de Pedido.
 
 from .requisicao_service import PedidoService
 from .config_service import ConfigService
+from .api_service import PedidoAPIServer
 
-__all__ = ['PedidoService', 'ConfigService']
+__all__ = ['PedidoService', 'ConfigService', 'PedidoAPIServer']
@@ -0,0 +1,317 @@
+"""
+Serviço de API local (JSON/HTTP) para criação de Pedido.
+Permite que outros sistemas (ex.: scripts do ERP) criem Pedido sem
+automatizar a interface gráfica. Escuta apenas em endereços locais.
+"""
+
+import os
+import json
+import math
+import socket
+import threading
+import ipaddress
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+from .config_service import ConfigService
+from .requisicao_service import PedidoService
+from .estatisticas_service import EstatisticasService
+from .armazenamento_service import ArmazenamentoService
+
+
+def _eh_endereco_local(host: str) -> bool:
+    """Verifica se o host é um endereço de loopback."""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class _PedidoAPIHandler(BaseHTTPRequestHandler):
+    """Trata as requisições HTTP da API local."""
+
+    server_version = "EstoquistaExpressAPI/1.0"
+    protocol_version = "HTTP/1.0"
+
+    def log_message(self, format, *args):
+        """Registra requisições apenas no modo verboso."""
+        if self.server.verboso:
+            super().log_message(format, *args)
+
+    def _responder(self, status: int, dados: dict) -> None:
+        """Envia uma resposta JSON."""
+        corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _ler_json(self) -> Tuple[Optional[dict], Optional[str]]:
+        """
+        Lê o corpo da requisição como JSON.
+
+        Returns:
+            Tupla (dados, erro)
+        """
+        try:
+            tamanho = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            return None, "Content-Length inválido"
+
+        if tamanho > self.server.tamanho_maximo_corpo:
+            return None, "Corpo da requisição muito grande"
+
+        try:
+            dados = json.loads(self.rfile.read(tamanho) or b'{}')
+        except (ValueError, UnicodeDecodeError):
+            return None, "JSON inválido"
+
+        if not isinstance(dados, dict):
+            return None, "O corpo deve ser um objeto JSON"
+        return dados, None
+
+    def do_GET(self):
+        """Rotas de consulta."""
+        url = urlparse(self.path)
+        parametros = parse_qs(url.query)
+
+        if url.path == '/saude':
+            self._responder(200, {'sucesso': True, 'mensagem': 'ok'})
+        elif url.path == '/proximo-numero':
+            pasta = parametros.get('pasta', [None])[0] or self.server.pasta_padrao()
+            if not pasta:
+                self._responder(400, {'sucesso': False, 'mensagem': "Pasta não informada"})
+                return
+            self._responder(200, {
+                'sucesso': True,
+                'pasta': pasta,
+                'numero': PedidoService.obter_proximo_numero(pasta, self.server.layout())
+            })
+        elif url.path == '/historico':
+            historico = [
+                {'arquivo': item[0], 'pasta': item[1], 'setor': item[2]}
+                for item in reversed(self.server.config_service.obter_historico())
+                if isinstance(item, list) and len(item) == 3
+            ]
+            try:
+                limite = int(parametros.get('limite', [len(historico)])[0])
+            except ValueError:
+                limite = len(historico)
+            self._responder(200, {'sucesso': True, 'historico': historico[:max(limite, 0)]})
+        else:
+            self._responder(404, {'sucesso': False, 'mensagem': "Rota não encontrada"})
+
+    def do_POST(self):
+        """Rotas de criação."""
+        url = urlparse(self.path)
+
+        if url.path not in ('/pedidos', '/pedidos/lote'):
+            self._responder(404, {'sucesso': False, 'mensagem': "Rota não encontrada"})
+            return
+
+        dados, erro = self._ler_json()
+        if erro:
+            self._responder(400, {'sucesso': False, 'mensagem': erro})
+            return
+
+        if url.path == '/pedidos':
+            resultado = self.server.criar_pedido(dados)
+            self._responder(201 if resultado['sucesso'] else 422, resultado)
+            return
+
+        pedidos = dados.get('pedidos')
+        if not isinstance(pedidos, list) or not pedidos:
+            self._responder(400, {'sucesso': False, 'mensagem': "Informe a lista 'pedidos'"})
+            return
+        if len(pedidos) > self.server.tamanho_maximo_lote:
+            self._responder(400, {
+                'sucesso': False,
+                'mensagem': f"Lote excede o limite de {self.server.tamanho_maximo_lote} Pedido"
+            })
+            return
+
+        resultados = [
+            self.server.criar_pedido(p) if isinstance(p, dict)
+            else {'sucesso': False, 'mensagem': "Item do lote inválido"}
+            for p in pedidos
+        ]
+        self._responder(200, {
+            'sucesso': all(r['sucesso'] for r in resultados),
+            'resultados': resultados
+        })
+
+
+class PedidoAPIServer(HTTPServer):
+    """
+    Servidor HTTP local com pool de workers limitado.
+
+    As conexões aceitas são enfileiradas para um pool fixo de threads.
+    Quando workers e fila estão cheios, a conexão é recusada imediatamente
+    com HTTP 503 (backpressure) em vez de acumular memória e latência.
+    """
+
+    def __init__(
+        self,
+        config_service: Optional[ConfigService] = None,
+        host: str = '127.0.0.1',
+        porta: int = 8765,
+        max_workers: int = 4,
+        max_fila: int = 32,
+        verboso: bool = False
+    ):
+        """
+        Inicializa o servidor.
+
+        Args:
+            config_service: Serviço de configuração (planilha padrão, pasta e histórico)
+            host: Endereço de escuta (somente loopback)
+            porta: Porta TCP
+            max_workers: Número de threads que processam requisições
+            max_fila: Conexões aguardando worker antes de responder 503
+            verboso: Registra cada requisição no stderr
+        """
+        if not _eh_endereco_local(host):
+            raise ValueError(f"A API só pode escutar em endereço local: {host}")
+
+        self.config_service = config_service or ConfigService()
+        self.estatisticas = EstatisticasService(self.config_service.config_dir)
+        self.verboso = verboso
+        self.tamanho_maximo_corpo = 1024 * 1024
+        self.tamanho_maximo_lote = 500
+        self.timeout_conexao = 10
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='pedido-api'
+        )
+        self._vagas = threading.BoundedSemaphore(max_workers + max_fila)
+
+        super().__init__((host, porta), _PedidoAPIHandler)
+
+    def pasta_padrao(self) -> str:
+        """Pasta usada quando a requisição não informa uma."""
+        return self.config_service.obter_config('ultima_pasta', '')
+
+    def layout(self) -> str:
+        """Layout da pasta de destino configurado no aplicativo."""
+        return self.config_service.obter_config('layout_pastas', PedidoService.LAYOUT_PLANO)
+
+    def armazenamento(self) -> str:
+        """Modo de armazenamento das Pedido configurado no aplicativo."""
+        return self.config_service.obter_config('armazenamento', ArmazenamentoService.COMPLETO)
+
+    def criar_pedido(self, dados: dict) -> dict:
+        """
+        Cria uma Pedido a partir dos dados da requisição.
+
+        Args:
+            dados: Dicionário com 'setor' e, opcionalmente, 'pasta', 'planilha_padrao'
+                e 'itens' (lista de {'descricao', 'unidade', 'quantidade'})
+
+        Returns:
+            Dicionário de resposta com sucesso, mensagem, numero e arquivo
+        """
+        setor = dados.get('setor')
+        pasta = dados.get('pasta') or self.pasta_padrao()
+        planilha = dados.get('planilha_padrao') or self.config_service.obter_planilha_padrao()
+
+        if not isinstance(setor, str):
+            return {'sucesso': False, 'mensagem': "Setor não informado"}
+        if not pasta:
+            return {'sucesso': False, 'mensagem': "Pasta de destino não informada"}
+        if not planilha:
+            return {'sucesso': False, 'mensagem': "Planilha padrão não configurada"}
+
+        itens = []
+        lista = dados.get('itens') or []
+        if not isinstance(lista, list):
+            return {'sucesso': False, 'mensagem': "'itens' deve ser uma lista"}
+        for item in lista:
+            try:
+                descricao = str(item['descricao']).strip()
+                quantidade = item['quantidade']
+                if isinstance(quantidade, bool):
+                    raise TypeError
+                quantidade = float(quantidade)
+            except (KeyError, TypeError, ValueError, AttributeError):
+                return {'sucesso': False, 'mensagem': "Item inválido: informe descricao e quantidade"}
+            # "nan", "inf" e negativos passam pelo float() mas corrompem planilha e estatísticas
+            if not descricao or not math.isfinite(quantidade) or quantidade <= 0:
+                return {
+                    'sucesso': False,
+                    'mensagem': f"Item inválido: {descricao or '(sem descrição)'} (quantidade deve ser maior que zero)"
+                }
+            itens.append((descricao, str(item.get('unidade') or ''), quantidade))
+
+        sucesso, mensagem, arquivo = PedidoService.criar_Pedido(
+            setor, pasta, planilha, self.layout(), self.armazenamento(), itens
+        )
+        if not sucesso:
+            return {'sucesso': False, 'mensagem': mensagem}
+
+        self.config_service.adicionar_historico(arquivo, pasta, setor.strip())
+        self.estatisticas.registrar_pedido(setor, itens=[(d, q) for d, _, q in itens])
+        return {
+            'sucesso': True,
+            'mensagem': "Pedido criada com sucesso",
+            'numero': os.path.splitext(os.path.basename(arquivo))[0],
+            'arquivo': arquivo
+        }
+
+    def verify_request(self, request, client_address) -> bool:
+        """Aceita apenas clientes locais."""
+        return _eh_endereco_local(client_address[0])
+
+    def process_request(self, request, client_address):
+        """Enfileira a conexão no pool ou recusa com 503 se estiver cheio."""
+        if not self._vagas.acquire(blocking=False):
+            self._recusar(request)
+            return
+
+        try:
+            self._executor.submit(self._processar, request, client_address)
+        except RuntimeError:
+            # Executor encerrado durante o desligamento
+            self._vagas.release()
+            self.shutdown_request(request)
+
+    def _processar(self, request, client_address):
+        """Executa a requisição em uma thread do pool."""
+        try:
+            request.settimeout(self.timeout_conexao)
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._vagas.release()
+
+    def _recusar(self, request):
+        """Responde 503 sem ocupar um worker."""
+        corpo = json.dumps({
+            'sucesso': False,
+            'mensagem': "Servidor ocupado, tente novamente"
+        }).encode('utf-8')
+        resposta = (
+            b"HTTP/1.0 503 Service Unavailable\r\n"
+            b"Content-Type: application/json; charset=utf-8\r\n"
+            b"Retry-After: 1\r\n"
+            b"Content-Length: " + str(len(corpo)).encode('ascii') + b"\r\n\r\n" + corpo
+        )
+        try:
+            request.settimeout(1)
+            request.sendall(resposta)
+        except (OSError, socket.timeout):
+            pass
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        """Encerra o socket e aguarda as requisições em andamento."""
+        super().server_close()
+        self._executor.shutdown(wait=True)
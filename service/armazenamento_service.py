@@ -0,0 +1,274 @@
+"""
+Serviço de armazenamento compacto de Pedido.
+No modo compacto a pasta de destino guarda uma única cópia de cada versão da
+planilha padrão (endereçada pelo hash do conteúdo) e, para cada Pedido, um
+pequeno registro com as células preenchidas. O .xlsx real só é gerado quando
+a Pedido é aberta (restaurada na própria pasta) ou pré-visualizada (cópia em
+cache). As estatísticas leem o registro direto, sem materializar.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+from openpyxl import load_workbook
+
+
+class ArmazenamentoService:
+    """Grava e materializa Pedido no modo de armazenamento compacto."""
+
+    # Modos de armazenamento
+    COMPLETO = 'completo'   # pasta/0001.xlsx (cópia inteira da planilha padrão)
+    COMPACTO = 'compacto'   # pasta/0001.pedido + pasta/.modelos/<hash>.xlsx
+
+    EXTENSAO_DELTA = '.pedido'
+    PASTA_MODELOS = '.modelos'
+    # 2: datas gravadas como {"$data": ISO} (a versão 1 só tinha texto)
+    VERSAO = 2
+    VERSOES_LIDAS = (1, 2)
+
+    # Cópias materializadas mantidas no cache (as menos usadas são removidas)
+    LIMITE_CACHE = 32
+
+    # Hash das planilhas padrão já calculados: caminho -> (mtime_ns, tamanho, hash)
+    _hashes: Dict[str, tuple] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def eh_delta(caminho: str) -> bool:
+        """Verifica se o caminho é um registro do modo compacto."""
+        return caminho.lower().endswith(ArmazenamentoService.EXTENSAO_DELTA)
+
+    @staticmethod
+    def nome_alternativo(caminho: str) -> str:
+        """Troca a extensão entre .xlsx e .pedido (0001.xlsx <-> 0001.pedido)."""
+        base, _ = os.path.splitext(caminho)
+        if ArmazenamentoService.eh_delta(caminho):
+            return f"{base}.xlsx"
+        return f"{base}{ArmazenamentoService.EXTENSAO_DELTA}"
+
+    @staticmethod
+    def localizar(caminho: str) -> Optional[str]:
+        """
+        Localiza uma Pedido que pode ter sido compactada ou restaurada
+        depois de registrada no histórico.
+
+        Args:
+            caminho: Caminho registrado (.xlsx ou .pedido)
+
+        Returns:
+            Caminho existente ou None
+        """
+        for candidato in (caminho, ArmazenamentoService.nome_alternativo(caminho)):
+            if os.path.exists(candidato):
+                return candidato
+        return None
+
+    @staticmethod
+    def hash_arquivo(caminho: str) -> str:
+        """Calcula o SHA-256 do arquivo (reaproveitado enquanto não for alterado)."""
+        chave = os.path.abspath(caminho)
+        info = os.stat(caminho)
+        with ArmazenamentoService._lock:
+            guardado = ArmazenamentoService._hashes.get(chave)
+        if guardado and guardado[:2] == (info.st_mtime_ns, info.st_size):
+            return guardado[2]
+
+        sha = hashlib.sha256()
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(bloco)
+        resultado = sha.hexdigest()
+
+        with ArmazenamentoService._lock:
+            ArmazenamentoService._hashes[chave] = (info.st_mtime_ns, info.st_size, resultado)
+        return resultado
+
+    @staticmethod
+    def guardar_modelo(pasta: str, arquivo_padrao: str) -> str:
+        """
+        Garante uma cópia da planilha padrão em pasta/.modelos, nomeada pelo hash.
+
+        Args:
+            pasta: Pasta de destino (raiz)
+            arquivo_padrao: Planilha padrão atual
+
+        Returns:
+            Hash da versão da planilha padrão
+        """
+        modelo = ArmazenamentoService.hash_arquivo(arquivo_padrao)
+        pasta_modelos = os.path.join(pasta, ArmazenamentoService.PASTA_MODELOS)
+        destino = os.path.join(pasta_modelos, f"{modelo}.xlsx")
+        if not os.path.exists(destino):
+            os.makedirs(pasta_modelos, exist_ok=True)
+            temporario = f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.copyfile(arquivo_padrao, temporario)
+            os.replace(temporario, destino)
+        return modelo
+
+    @staticmethod
+    def gravar_delta(caminho: str, modelo: str, celulas: dict) -> None:
+        """
+        Grava o registro de uma Pedido compacta de forma atômica.
+
+        Args:
+            caminho: Caminho do registro (NNNN.pedido)
+            modelo: Hash da planilha padrão usada
+            celulas: Valores preenchidos na aba ativa ({'C4': setor, ...})
+        """
+        temporario = f"{caminho}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(
+                {'versao': ArmazenamentoService.VERSAO, 'modelo': modelo, 'celulas': celulas},
+                f, ensure_ascii=False, separators=(',', ':'),
+                default=ArmazenamentoService._codificar_valor
+            )
+        os.replace(temporario, caminho)
+
+    @staticmethod
+    def _codificar_valor(valor) -> dict:
+        """Converte para JSON os valores de célula que não são texto nem número."""
+        if isinstance(valor, datetime):
+            return {'$data': valor.isoformat()}
+        raise TypeError(f"Valor de célula não suportado: {type(valor).__name__}")
+
+    @staticmethod
+    def _decodificar_valor(objeto: dict):
+        """Inverso de _codificar_valor, aplicado a cada objeto lido do JSON."""
+        if len(objeto) == 1 and '$data' in objeto:
+            return datetime.fromisoformat(objeto['$data'])
+        return objeto
+
+    @staticmethod
+    def ler_delta(caminho: str) -> dict:
+        """
+        Lê o registro de uma Pedido compacta.
+
+        Returns:
+            Dicionário com 'modelo' e 'celulas'
+
+        Raises:
+            ValueError: Se o registro estiver ilegível ou em versão desconhecida
+        """
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f, object_hook=ArmazenamentoService._decodificar_valor)
+        except OSError as e:
+            raise ValueError(f"Erro ao ler registro: {str(e)}")
+
+        if not isinstance(dados, dict) or dados.get('versao') not in ArmazenamentoService.VERSOES_LIDAS:
+            raise ValueError("Registro em formato desconhecido")
+        if not isinstance(dados.get('modelo'), str) or not isinstance(dados.get('celulas'), dict):
+            raise ValueError("Registro incompleto")
+        return dados
+
+    @staticmethod
+    def localizar_modelo(caminho_delta: str, modelo: str) -> str:
+        """
+        Encontra a planilha padrão de um registro (na raiz da pasta de destino,
+        que fica até dois níveis acima no layout por ano/mês).
+
+        Raises:
+            FileNotFoundError: Se a versão da planilha padrão não existir
+        """
+        pasta = os.path.dirname(os.path.abspath(caminho_delta))
+        for _ in range(3):
+            candidato = os.path.join(pasta, ArmazenamentoService.PASTA_MODELOS, f"{modelo}.xlsx")
+            if os.path.exists(candidato):
+                return candidato
+            pasta = os.path.dirname(pasta)
+        raise FileNotFoundError(f"Planilha padrão {modelo[:12]} não encontrada em {ArmazenamentoService.PASTA_MODELOS}")
+
+    @staticmethod
+    def _gerar_xlsx(caminho_delta: str, destino: str) -> None:
+        """Aplica o registro sobre a planilha padrão e grava o .xlsx em destino."""
+        dados = ArmazenamentoService.ler_delta(caminho_delta)
+        modelo = ArmazenamentoService.localizar_modelo(caminho_delta, dados['modelo'])
+
+        # Mesmo procedimento do modo completo: carregar o modelo, preencher, salvar
+        wb = load_workbook(modelo)
+        try:
+            ws = wb.active
+            for referencia, valor in dados['celulas'].items():
+                ws[referencia] = valor
+            temporario = f"{destino}.tmp"
+            wb.save(temporario)
+        finally:
+            wb.close()
+        os.replace(temporario, destino)
+
+        # Mantém a data da Pedido (usada na migração por ano/mês)
+        info = os.stat(caminho_delta)
+        os.utime(destino, ns=(info.st_atime_ns, info.st_mtime_ns))
+
+    @staticmethod
+    def materializar(caminho_delta: str, cache_dir: str, limite: int = LIMITE_CACHE) -> str:
+        """
+        Obtém uma cópia .xlsx da Pedido compacta para leitura (usada pela
+        pré-visualização).
+
+        As cópias ficam em cache_dir/materializadas, identificadas pelo
+        conteúdo do registro (uma alteração gera outra cópia). A data de
+        modificação marca o último uso; além do limite, as menos usadas
+        são removidas.
+
+        Args:
+            caminho_delta: Registro da Pedido (.pedido)
+            cache_dir: Pasta do cache (ex.: pasta de configurações)
+            limite: Quantidade máxima de cópias mantidas
+
+        Returns:
+            Caminho da cópia materializada
+        """
+        with open(caminho_delta, 'rb') as f:
+            chave = hashlib.sha1(f.read()).hexdigest()[:20]
+
+        raiz = os.path.join(cache_dir, 'materializadas')
+        pasta = os.path.join(raiz, chave)
+        nome = os.path.basename(ArmazenamentoService.nome_alternativo(caminho_delta))
+        destino = os.path.join(pasta, nome)
+
+        if os.path.exists(destino):
+            os.utime(pasta)
+            return destino
+
+        os.makedirs(pasta, exist_ok=True)
+        ArmazenamentoService._gerar_xlsx(caminho_delta, destino)
+        os.utime(pasta)
+        ArmazenamentoService._limpar_cache(raiz, limite)
+        return destino
+
+    @staticmethod
+    def _limpar_cache(raiz: str, limite: int) -> None:
+        """Remove as cópias menos usadas recentemente além do limite."""
+        with os.scandir(raiz) as it:
+            entradas = sorted(
+                (e for e in it if e.is_dir()),
+                key=lambda e: e.stat().st_mtime_ns,
+                reverse=True
+            )
+        for entrada in entradas[limite:]:
+            shutil.rmtree(entrada.path, ignore_errors=True)
+
+    @staticmethod
+    def restaurar(caminho_delta: str) -> str:
+        """
+        Converte uma Pedido compacta em .xlsx completo na própria pasta.
+
+        Usado ao abrir a Pedido para edição: as alterações feitas no Excel
+        ficam no arquivo real. O registro é removido em seguida.
+
+        Args:
+            caminho_delta: Registro da Pedido (.pedido)
+
+        Returns:
+            Caminho do .xlsx gerado
+        """
+        destino = ArmazenamentoService.nome_alternativo(caminho_delta)
+        if not os.path.exists(destino):
+            ArmazenamentoService._gerar_xlsx(caminho_delta, destino)
+        os.remove(caminho_delta)
+        return destino
@@ -0,0 +1,331 @@
+"""
+Serviço de catálogo de itens do almoxarifado.
+Importa a planilha (.xlsx) ou CSV do catálogo para um banco SQLite com índice
+de texto (FTS5) na pasta de configurações. A reimportação só ocorre quando a
+data de modificação do arquivo muda e grava apenas as linhas alteradas.
+"""
+
+import os
+import csv
+import difflib
+import sqlite3
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+from openpyxl import load_workbook
+
+
+def _normalizar(texto: str) -> str:
+    """Minúsculas e sem acentos ('Nitrílica' -> 'nitrilica')."""
+    decomposto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+class CatalogoService:
+    """Catálogo de itens com busca por código, prefixo e aproximada."""
+
+    # Nomes de coluna reconhecidos no cabeçalho do catálogo
+    COLUNAS = {
+        'codigo': ('codigo', 'cod', 'cód', 'código', 'item'),
+        'descricao': ('descricao', 'descrição', 'produto', 'material', 'nome'),
+        'unidade': ('unidade', 'unid', 'un', 'und'),
+    }
+
+    def __init__(self, config_dir: str):
+        """
+        Inicializa o catálogo (cria o banco se não existir).
+
+        Args:
+            config_dir: Pasta onde o banco do catálogo é gravado
+        """
+        self.arquivo_banco = os.path.join(config_dir, 'catalogo.db')
+        # Importação e consultas usam conexões separadas (WAL): a busca não
+        # espera uma reimportação em andamento
+        self._lock = threading.RLock()
+        self._lock_leitura = threading.Lock()
+        # Termos do índice agrupados por (primeira letra, tamanho), para a busca
+        # aproximada; montado em atualizar(), que roda em segundo plano
+        self._vocabulario: Optional[Dict[tuple, List[str]]] = None
+
+        self._conexao = sqlite3.connect(self.arquivo_banco, check_same_thread=False)
+        self._conexao.executescript("""
+            CREATE TABLE IF NOT EXISTS itens (
+                id INTEGER PRIMARY KEY,
+                codigo TEXT NOT NULL UNIQUE COLLATE NOCASE,
+                descricao TEXT NOT NULL,
+                unidade TEXT NOT NULL DEFAULT ''
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS itens_fts USING fts5(
+                codigo, descricao,
+                content='itens', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS itens_vocab USING fts5vocab(itens_fts, row);
+            CREATE TABLE IF NOT EXISTS origem (
+                chave TEXT PRIMARY KEY,
+                valor TEXT
+            );
+        """)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._leitura = sqlite3.connect(self.arquivo_banco, check_same_thread=False)
+
+    def fechar(self) -> None:
+        """Fecha a conexão com o banco."""
+        with self._lock, self._lock_leitura:
+            self._leitura.close()
+            self._conexao.close()
+
+    def total(self) -> int:
+        """Quantidade de itens no catálogo."""
+        with self._lock_leitura:
+            return self._leitura.execute("SELECT COUNT(*) FROM itens").fetchone()[0]
+
+    def arquivo_origem(self) -> Optional[str]:
+        """Arquivo de onde o catálogo foi importado."""
+        with self._lock_leitura:
+            linha = self._leitura.execute("SELECT valor FROM origem WHERE chave = 'arquivo'").fetchone()
+        return linha[0] if linha else None
+
+    @staticmethod
+    def _ler_linhas(arquivo: str):
+        """Lê as linhas do catálogo (.xlsx em modo read_only ou .csv)."""
+        if arquivo.lower().endswith('.csv'):
+            for codificacao in ('utf-8-sig', 'cp1252'):
+                try:
+                    with open(arquivo, 'r', encoding=codificacao, newline='') as f:
+                        amostra = f.read(4096)
+                        f.seek(0)
+                        delimitador = ';' if amostra.count(';') >= amostra.count(',') else ','
+                        return list(csv.reader(f, delimiter=delimitador))
+                except UnicodeDecodeError:
+                    continue
+            raise ValueError("Codificação do CSV não reconhecida")
+
+        wb = load_workbook(arquivo, read_only=True, data_only=True)
+        try:
+            return [
+                ['' if v is None else str(v) for v in linha]
+                for linha in wb.active.iter_rows(values_only=True)
+            ]
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _localizar_colunas(cabecalho: list) -> Tuple[Optional[Dict[str, int]], bool]:
+        """
+        Identifica as colunas de código, descrição e unidade.
+
+        Returns:
+            Tupla (colunas, possui_cabecalho); sem cabeçalho reconhecido usa A, B e C
+        """
+        nomes = [_normalizar(str(c)).strip() for c in cabecalho]
+        colunas = {}
+        for campo, aceitos in CatalogoService.COLUNAS.items():
+            aceitos = {_normalizar(a) for a in aceitos}
+            for i, nome in enumerate(nomes):
+                if nome in aceitos and i not in colunas.values():
+                    colunas[campo] = i
+                    break
+
+        if 'codigo' in colunas and 'descricao' in colunas:
+            return colunas, True
+        return {'codigo': 0, 'descricao': 1, 'unidade': 2}, False
+
+    def atualizar(self, arquivo: str, forcar: bool = False) -> Tuple[bool, str]:
+        """
+        Importa o catálogo se o arquivo mudou desde a última importação.
+
+        Apenas itens novos, alterados ou removidos são gravados, e o índice
+        de texto é atualizado pelas mesmas linhas. Ao final é montado o
+        vocabulário da busca aproximada.
+
+        Args:
+            arquivo: Planilha (.xlsx) ou CSV do catálogo
+            forcar: Reimporta mesmo sem alteração no arquivo
+
+        Returns:
+            Tupla (sucesso, mensagem)
+        """
+        if not os.path.exists(arquivo):
+            return False, f"Catálogo não encontrado: {arquivo}"
+
+        info = os.stat(arquivo)
+        assinatura = f"{os.path.abspath(arquivo)}|{info.st_mtime_ns}|{info.st_size}"
+        with self._lock:
+            linha = self._conexao.execute("SELECT valor FROM origem WHERE chave = 'assinatura'").fetchone()
+        if not forcar and linha and linha[0] == assinatura:
+            if self._vocabulario is None:
+                self._montar_vocabulario()
+            return True, f"Catálogo atualizado ({self.total()} itens)"
+
+        try:
+            linhas = self._ler_linhas(arquivo)
+        except Exception as e:
+            return False, f"Erro ao ler catálogo: {str(e)}"
+        if not linhas:
+            return False, "Catálogo vazio"
+
+        colunas, possui_cabecalho = self._localizar_colunas(linhas[0])
+        if possui_cabecalho:
+            linhas = linhas[1:]
+
+        novos = {}
+        for linha in linhas:
+            valor = lambda campo: (
+                str(linha[colunas[campo]]).strip()
+                if campo in colunas and colunas[campo] < len(linha) else ''
+            )
+            codigo, descricao = valor('codigo'), valor('descricao')
+            if codigo and descricao:
+                novos[codigo.upper()] = (codigo, descricao, valor('unidade'))
+
+        with self._lock, self._conexao:
+            atuais = {
+                codigo.upper(): (id_, codigo, descricao, unidade)
+                for id_, codigo, descricao, unidade in self._conexao.execute(
+                    "SELECT id, codigo, descricao, unidade FROM itens"
+                )
+            }
+
+            removidos = [atuais[c] for c in atuais.keys() - novos.keys()]
+            alterados = [
+                (atuais[c], novos[c]) for c in atuais.keys() & novos.keys()
+                if atuais[c][1:] != novos[c]
+            ]
+            incluidos = [novos[c] for c in novos.keys() - atuais.keys()]
+
+            # Tabela de conteúdo externo: o índice recebe 'delete' com os valores antigos
+            for id_, codigo, descricao, _ in removidos + [antigo for antigo, _ in alterados]:
+                self._conexao.execute(
+                    "INSERT INTO itens_fts(itens_fts, rowid, codigo, descricao) VALUES('delete', ?, ?, ?)",
+                    (id_, codigo, descricao)
+                )
+            self._conexao.executemany("DELETE FROM itens WHERE id = ?", [(r[0],) for r in removidos])
+
+            for (id_, _, _, _), (codigo, descricao, unidade) in alterados:
+                self._conexao.execute(
+                    "UPDATE itens SET codigo = ?, descricao = ?, unidade = ? WHERE id = ?",
+                    (codigo, descricao, unidade, id_)
+                )
+                self._conexao.execute(
+                    "INSERT INTO itens_fts(rowid, codigo, descricao) VALUES(?, ?, ?)",
+                    (id_, codigo, descricao)
+                )
+
+            for codigo, descricao, unidade in incluidos:
+                cursor = self._conexao.execute(
+                    "INSERT INTO itens(codigo, descricao, unidade) VALUES(?, ?, ?)",
+                    (codigo, descricao, unidade)
+                )
+                self._conexao.execute(
+                    "INSERT INTO itens_fts(rowid, codigo, descricao) VALUES(?, ?, ?)",
+                    (cursor.lastrowid, codigo, descricao)
+                )
+
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO origem(chave, valor) VALUES(?, ?)",
+                [('assinatura', assinatura), ('arquivo', os.path.abspath(arquivo))]
+            )
+
+        self._montar_vocabulario()
+        return True, (
+            f"Catálogo importado: {len(novos)} itens "
+            f"({len(incluidos)} novos, {len(alterados)} alterados, {len(removidos)} removidos)"
+        )
+
+    def _montar_vocabulario(self) -> None:
+        """Agrupa os termos do índice para a busca aproximada (pela conexão de escrita)."""
+        vocabulario = {}
+        with self._lock:
+            for (palavra,) in self._conexao.execute("SELECT term FROM itens_vocab"):
+                vocabulario.setdefault((palavra[:1], len(palavra)), []).append(palavra)
+        # Troca de uma vez: as buscas em andamento seguem com o vocabulário anterior
+        self._vocabulario = vocabulario
+
+    def _termos_proximos(self, termo: str) -> List[str]:
+        """Termos do índice parecidos com o informado (erros de digitação)."""
+        vocabulario = self._vocabulario
+        if vocabulario is None:
+            # Ainda não montado (atualizar() em andamento): só prefixos
+            return []
+
+        candidatos = []
+        for tamanho in range(len(termo) - 2, len(termo) + 3):
+            candidatos.extend(vocabulario.get((termo[:1], tamanho), ()))
+        return difflib.get_close_matches(termo, candidatos, n=3, cutoff=0.75)
+
+    def buscar(self, consulta: str, limite: int = 20) -> List[Tuple[str, str, str]]:
+        """
+        Busca itens por código, por prefixo das palavras e, sem resultados
+        suficientes, de forma aproximada.
+
+        Args:
+            consulta: Texto digitado (ex.: "luv nitr" ou "10234")
+            limite: Máximo de resultados
+
+        Returns:
+            Lista de (codigo, descricao, unidade), os mais relevantes primeiro
+        """
+        termos = [t for t in _normalizar(consulta).replace('"', ' ').split() if t]
+        if not termos:
+            return []
+
+        with self._lock_leitura:
+            resultados = {}
+
+            # 1. Código exato ou começando pelo texto digitado
+            if len(termos) == 1:
+                for id_, codigo, descricao, unidade in self._leitura.execute(
+                    "SELECT id, codigo, descricao, unidade FROM itens "
+                    "WHERE codigo >= ? AND codigo < ? ORDER BY length(codigo), codigo LIMIT ?",
+                    (termos[0], termos[0] + '￿', limite)
+                ):
+                    resultados[id_] = (codigo, descricao, unidade)
+
+            # Uma única letra casaria com quase todo o catálogo
+            if len(termos) == 1 and len(termos[0]) < 2:
+                return list(resultados.values())
+
+            # 2. Todas as palavras como prefixo no código ou na descrição
+            expressao = ' AND '.join(f'"{t}"*' for t in termos)
+            self._completar(resultados, expressao, limite)
+
+            # 3. Aproximada: troca palavras desconhecidas pelas mais parecidas
+            # (códigos numéricos não entram, já foram buscados por faixa)
+            if len(resultados) < limite:
+                partes = []
+                for termo in termos:
+                    proximos = self._termos_proximos(termo) if len(termo) >= 3 and not termo.isdigit() else []
+                    opcoes = [f'"{termo}"*'] + [f'"{p}"' for p in proximos if p != termo]
+                    partes.append(f"({' OR '.join(opcoes)})")
+                self._completar(resultados, ' AND '.join(partes), limite, ordenar=False)
+
+            return list(resultados.values())[:limite]
+
+    def _completar(self, resultados: dict, expressao: str, limite: int, ordenar: bool = True) -> None:
+        """
+        Acrescenta os resultados de uma consulta FTS até o limite.
+
+        As descrições mais curtas (mais próximas do texto digitado) vêm
+        primeiro; o bm25 do FTS5 custaria vários milissegundos em palavras
+        comuns a milhares de itens. Sem ordenar, a consulta para nos
+        primeiros resultados encontrados.
+        """
+        faltam = limite - len(resultados)
+        if faltam <= 0:
+            return
+        ordem = " ORDER BY length(i.descricao), i.descricao" if ordenar else ""
+        try:
+            cursor = self._leitura.execute(
+                "SELECT i.id, i.codigo, i.descricao, i.unidade FROM itens_fts "
+                "JOIN itens i ON i.id = itens_fts.rowid "
+                f"WHERE itens_fts MATCH ?{ordem} LIMIT ?",
+                (expressao, limite)
+            )
+        except sqlite3.OperationalError:
+            return
+        for id_, codigo, descricao, unidade in cursor:
+            if id_ not in resultados:
+                resultados[id_] = (codigo, descricao, unidade)
+                if len(resultados) >= limite:
+                    break
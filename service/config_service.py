@@ -4,26 +4,46 @@ Salva e carrega configurações do sistema em formato JSON.
 """
 
 import os
+import csv
 import json
 import tempfile
+import threading
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+from .trava_arquivo import TravaArquivo
 
 
 class ConfigService:
     """Serviço para gerenciar configurações do aplicativo."""
     
-    def __init__(self):
-        """Inicializa o serviço de configuração."""
+    # Limite de itens exibidos no histórico
+    LIMITE_HISTORICO = 50
+    
+    def __init__(self, config_dir: Optional[str] = None):
+        """
+        Inicializa o serviço de configuração.
+        
+        Args:
+            config_dir: Pasta das configurações (padrão: pasta temporária do sistema)
+        """
+        # Protege leitura/escrita quando usado por várias threads (API local)
+        self._lock = threading.RLock()
+        
         # Usar pasta temporária do Windows para persistência
-        temp_dir = tempfile.gettempdir()
-        self.config_dir = os.path.join(temp_dir, "PedidoAlmoxarifado")
+        if config_dir is None:
+            config_dir = os.path.join(tempfile.gettempdir(), "PedidoAlmoxarifado")
+        self.config_dir = config_dir
         
         # Criar diretório se não existir
         os.makedirs(self.config_dir, exist_ok=True)
         
         self.config_file = os.path.join(self.config_dir, "config.json")
-        self.config = self._carregar_config()
+        # Registro completo (sem limite) de todas as Pedido criadas, uma por linha
+        self.historico_file = os.path.join(self.config_dir, "historico.csv")
+        with TravaArquivo(self.config_file):
+            self.config = self._carregar_config()
     
     def _carregar_config(self) -> dict:
         """Carrega as configurações do arquivo JSON."""
@@ -35,14 +55,33 @@ class ConfigService:
                 return {}
         return {}
     
+    def _alterar_config(self, alterar: Callable[[dict], None]) -> bool:
+        """
+        Relê o arquivo, aplica a alteração e grava, sob trava entre processos.
+        
+        O aplicativo e a API local gravam o mesmo config.json; gravar a cópia
+        em memória apagaria o que o outro processo gravou nesse meio tempo.
+        
+        Args:
+            alterar: Função que modifica o dicionário de configurações
+            
+        Returns:
+            True se salvo com sucesso, False caso contrário
+        """
+        with self._lock, TravaArquivo(self.config_file):
+            self.config = self._carregar_config()
+            alterar(self.config)
+            return self._salvar_config()
+    
     def _salvar_config(self) -> bool:
         """Salva as configurações no arquivo JSON."""
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4, ensure_ascii=False)
-            return True
-        except Exception as e:
-            return False
+        with self._lock:
+            try:
+                with open(self.config_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.config, f, indent=4, ensure_ascii=False)
+                return True
+            except Exception as e:
+                return False
     
     def obter_planilha_padrao(self) -> Optional[str]:
         """
@@ -66,8 +105,7 @@ class ConfigService:
         if not os.path.exists(caminho):
             return False
         
-        self.config['planilha_padrao'] = caminho
-        return self._salvar_config()
+        return self._alterar_config(lambda config: config.update({'planilha_padrao': caminho}))
     
     def obter_config(self, chave: str, padrao=None):
         """Obtém uma configuração específica."""
@@ -81,8 +119,7 @@ class ConfigService:
             chave: Chave da configuração
             valor: Valor a ser salvo
         """
-        self.config[chave] = valor
-        self._salvar_config()
+        self._alterar_config(lambda config: config.update({chave: valor}))
     
     def obter_ultimo_setor(self) -> str:
         """
@@ -100,5 +137,113 @@ class ConfigService:
         Args:
             setor: Nome do setor
         """
-        self.config['ultimo_setor'] = setor
-        self._salvar_config()
+        self._alterar_config(lambda config: config.update({'ultimo_setor': setor}))
+    
+    def obter_historico(self) -> list:
+        """
+        Obtém o histórico das últimas Pedido criadas.
+        
+        Returns:
+            Lista de itens [arquivo_path, pasta, setor], do mais antigo ao mais recente
+        """
+        with self._lock:
+            return list(self.config.get('ultimas_requisicoes', []))
+    
+    def adicionar_historico(self, arquivo: str, pasta: str, setor: str) -> None:
+        """
+        Adiciona uma Pedido ao final do histórico.
+        
+        Args:
+            arquivo: Caminho completo do arquivo criado
+            pasta: Pasta de destino
+            setor: Nome do setor
+        """
+        def alterar(config: dict) -> None:
+            ultimas = config.get('ultimas_requisicoes', [])
+            
+            # Novo formato: armazenar o caminho completo e informações para exibição
+            item_data = [arquivo, pasta, setor]
+            
+            # Remover se já existir para evitar duplicatas e mover para o topo
+            if item_data in ultimas:
+                ultimas.remove(item_data)
+            
+            ultimas.append(item_data)
+            
+            # Manter apenas as últimas
+            config['ultimas_requisicoes'] = ultimas[-self.LIMITE_HISTORICO:]
+            self._registrar_historico_completo(arquivo, pasta, setor)
+        
+        self._alterar_config(alterar)
+    
+    def _registrar_historico_completo(self, arquivo: str, pasta: str, setor: str) -> None:
+        """Acrescenta a Pedido ao registro completo do histórico."""
+        with self._lock:
+            try:
+                novo = not os.path.exists(self.historico_file)
+                with open(self.historico_file, 'a', newline='', encoding='utf-8') as f:
+                    escritor = csv.writer(f)
+                    if novo:
+                        # Primeira gravação: preservar o histórico anterior ao registro
+                        for item in self.config.get('ultimas_requisicoes', [])[:-1]:
+                            if isinstance(item, list) and len(item) == 3:
+                                escritor.writerow(item + [''])
+                    escritor.writerow([
+                        arquivo, pasta, setor,
+                        datetime.now().isoformat(timespec='seconds')
+                    ])
+            except OSError:
+                pass
+    
+    def iterar_historico_completo(self) -> Iterator[Tuple[str, str, str, str]]:
+        """
+        Percorre todas as Pedido já criadas, da mais antiga à mais recente.
+        
+        O arquivo é lido linha a linha, sem carregar o histórico inteiro na memória.
+        
+        Yields:
+            Tuplas (arquivo, pasta, setor, data ISO ou vazia se desconhecida)
+        """
+        if not os.path.exists(self.historico_file):
+            for item in self.obter_historico():
+                if isinstance(item, list) and len(item) == 3:
+                    yield item[0], item[1], item[2], ''
+            return
+        
+        with open(self.historico_file, 'r', newline='', encoding='utf-8') as f:
+            for linha in csv.reader(f):
+                # Ignora linhas truncadas (ex.: queda de energia durante a gravação)
+                if len(linha) == 4:
+                    yield tuple(linha)
+    
+    def substituir_caminhos_historico(self, caminhos: dict) -> None:
+        """
+        Atualiza caminhos de arquivos no histórico recente e no completo.
+        
+        Usado quando Pedido são movidas (ex.: migração para subpastas). O
+        histórico completo é regravado linha a linha em um arquivo temporário.
+        
+        Args:
+            caminhos: Mapa {caminho_antigo: caminho_novo}
+        """
+        def alterar(config: dict) -> None:
+            config['ultimas_requisicoes'] = [
+                [caminhos.get(item[0], item[0])] + item[1:]
+                if isinstance(item, list) and len(item) == 3 else item
+                for item in config.get('ultimas_requisicoes', [])
+            ]
+        
+        with self._lock, TravaArquivo(self.config_file):
+            self.config = self._carregar_config()
+            alterar(self.config)
+            self._salvar_config()
+            
+            if not os.path.exists(self.historico_file):
+                return
+            
+            temporario = f"{self.historico_file}.tmp"
+            with open(temporario, 'w', newline='', encoding='utf-8') as f:
+                escritor = csv.writer(f)
+                for arquivo, pasta, setor, data in self.iterar_historico_completo():
+                    escritor.writerow([caminhos.get(arquivo, arquivo), pasta, setor, data])
+            os.replace(temporario, self.historico_file)
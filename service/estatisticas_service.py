@@ -0,0 +1,386 @@
+"""
+Serviço de estatísticas de uso.
+Mantém agregados de Pedido por setor, dia e mês e as quantidades de itens
+solicitados, atualizados a cada criação sem reler as planilhas.
+
+Cada criação acrescenta uma linha a um registro (estatisticas.log); de
+tempos em tempos as linhas são somadas ao resumo (estatisticas.json) e o
+registro recomeça vazio.
+"""
+
+import os
+import json
+import threading
+import functools
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from openpyxl import load_workbook
+from openpyxl.utils.cell import coordinate_to_tuple
+
+from .armazenamento_service import ArmazenamentoService
+from .plano_service import CampoPlano, PlanoService, TabelaItens
+from .verificacao_service import VerificacaoService
+from .trava_arquivo import TravaArquivo
+
+
+def _ler_resumo_pedido(
+    caminho: str,
+    plano: Tuple[CampoPlano, ...] = PlanoService.PLANO_PADRAO,
+    tabela: Optional[TabelaItens] = None
+) -> Optional[Tuple[str, str, List[Tuple[str, float]]]]:
+    """
+    Lê setor, data e itens com quantidade de uma Pedido existente.
+
+    Args:
+        caminho: Arquivo da Pedido (.xlsx ou .pedido)
+        plano: Plano da planilha padrão (onde estão setor e data)
+        tabela: Tabela de itens da planilha padrão (None: itens não são lidos)
+
+    Returns:
+        Tupla (setor, data ISO, [(descricao, quantidade)]) ou None se ilegível
+    """
+    if ArmazenamentoService.eh_delta(caminho):
+        # Pedido compacta: só as células preenchidas na criação; o plano e a
+        # lista de produtos vêm da versão da planilha padrão usada pelo registro
+        try:
+            dados = ArmazenamentoService.ler_delta(caminho)
+            modelo = ArmazenamentoService.localizar_modelo(caminho, dados['modelo'])
+            plano = PlanoService.obter_plano(modelo)
+            itens = PlanoService.extrair_itens(modelo, dados['celulas'])
+        except Exception:
+            return None
+        return _montar_resumo(caminho, PlanoService.extrair(plano, dados['celulas']), itens)
+
+    try:
+        wb = load_workbook(caminho, read_only=True, data_only=True)
+    except Exception:
+        return None
+
+    # Células do plano agrupadas por linha: {linha: [(coluna, referência)]}
+    celulas_por_linha = {}
+    for campo in plano:
+        linha, coluna = coordinate_to_tuple(campo.referencia)
+        celulas_por_linha.setdefault(linha, []).append((coluna, campo.referencia))
+
+    if tabela is not None:
+        linha_itens = tabela.linha_inicial
+        coluna_descricao = PlanoService.indice_coluna(tabela.coluna_item)
+        coluna_quantidade = PlanoService.indice_coluna(tabela.coluna_quantidade)
+    else:
+        linha_itens, coluna_descricao, coluna_quantidade = float('inf'), 0, 0
+    try:
+        ws = wb.active
+        celulas, itens = {}, []
+        for numero_linha, linha in enumerate(ws.iter_rows(values_only=True), start=1):
+            for coluna, referencia in celulas_por_linha.get(numero_linha, ()):
+                if len(linha) >= coluna:
+                    celulas[referencia] = linha[coluna - 1]
+            if numero_linha >= linha_itens and len(linha) > max(coluna_descricao, coluna_quantidade):
+                descricao, quantidade = linha[coluna_descricao], linha[coluna_quantidade]
+                if descricao and isinstance(quantidade, (int, float)) and quantidade > 0:
+                    itens.append((str(descricao).strip(), float(quantidade)))
+    except Exception:
+        return None
+    finally:
+        wb.close()
+
+    return _montar_resumo(caminho, PlanoService.extrair(plano, celulas), itens)
+
+
+def _montar_resumo(caminho: str, valores: dict, itens: list) -> Tuple[str, str, List[Tuple[str, float]]]:
+    """Monta o resumo a partir dos campos extraídos pelo plano."""
+    data = valores.get('data')
+    if isinstance(data, datetime):
+        data_iso = data.date().isoformat()
+    else:
+        # Sem data legível: usa a data de modificação do arquivo
+        data_iso = datetime.fromtimestamp(os.path.getmtime(caminho)).date().isoformat()
+
+    return valores.get('setor', ''), data_iso, itens
+
+
+class EstatisticasService:
+    """Agregados de uso por setor e período."""
+
+    # Criações no registro a partir das quais elas são somadas ao resumo
+    LIMITE_REGISTRO = 500
+    # Detalhamento mantido no resumo (total, setores e itens do período todo ficam inteiros)
+    DIAS_MANTIDOS = 366
+    MESES_ITENS_MANTIDOS = 24
+
+    def __init__(self, config_dir: str):
+        """
+        Inicializa o serviço, carregando os agregados gravados.
+
+        Args:
+            config_dir: Pasta onde os agregados são gravados
+        """
+        self._lock = threading.RLock()
+        self.arquivo = os.path.join(config_dir, "estatisticas.json")
+        self.arquivo_registro = os.path.join(config_dir, "estatisticas.log")
+        # (mtime_ns, tamanho) do resumo quando foi lido e quanto do registro
+        # já foi somado: o aplicativo e a API local gravam os mesmos arquivos
+        # em processos separados
+        self._assinatura = None
+        self._posicao_registro = 0
+        self._linhas_registro = 0
+        with TravaArquivo(self.arquivo):
+            self.dados = self._carregar()
+            self._ler_registro()
+
+    @staticmethod
+    def _vazio() -> dict:
+        """Estrutura inicial dos agregados."""
+        return {
+            'total': 0,
+            'por_setor': {},
+            'por_dia': {},
+            'por_mes': {},
+            'por_mes_setor': {},
+            'itens': {},
+            'itens_por_mes': {}
+        }
+
+    def _assinatura_arquivo(self) -> Optional[tuple]:
+        """Data de modificação e tamanho do arquivo gravado (None se não existe)."""
+        try:
+            info = os.stat(self.arquivo)
+        except OSError:
+            return None
+        return info.st_mtime_ns, info.st_size
+
+    def _tamanho_registro(self) -> int:
+        """Tamanho atual do registro de criações (0 se não existe)."""
+        try:
+            return os.path.getsize(self.arquivo_registro)
+        except OSError:
+            return 0
+
+    def _carregar(self) -> dict:
+        """Carrega os agregados do resumo; o registro volta a ser lido do início."""
+        self._assinatura = self._assinatura_arquivo()
+        self._posicao_registro = 0
+        self._linhas_registro = 0
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            return {**self._vazio(), **dados}
+        except (OSError, ValueError):
+            return self._vazio()
+
+    def _ler_registro(self) -> None:
+        """Soma aos agregados as linhas do registro ainda não lidas (sob a trava)."""
+        try:
+            with open(self.arquivo_registro, 'rb') as f:
+                f.seek(self._posicao_registro)
+                novo = f.read()
+        except OSError:
+            return
+
+        # Só linhas completas; a posição avança até o último fim de linha
+        fim = novo.rfind(b'\n') + 1
+        for linha in novo[:fim].splitlines():
+            try:
+                evento = json.loads(linha)
+                self._acumular(evento['setor'], evento['data'], evento['itens'])
+            except (ValueError, KeyError, TypeError):
+                continue
+            self._linhas_registro += 1
+        self._posicao_registro += fim
+
+    def _atualizar(self) -> None:
+        """Relê o resumo se outro processo o consolidou e soma o registro novo (sob a trava)."""
+        if self._assinatura_arquivo() != self._assinatura:
+            self.dados = self._carregar()
+        self._ler_registro()
+
+    def _recarregar_se_alterado(self) -> None:
+        """Atualiza os agregados se outro processo registrou ou consolidou algo."""
+        if (
+            self._assinatura_arquivo() != self._assinatura
+            or self._tamanho_registro() != self._posicao_registro
+        ):
+            with TravaArquivo(self.arquivo):
+                self._atualizar()
+
+    def _podar(self) -> None:
+        """Descarta os dias e os itens por mês mais antigos que o detalhamento mantido."""
+        for chave, limite in (('por_dia', self.DIAS_MANTIDOS), ('itens_por_mes', self.MESES_ITENS_MANTIDOS)):
+            periodos = self.dados[chave]
+            for antigo in sorted(periodos)[:-limite]:
+                del periodos[antigo]
+
+    def _consolidar(self) -> bool:
+        """Grava os agregados no resumo e esvazia o registro (sob a trava)."""
+        self._podar()
+        if not self._salvar():
+            return False
+        try:
+            with open(self.arquivo_registro, 'wb'):
+                pass
+        except OSError:
+            return False
+        self._posicao_registro = 0
+        self._linhas_registro = 0
+        return True
+
+    def _salvar(self) -> bool:
+        """Grava os agregados de forma atômica."""
+        temporario = f"{self.arquivo}.tmp"
+        try:
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(self.dados, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temporario, self.arquivo)
+            self._assinatura = self._assinatura_arquivo()
+            return True
+        except OSError:
+            return False
+
+    def _acumular(self, setor: str, data_iso: str, itens: Iterable[Tuple[str, float]]) -> None:
+        """
+        Soma uma Pedido aos agregados (sem gravar).
+
+        Os itens são agrupados pela descrição normalizada, a mesma chave
+        para o catálogo ("Abacate kg") e para a planilha ("ABACATE KG").
+        """
+        d = self.dados
+        mes = data_iso[:7]
+
+        d['total'] += 1
+        d['por_setor'][setor] = d['por_setor'].get(setor, 0) + 1
+        d['por_dia'][data_iso] = d['por_dia'].get(data_iso, 0) + 1
+        d['por_mes'][mes] = d['por_mes'].get(mes, 0) + 1
+        setores_mes = d['por_mes_setor'].setdefault(mes, {})
+        setores_mes[setor] = setores_mes.get(setor, 0) + 1
+
+        itens_mes = d['itens_por_mes'].setdefault(mes, {})
+        for descricao, quantidade in itens:
+            descricao = PlanoService.normalizar_descricao(descricao)
+            d['itens'][descricao] = d['itens'].get(descricao, 0) + quantidade
+            itens_mes[descricao] = itens_mes.get(descricao, 0) + quantidade
+
+    def registrar_pedido(
+        self,
+        setor: str,
+        data: Optional[datetime] = None,
+        itens: Iterable[Tuple[str, float]] = ()
+    ) -> None:
+        """
+        Registra uma Pedido recém-criada nos agregados.
+
+        Acrescenta uma linha ao registro em vez de regravar o resumo; a cada
+        LIMITE_REGISTRO criações o registro é somado ao resumo.
+
+        Args:
+            setor: Nome do setor
+            data: Data de criação (padrão: agora)
+            itens: Itens solicitados como (descricao, quantidade)
+        """
+        evento = json.dumps({
+            'setor': setor.strip(),
+            'data': (data or datetime.now()).date().isoformat(),
+            'itens': [[descricao, quantidade] for descricao, quantidade in itens]
+        }, ensure_ascii=False, separators=(',', ':'))
+
+        # Sob trava entre processos: o aplicativo e a API acrescentam ao mesmo registro
+        with self._lock, TravaArquivo(self.arquivo):
+            self._atualizar()
+            with open(self.arquivo_registro, 'ab') as f:
+                f.write(evento.encode('utf-8') + b'\n')
+            self._ler_registro()
+            if self._linhas_registro >= self.LIMITE_REGISTRO:
+                self._consolidar()
+
+    def reconstruir(
+        self,
+        pastas: Iterable[str],
+        max_workers: Optional[int] = None,
+        planilha_padrao: Optional[str] = None
+    ) -> Tuple[bool, str]:
+        """
+        Recalcula todos os agregados lendo as Pedido existentes nas pastas.
+
+        Args:
+            pastas: Pastas de destino (incluindo subpastas por ano/mês)
+            max_workers: Processos de leitura (padrão: núcleos da máquina)
+            planilha_padrao: Planilha cujo plano indica onde estão setor, data e itens
+
+        Returns:
+            Tupla (sucesso, mensagem)
+        """
+        arquivos = []
+        for pasta in dict.fromkeys(pastas):
+            if pasta and os.path.isdir(pasta):
+                arquivos.extend(VerificacaoService.listar_arquivos_pedido(pasta))
+
+        plano, tabela = PlanoService.PLANO_PADRAO, None
+        if planilha_padrao and os.path.exists(planilha_padrao):
+            plano = PlanoService.obter_plano(planilha_padrao)
+            tabela = PlanoService.obter_tabela_itens(planilha_padrao)
+        ler = functools.partial(_ler_resumo_pedido, plano=plano, tabela=tabela)
+
+        if len(arquivos) < 8:
+            resumos = [ler(a) for a in arquivos]
+        else:
+            # 'spawn' evita fork de um processo com threads (interface Qt)
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            ) as executor:
+                resumos = list(executor.map(ler, arquivos, chunksize=16))
+
+        with self._lock, TravaArquivo(self.arquivo):
+            self.dados = self._vazio()
+            ilegiveis = 0
+            for resumo in resumos:
+                if resumo is None:
+                    ilegiveis += 1
+                    continue
+                self._acumular(*resumo)
+            if not self._consolidar():
+                return False, "Erro ao gravar estatísticas"
+
+        mensagem = f"{len(arquivos) - ilegiveis} Pedido contabilizadas"
+        if ilegiveis:
+            mensagem += f" ({ilegiveis} arquivo(s) ilegível(is) ignorado(s))"
+        return True, mensagem
+
+    def meses(self) -> List[str]:
+        """Meses com Pedido registradas (AAAA-MM), do mais recente ao mais antigo."""
+        with self._lock:
+            self._recarregar_se_alterado()
+            return sorted(self.dados['por_mes'], reverse=True)
+
+    def pedidos_por_setor(self, mes: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Quantidade de Pedido por setor, em ordem decrescente.
+
+        Args:
+            mes: Mês AAAA-MM ou None para todo o período
+        """
+        with self._lock:
+            self._recarregar_se_alterado()
+            origem = self.dados['por_mes_setor'].get(mes, {}) if mes else self.dados['por_setor']
+            return Counter(origem).most_common()
+
+    def itens_mais_solicitados(self, mes: Optional[str] = None, limite: int = 10) -> List[Tuple[str, float]]:
+        """
+        Itens com maior quantidade solicitada.
+
+        Args:
+            mes: Mês AAAA-MM ou None para todo o período
+            limite: Quantidade de itens retornados
+        """
+        with self._lock:
+            self._recarregar_se_alterado()
+            origem = self.dados['itens_por_mes'].get(mes, {}) if mes else self.dados['itens']
+            return Counter(origem).most_common(limite)
+
+    def total(self, mes: Optional[str] = None) -> int:
+        """Total de Pedido no mês ou em todo o período."""
+        with self._lock:
+            self._recarregar_se_alterado()
+            return self.dados['por_mes'].get(mes, 0) if mes else self.dados['total']
@@ -0,0 +1,120 @@
+"""
+Serviço de exportação do histórico de Pedido.
+Gera CSV ou planilha Excel com todas as Pedido já criadas, gravando
+linha a linha para manter o uso de memória constante.
+"""
+
+import os
+import csv
+from collections import OrderedDict
+from typing import Iterator, Optional, Tuple
+from openpyxl import Workbook
+
+from .config_service import ConfigService
+from .armazenamento_service import ArmazenamentoService
+
+
+class ExportacaoService:
+    """Exporta o histórico completo de Pedido."""
+
+    COLUNAS = ('Número', 'Setor', 'Data', 'Arquivo', 'Situação do Arquivo')
+
+    # Listagens de pasta mantidas durante a exportação: o histórico vem
+    # agrupado por pasta, então poucas bastam e a memória não cresce com
+    # a quantidade de arquivos
+    LIMITE_PASTAS = 4
+
+    @staticmethod
+    def iterar_linhas(config_service: ConfigService, verificar_arquivos: bool = True) -> Iterator[tuple]:
+        """
+        Gera as linhas da exportação a partir do registro completo do histórico.
+
+        A situação dos arquivos é obtida listando a pasta da Pedido, em vez
+        de consultar o disco para cada linha; só as listagens das últimas
+        pastas usadas ficam na memória.
+
+        Args:
+            config_service: Serviço de configuração com o histórico
+            verificar_arquivos: Se True, informa se o arquivo ainda existe
+
+        Yields:
+            Tuplas (numero, setor, data, arquivo, situacao)
+        """
+        arquivos_por_pasta = OrderedDict()
+        split = os.path.split
+
+        for arquivo, _, setor, data in config_service.iterar_historico_completo():
+            pasta, nome = split(arquivo)
+            numero = nome.rsplit('.', 1)[0]
+
+            situacao = ''
+            if verificar_arquivos:
+                nomes = arquivos_por_pasta.get(pasta)
+                if nomes is None:
+                    try:
+                        with os.scandir(pasta) as it:
+                            nomes = {e.name for e in it}
+                    except OSError:
+                        nomes = set()
+                    arquivos_por_pasta[pasta] = nomes
+                    if len(arquivos_por_pasta) > ExportacaoService.LIMITE_PASTAS:
+                        arquivos_por_pasta.popitem(last=False)
+                else:
+                    arquivos_por_pasta.move_to_end(pasta)
+                # A Pedido pode ter sido compactada ou restaurada depois de registrada
+                existe = nome in nomes or ArmazenamentoService.nome_alternativo(nome) in nomes
+                situacao = 'OK' if existe else 'Não encontrado'
+
+            yield numero, setor, data, arquivo, situacao
+
+    @staticmethod
+    def exportar_historico(
+        config_service: ConfigService,
+        destino: str,
+        verificar_arquivos: bool = True
+    ) -> Tuple[bool, str, Optional[int]]:
+        """
+        Exporta o histórico completo para CSV ou Excel (.xlsx).
+
+        O formato é escolhido pela extensão do destino. O Excel é gerado em
+        modo write_only do openpyxl, que grava as linhas sem mantê-las na memória.
+
+        Args:
+            config_service: Serviço de configuração com o histórico
+            destino: Caminho do arquivo a gerar (.csv ou .xlsx)
+            verificar_arquivos: Se True, informa se cada arquivo ainda existe
+
+        Returns:
+            Tupla (sucesso, mensagem, quantidade_linhas)
+        """
+        extensao = os.path.splitext(destino)[1].lower()
+        if extensao not in ('.csv', '.xlsx'):
+            return False, "Formato de exportação deve ser .csv ou .xlsx", None
+
+        linhas = ExportacaoService.iterar_linhas(config_service, verificar_arquivos)
+        total = 0
+
+        try:
+            if extensao == '.csv':
+                # utf-8-sig e ';' para abrir corretamente no Excel em português
+                with open(destino, 'w', newline='', encoding='utf-8-sig') as f:
+                    escritor = csv.writer(f, delimiter=';')
+                    escritor.writerow(ExportacaoService.COLUNAS)
+                    for linha in linhas:
+                        escritor.writerow(linha)
+                        total += 1
+            else:
+                wb = Workbook(write_only=True)
+                try:
+                    ws = wb.create_sheet("Histórico")
+                    ws.append(ExportacaoService.COLUNAS)
+                    for linha in linhas:
+                        ws.append(linha)
+                        total += 1
+                    wb.save(destino)
+                finally:
+                    wb.close()
+        except Exception as e:
+            return False, f"Erro ao exportar histórico: {str(e)}", None
+
+        return True, f"{total} Pedido exportadas para {os.path.basename(destino)}", total
@@ -0,0 +1,409 @@
+"""
+Serviço de busca textual nas Pedido de uma pasta de destino.
+Mantém um índice invertido (termo -> Pedido) gravado de forma compacta,
+atualizado incrementalmente pela data de modificação e tamanho dos arquivos.
+"""
+
+import os
+import re
+import json
+import zlib
+import bisect
+import hashlib
+import threading
+import unicodedata
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from openpyxl import load_workbook
+from openpyxl.utils.cell import coordinate_to_tuple
+
+from .requisicao_service import PedidoService
+from .armazenamento_service import ArmazenamentoService
+from .plano_service import PlanoService
+
+
+_PADRAO_TERMO = re.compile(r'\w+')
+
+# Linhas da planilha padrão nos processos de indexação (definidas ao iniciá-los)
+_linhas_modelo: List[tuple] = []
+# Linhas das versões da planilha padrão referenciadas por Pedido compactas;
+# poucas versões costumam estar em uso, as menos usadas são descartadas
+_linhas_por_modelo: 'OrderedDict[str, List[tuple]]' = OrderedDict()
+_LIMITE_MODELOS = 4
+_lock_modelos = threading.Lock()
+
+
+def normalizar_texto(texto: str) -> str:
+    """Converte para minúsculas e remove acentos ('Nitrílica' -> 'nitrilica')."""
+    decomposto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def extrair_termos(texto: str) -> set:
+    """Separa um texto em termos normalizados."""
+    return set(_PADRAO_TERMO.findall(normalizar_texto(texto)))
+
+
+def _texto_celula(valor) -> str:
+    """Texto indexado de uma célula (datas como na Pedido impressa)."""
+    if isinstance(valor, datetime):
+        return valor.strftime(PlanoService.FORMATO_DATA)
+    return str(valor)
+
+
+def _ler_linhas(caminho: str) -> List[tuple]:
+    """Lê os valores da aba ativa em modo read_only (streaming)."""
+    wb = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        return list(wb.active.iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+
+def _linhas_do_delta(caminho: str) -> List[tuple]:
+    """Reconstrói as linhas de uma Pedido compacta (planilha padrão + células do registro)."""
+    dados = ArmazenamentoService.ler_delta(caminho)
+    modelo = ArmazenamentoService.localizar_modelo(caminho, dados['modelo'])
+    with _lock_modelos:
+        linhas_modelo = _linhas_por_modelo.get(modelo)
+        if linhas_modelo is not None:
+            _linhas_por_modelo.move_to_end(modelo)
+    if linhas_modelo is None:
+        linhas_modelo = _ler_linhas(modelo)
+        with _lock_modelos:
+            _linhas_por_modelo[modelo] = linhas_modelo
+            if len(_linhas_por_modelo) > _LIMITE_MODELOS:
+                _linhas_por_modelo.popitem(last=False)
+
+    linhas = [list(linha) for linha in linhas_modelo]
+    for referencia, valor in dados['celulas'].items():
+        linha, coluna = coordinate_to_tuple(referencia)
+        while len(linhas) < linha:
+            linhas.append([])
+        atual = linhas[linha - 1]
+        atual.extend([None] * (coluna - len(atual)))
+        atual[coluna - 1] = valor
+    return [tuple(linha) for linha in linhas]
+
+
+def _ler_linhas_modelo(planilha_padrao: Optional[str]) -> List[tuple]:
+    """Linhas da planilha padrão, ou nenhuma se ela não puder ser lida."""
+    if planilha_padrao and os.path.exists(planilha_padrao):
+        try:
+            return _ler_linhas(planilha_padrao)
+        except Exception:
+            pass
+    return []
+
+
+def _iniciar_processo(planilha_padrao: Optional[str]) -> None:
+    """Inicializa um processo de indexação com as linhas da planilha padrão."""
+    global _linhas_modelo
+    _linhas_modelo = _ler_linhas_modelo(planilha_padrao)
+
+
+def _termos_do_arquivo(caminho: str, linhas_modelo: Optional[List[tuple]] = None) -> Optional[List[str]]:
+    """
+    Extrai os termos de uma Pedido.
+
+    Somente as células que diferem da planilha padrão são indexadas: assim
+    o setor, a data, os itens com quantidade informada e as observações
+    entram no índice, mas os rótulos fixos ("PARA SETOR:", "DATA:") e a
+    lista de produtos do modelo não.
+
+    Args:
+        caminho: Arquivo da Pedido
+        linhas_modelo: Linhas da planilha padrão (padrão: as do processo de indexação)
+
+    Returns:
+        Lista de termos ou None se o arquivo não puder ser lido
+    """
+    if linhas_modelo is None:
+        linhas_modelo = _linhas_modelo
+    try:
+        if ArmazenamentoService.eh_delta(caminho):
+            linhas = _linhas_do_delta(caminho)
+        else:
+            linhas = _ler_linhas(caminho)
+    except Exception:
+        return None
+
+    termos = set()
+    for i, linha in enumerate(linhas):
+        modelo = linhas_modelo[i] if i < len(linhas_modelo) else ()
+        if tuple(linha) == tuple(modelo):
+            continue
+        texto = ' '.join(
+            _texto_celula(v) for j, v in enumerate(linha)
+            if v is not None and (j >= len(modelo) or v != modelo[j])
+        )
+        termos.update(extrair_termos(texto))
+
+    # O número fica na célula como inteiro; o nome do arquivo traz o 0001
+    termos.update(extrair_termos(os.path.splitext(os.path.basename(caminho))[0]))
+    return sorted(termos)
+
+
+class IndiceService:
+    """Índice invertido das Pedido de uma pasta de destino."""
+
+    # 2: apenas as células diferentes do modelo (antes, linhas inteiras)
+    VERSAO = 2
+
+    # Abaixo disso não compensa iniciar processos de indexação
+    MINIMO_PARALELO = 8
+
+    def __init__(self, pasta: str, config_dir: str, planilha_padrao: Optional[str] = None):
+        """
+        Inicializa o índice, carregando-o do disco se já existir.
+
+        Args:
+            pasta: Pasta de destino indexada
+            config_dir: Pasta onde o índice é gravado
+            planilha_padrao: Planilha modelo (linhas iguais a ela não são indexadas)
+        """
+        self.pasta = pasta
+        self.planilha_padrao = planilha_padrao
+        self._lock = threading.RLock()
+        # Linhas da planilha padrão, lidas na primeira indexação feita neste processo
+        self._linhas_modelo: Optional[List[tuple]] = None
+
+        chave = hashlib.sha1(os.path.normcase(os.path.abspath(pasta)).encode('utf-8')).hexdigest()[:16]
+        os.makedirs(os.path.join(config_dir, 'indices'), exist_ok=True)
+        self.arquivo_indice = os.path.join(config_dir, 'indices', f"{chave}.idx")
+
+        # Documentos: id -> [caminho relativo, mtime_ns, tamanho] (None se removido)
+        self._documentos: List[Optional[list]] = []
+        self._ids: Dict[str, int] = {}
+        # Termo -> ids das Pedido em ordem crescente
+        self._termos: Dict[str, List[int]] = {}
+        self._termos_ordenados: Optional[List[str]] = None
+
+        self._carregar()
+
+    def _carregar(self) -> None:
+        """Carrega o índice gravado (formato JSON compactado com zlib)."""
+        try:
+            with open(self.arquivo_indice, 'rb') as f:
+                dados = json.loads(zlib.decompress(f.read()))
+        except (OSError, ValueError, zlib.error):
+            return
+
+        if dados.get('versao') != self.VERSAO:
+            return
+
+        self._documentos = dados['documentos']
+        self._ids = {doc[0]: i for i, doc in enumerate(self._documentos) if doc is not None}
+        # Listas de ids gravadas como diferenças entre vizinhos (números menores)
+        for termo, deltas in dados['termos'].items():
+            ids, atual = [], 0
+            for delta in deltas:
+                atual += delta
+                ids.append(atual)
+            self._termos[termo] = ids
+
+    def _compactar(self) -> None:
+        """Renumera os documentos, descartando os removidos."""
+        novos_ids = {}
+        documentos = []
+        for antigo, doc in enumerate(self._documentos):
+            if doc is not None:
+                novos_ids[antigo] = len(documentos)
+                documentos.append(doc)
+
+        self._documentos = documentos
+        self._ids = {doc[0]: i for i, doc in enumerate(documentos)}
+        self._termos = {
+            termo: [novos_ids[i] for i in ids]
+            for termo, ids in self._termos.items()
+        }
+
+    def salvar(self) -> None:
+        """Grava o índice de forma atômica."""
+        with self._lock:
+            if len(self._ids) < len(self._documentos) // 2:
+                self._compactar()
+
+            termos = {}
+            for termo, ids in self._termos.items():
+                anterior, deltas = 0, []
+                for i in ids:
+                    deltas.append(i - anterior)
+                    anterior = i
+                termos[termo] = deltas
+
+            conteudo = zlib.compress(json.dumps(
+                {'versao': self.VERSAO, 'documentos': self._documentos, 'termos': termos},
+                separators=(',', ':'), ensure_ascii=False
+            ).encode('utf-8'), 6)
+
+        temporario = f"{self.arquivo_indice}.tmp"
+        with open(temporario, 'wb') as f:
+            f.write(conteudo)
+        os.replace(temporario, self.arquivo_indice)
+
+    def _remover_documentos(self, ids: set) -> None:
+        """Remove documentos do índice (percorre as listas de termos uma vez)."""
+        if not ids:
+            return
+        for termo in list(self._termos):
+            restantes = [i for i in self._termos[termo] if i not in ids]
+            if restantes:
+                self._termos[termo] = restantes
+            else:
+                del self._termos[termo]
+        for i in ids:
+            self._ids.pop(self._documentos[i][0], None)
+            self._documentos[i] = None
+        self._termos_ordenados = None
+
+    def _adicionar_documento(self, relativo: str, mtime_ns: int, tamanho: int, termos: List[str]) -> None:
+        """Adiciona um documento novo (id maior que todos, mantendo as listas ordenadas)."""
+        doc_id = len(self._documentos)
+        self._documentos.append([relativo, mtime_ns, tamanho])
+        self._ids[relativo] = doc_id
+        for termo in termos:
+            self._termos.setdefault(termo, []).append(doc_id)
+        self._termos_ordenados = None
+
+    def _obter_linhas_modelo(self) -> List[tuple]:
+        """Linhas da planilha padrão, lidas uma única vez por índice."""
+        with self._lock:
+            if self._linhas_modelo is None:
+                self._linhas_modelo = _ler_linhas_modelo(self.planilha_padrao)
+            return self._linhas_modelo
+
+    def _indexar(self, arquivos: List[Tuple[str, int, int]], max_workers: Optional[int]) -> None:
+        """Lê os arquivos (em paralelo quando são muitos) e adiciona ao índice."""
+        caminhos = [os.path.join(self.pasta, relativo) for relativo, _, _ in arquivos]
+
+        if len(caminhos) < self.MINIMO_PARALELO:
+            linhas_modelo = self._obter_linhas_modelo()
+            resultados = [_termos_do_arquivo(c, linhas_modelo) for c in caminhos]
+        else:
+            # 'spawn' evita fork de um processo com threads (interface Qt)
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_iniciar_processo,
+                initargs=(self.planilha_padrao,)
+            ) as executor:
+                resultados = list(executor.map(_termos_do_arquivo, caminhos, chunksize=16))
+
+        with self._lock:
+            # Outra atualização pode ter indexado o mesmo arquivo enquanto este lia
+            self._remover_documentos({
+                self._ids[relativo] for relativo, _, _ in arquivos if relativo in self._ids
+            })
+            for (relativo, mtime_ns, tamanho), termos in zip(arquivos, resultados):
+                if termos is not None:
+                    self._adicionar_documento(relativo, mtime_ns, tamanho, termos)
+
+    def atualizar(self, max_workers: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Atualiza o índice com as Pedido novas, alteradas ou removidas da pasta.
+
+        Arquivos com mesma data de modificação e tamanho não são relidos.
+
+        Args:
+            max_workers: Processos de indexação (padrão: núcleos da máquina)
+
+        Returns:
+            Tupla (arquivos indexados, arquivos removidos)
+        """
+        padrao = re.compile(r'\d{4}')
+        extensoes = ('.xlsx', ArmazenamentoService.EXTENSAO_DELTA)
+        no_disco = {}
+        for diretorio in [self.pasta] + PedidoService.listar_subpastas_ano_mes(self.pasta):
+            with os.scandir(diretorio) as it:
+                for e in it:
+                    if e.name.lower().endswith(extensoes) and padrao.search(e.name) and e.is_file():
+                        info = e.stat()
+                        relativo = os.path.relpath(e.path, self.pasta)
+                        no_disco[relativo] = (info.st_mtime_ns, info.st_size)
+
+        with self._lock:
+            alterados = set()
+            for relativo, doc_id in self._ids.items():
+                atual = no_disco.get(relativo)
+                _, mtime_ns, tamanho = self._documentos[doc_id]
+                if atual is None or atual != (mtime_ns, tamanho):
+                    alterados.add(doc_id)
+            removidos = sum(1 for i in alterados if self._documentos[i][0] not in no_disco)
+            self._remover_documentos(alterados)
+
+            novos = [
+                (relativo, mtime_ns, tamanho)
+                for relativo, (mtime_ns, tamanho) in no_disco.items()
+                if relativo not in self._ids
+            ]
+
+        if novos:
+            self._indexar(sorted(novos), max_workers)
+        if novos or removidos:
+            self.salvar()
+
+        return len(novos), removidos
+
+    def indexar_arquivo(self, caminho: str) -> bool:
+        """
+        Indexa (ou reindexa) uma única Pedido, ex.: logo após criá-la.
+
+        Args:
+            caminho: Caminho do arquivo dentro da pasta indexada
+
+        Returns:
+            True se o arquivo foi indexado
+        """
+        try:
+            info = os.stat(caminho)
+        except OSError:
+            return False
+
+        relativo = os.path.relpath(caminho, self.pasta)
+        self._indexar([(relativo, info.st_mtime_ns, info.st_size)], None)
+        self.salvar()
+        return relativo in self._ids
+
+    def buscar(self, consulta: str, limite: int = 200) -> List[str]:
+        """
+        Busca Pedido que contenham todos os termos da consulta.
+
+        O último termo é tratado como prefixo, para resultados enquanto se digita.
+
+        Args:
+            consulta: Texto digitado (ex.: "luva nitr")
+            limite: Máximo de resultados
+
+        Returns:
+            Caminhos completos das Pedido, das mais recentes para as mais antigas
+        """
+        palavras = _PADRAO_TERMO.findall(normalizar_texto(consulta))
+        if not palavras:
+            return []
+
+        with self._lock:
+            if self._termos_ordenados is None:
+                self._termos_ordenados = sorted(self._termos)
+
+            conjuntos = [set(self._termos.get(p, ())) for p in palavras[:-1]]
+
+            prefixo = palavras[-1]
+            com_prefixo = set()
+            inicio = bisect.bisect_left(self._termos_ordenados, prefixo)
+            for termo in self._termos_ordenados[inicio:]:
+                if not termo.startswith(prefixo):
+                    break
+                com_prefixo.update(self._termos[termo])
+            conjuntos.append(com_prefixo)
+
+            ids = set.intersection(*sorted(conjuntos, key=len))
+            relativos = sorted(
+                (self._documentos[i][0] for i in ids),
+                key=os.path.basename,
+                reverse=True
+            )
+            return [os.path.join(self.pasta, r) for r in relativos[:limite]]
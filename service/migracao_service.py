@@ -0,0 +1,236 @@
+"""
+Serviço de migração da pasta de destino.
+Move as Pedido da raiz para subpastas AAAA/MM e atualiza o histórico, e
+converte as Pedido entre o armazenamento completo e o compacto.
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Tuple
+from openpyxl import load_workbook
+
+from .config_service import ConfigService
+from .requisicao_service import PedidoService
+from .armazenamento_service import ArmazenamentoService
+from .verificacao_service import VerificacaoService
+from .plano_service import PlanoService
+
+
+class MigracaoService:
+    """Reorganiza Pedido existentes em subpastas por ano/mês."""
+
+    @staticmethod
+    def _mover(origem: str, pasta: str) -> Tuple[str, str, Optional[str]]:
+        """
+        Move um arquivo para a subpasta do mês da sua data de modificação.
+
+        Returns:
+            Tupla (origem, destino, erro)
+        """
+        try:
+            data = datetime.fromtimestamp(os.stat(origem).st_mtime)
+            pasta_mes = PedidoService.obter_pasta_pedido(pasta, PedidoService.LAYOUT_ANO_MES, data)
+            os.makedirs(pasta_mes, exist_ok=True)
+            destino = os.path.join(pasta_mes, os.path.basename(origem))
+            if os.path.exists(destino):
+                return origem, destino, "Já existe um arquivo com o mesmo nome no destino"
+            os.replace(origem, destino)
+            return origem, destino, None
+        except OSError as e:
+            return origem, origem, str(e)
+
+    @staticmethod
+    def migrar_para_ano_mes(
+        pasta: str,
+        config_service: Optional[ConfigService] = None,
+        max_workers: int = 8
+    ) -> Tuple[bool, str, dict]:
+        """
+        Move as Pedido da raiz da pasta para subpastas AAAA/MM.
+
+        O mês de cada arquivo vem da data de modificação (a data de criação da
+        Pedido). As movimentações são feitas em paralelo, pois em pastas de
+        rede cada renomeação espera a resposta do servidor. Ao final, o
+        arquivo de numeração é gravado e os caminhos do histórico são atualizados.
+
+        Args:
+            pasta: Pasta de destino (raiz)
+            config_service: Se informado, atualiza os caminhos do histórico
+            max_workers: Número de movimentações simultâneas
+
+        Returns:
+            Tupla (sucesso, mensagem, mapa {caminho_antigo: caminho_novo})
+        """
+        if not os.path.isdir(pasta):
+            return False, f"Pasta de destino não encontrada: {pasta}", {}
+
+        padrao = re.compile(r'\d{4}')
+        with os.scandir(pasta) as it:
+            arquivos = [
+                e.path for e in it
+                if e.is_file() and padrao.search(e.name)
+                and e.name.endswith(('.xlsx', '.xls', ArmazenamentoService.EXTENSAO_DELTA))
+            ]
+
+        with PedidoService._obter_lock_pasta(pasta):
+            # Registra a numeração antes de mover, para que nenhuma Pedido
+            # criada durante a migração reutilize um número
+            proximo = PedidoService.obter_proximo_numero(pasta, PedidoService.LAYOUT_ANO_MES)
+            PedidoService.registrar_numeracao(pasta, int(proximo) - 1)
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                resultados = list(executor.map(lambda a: MigracaoService._mover(a, pasta), arquivos))
+
+        movidos = {origem: destino for origem, destino, erro in resultados if erro is None}
+        erros = [(origem, erro) for origem, _, erro in resultados if erro is not None]
+
+        if config_service is not None and movidos:
+            config_service.substituir_caminhos_historico(movidos)
+
+        mensagem = f"{len(movidos)} Pedido movidas para subpastas por ano/mês"
+        if erros:
+            mensagem += f"\n{len(erros)} não puderam ser movidas:\n" + "\n".join(
+                f"{os.path.basename(a)}: {erro}" for a, erro in erros[:20]
+            )
+
+        return not erros, mensagem, movidos
+
+    @staticmethod
+    def _celulas_planilha(caminho: str) -> list:
+        """Valores e estilos de todas as células, aba por aba, para comparação."""
+        wb = load_workbook(caminho, read_only=True)
+        try:
+            return [
+                (ws.title, [
+                    tuple((c.value, getattr(c, 'style_id', 0)) for c in linha)
+                    for linha in ws.iter_rows()
+                ])
+                for ws in wb.worksheets
+            ] + [wb.active.title]
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _compactar_arquivo(caminho: str, modelo: str, referencias: tuple) -> Optional[str]:
+        """
+        Substitui um .xlsx pelo registro compacto, se ele for reproduzível.
+
+        O registro guarda as células do plano de preenchimento (setor,
+        número e data); a Pedido gerada a partir dele é
+        comparada célula a célula (valor e estilo) com o original, e o
+        .xlsx só é removido se forem idênticas.
+
+        Returns:
+            Motivo pelo qual o arquivo foi mantido, ou None se foi compactado
+        """
+        delta = ArmazenamentoService.nome_alternativo(caminho)
+        copia = f"{caminho}.verificacao.xlsx"
+        try:
+            wb = load_workbook(caminho, read_only=True)
+            try:
+                ws = wb.active
+                celulas = {ref: ws[ref].value for ref in referencias}
+            finally:
+                wb.close()
+
+            if not all(v is None or isinstance(v, (str, int, float, datetime)) for v in celulas.values()):
+                return "Células preenchidas com tipos não suportados"
+
+            info = os.stat(caminho)
+            ArmazenamentoService.gravar_delta(delta, modelo, celulas)
+            os.utime(delta, ns=(info.st_atime_ns, info.st_mtime_ns))
+            ArmazenamentoService._gerar_xlsx(delta, copia)
+
+            if MigracaoService._celulas_planilha(copia) != MigracaoService._celulas_planilha(caminho):
+                os.remove(delta)
+                return "Pedido alterada após a criação"
+
+            os.remove(caminho)
+            return None
+        except Exception as e:
+            if os.path.exists(delta) and os.path.exists(caminho):
+                os.remove(delta)
+            return str(e)
+        finally:
+            if os.path.exists(copia):
+                os.remove(copia)
+
+    @staticmethod
+    def compactar_pasta(pasta: str, arquivo_padrao: str, max_workers: int = 4) -> Tuple[bool, str, int]:
+        """
+        Converte as Pedido .xlsx da pasta para o armazenamento compacto.
+
+        Somente Pedido que ainda correspondem à planilha padrão atual (com
+        apenas setor, data e número preenchidos) são convertidas; as que
+        foram editadas ou criadas com outro modelo continuam como .xlsx.
+        O histórico não precisa ser atualizado: 0001.xlsx e 0001.pedido
+        são tratados como o mesmo arquivo.
+
+        Args:
+            pasta: Pasta de destino (raiz)
+            arquivo_padrao: Planilha padrão atual
+            max_workers: Número de conversões simultâneas
+
+        Returns:
+            Tupla (sucesso, mensagem, quantidade compactada)
+        """
+        if not os.path.isdir(pasta):
+            return False, f"Pasta de destino não encontrada: {pasta}", 0
+        if not os.path.exists(arquivo_padrao):
+            return False, f"Arquivo padrão não encontrado: {arquivo_padrao}", 0
+
+        modelo = ArmazenamentoService.guardar_modelo(pasta, arquivo_padrao)
+        referencias = tuple(campo.referencia for campo in PlanoService.obter_plano(arquivo_padrao))
+        arquivos = [
+            a for a in VerificacaoService.listar_arquivos_pedido(pasta)
+            if not ArmazenamentoService.eh_delta(a)
+        ]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            motivos = list(executor.map(
+                lambda a: MigracaoService._compactar_arquivo(a, modelo, referencias), arquivos
+            ))
+
+        compactadas = motivos.count(None)
+        mantidas = len(arquivos) - compactadas
+        mensagem = f"{compactadas} Pedido compactadas"
+        if mantidas:
+            mensagem += f"\n{mantidas} mantidas como .xlsx (editadas ou criadas com outro modelo)"
+        return True, mensagem, compactadas
+
+    @staticmethod
+    def restaurar_pasta(pasta: str, max_workers: int = 4) -> Tuple[bool, str, int]:
+        """
+        Converte todas as Pedido compactas da pasta de volta para .xlsx.
+
+        Args:
+            pasta: Pasta de destino (raiz)
+            max_workers: Número de conversões simultâneas
+
+        Returns:
+            Tupla (sucesso, mensagem, quantidade restaurada)
+        """
+        if not os.path.isdir(pasta):
+            return False, f"Pasta de destino não encontrada: {pasta}", 0
+
+        registros = [
+            a for a in VerificacaoService.listar_arquivos_pedido(pasta)
+            if ArmazenamentoService.eh_delta(a)
+        ]
+
+        def restaurar(registro: str) -> Optional[str]:
+            try:
+                ArmazenamentoService.restaurar(registro)
+                return None
+            except Exception as e:
+                return f"{os.path.basename(registro)}: {str(e)}"
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            erros = [e for e in executor.map(restaurar, registros) if e is not None]
+
+        mensagem = f"{len(registros) - len(erros)} Pedido restauradas como .xlsx"
+        if erros:
+            mensagem += f"\n{len(erros)} não puderam ser restauradas:\n" + "\n".join(erros[:20])
+        return not erros, mensagem, len(registros) - len(erros)
@@ -0,0 +1,156 @@
+"""
+Serviço de perfil de desempenho (modo diagnóstico).
+Quando ativado, mede ações da interface com cProfile e tracemalloc e grava,
+para cada captura, um arquivo .pstats e um resumo em texto na pasta de
+configurações. Desativado, nada é envolvido e não há custo algum.
+"""
+
+import io
+import os
+import time
+import pstats
+import cProfile
+import functools
+import inspect
+import threading
+import tracemalloc
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from .config_service import ConfigService
+
+
+class PerfilService:
+    """Captura perfis de desempenho de ações do aplicativo."""
+
+    # Variável de ambiente que ativa o modo sem alterar a configuração
+    VARIAVEL_AMBIENTE = 'ESTOQUISTA_PERFIL'
+    CHAVE_CONFIG = 'perfil_ativo'
+
+    LIMITE_FUNCOES = 30
+    LIMITE_ALOCACOES = 15
+
+    # cProfile não permite duas capturas simultâneas (ex.: ação dentro da inicialização)
+    _capturando = threading.Lock()
+
+    def __init__(self, config_dir: str):
+        """
+        Inicializa o serviço.
+
+        Args:
+            config_dir: Pasta de configurações (as capturas vão para a subpasta perfil)
+        """
+        self.pasta = os.path.join(config_dir, 'perfil')
+
+    @staticmethod
+    def ativo(config_service: ConfigService) -> bool:
+        """Verifica se o modo diagnóstico está ligado (variável de ambiente ou configuração)."""
+        if os.environ.get(PerfilService.VARIAVEL_AMBIENTE, '').strip().lower() in ('1', 'sim', 'true'):
+            return True
+        return bool(config_service.obter_config(PerfilService.CHAVE_CONFIG, False))
+
+    @staticmethod
+    def criar_se_ativo(config_service: ConfigService) -> Optional['PerfilService']:
+        """Retorna o serviço se o modo diagnóstico estiver ligado, senão None."""
+        if PerfilService.ativo(config_service):
+            return PerfilService(config_service.config_dir)
+        return None
+
+    def perfilar(self, nome: str, funcao, *args, **kwargs):
+        """
+        Executa a função capturando o perfil de tempo e de memória.
+
+        Args:
+            nome: Nome da ação (usado no nome dos arquivos)
+            funcao: Função a executar
+
+        Returns:
+            O retorno da função
+        """
+        if not PerfilService._capturando.acquire(blocking=False):
+            return funcao(*args, **kwargs)
+
+        rastreava_memoria = tracemalloc.is_tracing()
+        if not rastreava_memoria:
+            tracemalloc.start()
+        memoria_inicial = tracemalloc.take_snapshot()
+        perfil = cProfile.Profile()
+        inicio = time.perf_counter()
+
+        try:
+            perfil.enable()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                perfil.disable()
+                duracao = time.perf_counter() - inicio
+                memoria_final = tracemalloc.take_snapshot()
+                _, pico = tracemalloc.get_traced_memory()
+                if not rastreava_memoria:
+                    tracemalloc.stop()
+                try:
+                    self._gravar(nome, perfil, duracao, pico, memoria_final.compare_to(memoria_inicial, 'lineno'))
+                except OSError:
+                    pass
+        finally:
+            PerfilService._capturando.release()
+
+    def _gravar(self, nome: str, perfil: cProfile.Profile, duracao: float, pico: int, alocacoes: list) -> Tuple[str, str]:
+        """
+        Grava a captura (.pstats) e o resumo em texto.
+
+        Returns:
+            Tupla (caminho .pstats, caminho .txt)
+        """
+        os.makedirs(self.pasta, exist_ok=True)
+        base = os.path.join(self.pasta, f"{datetime.now():%Y%m%d-%H%M%S-%f}_{nome}")
+        perfil.dump_stats(f"{base}.pstats")
+
+        saida = io.StringIO()
+        saida.write(f"Ação: {nome}\n")
+        saida.write(f"Data: {datetime.now():%d/%m/%Y %H:%M:%S}\n")
+        saida.write(f"Duração: {duracao * 1000:.1f} ms\n")
+        saida.write(f"Pico de memória rastreada: {pico / 1024:.1f} KiB\n")
+        saida.write("(tarefas em segundo plano não entram na captura)\n\n")
+
+        saida.write(f"=== {self.LIMITE_FUNCOES} funções com maior tempo acumulado ===\n")
+        estatisticas = pstats.Stats(perfil, stream=saida)
+        estatisticas.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.LIMITE_FUNCOES)
+
+        saida.write(f"\n=== {self.LIMITE_ALOCACOES} maiores alocações durante a ação ===\n")
+        for diferenca in alocacoes[:self.LIMITE_ALOCACOES]:
+            saida.write(f"{diferenca}\n")
+
+        with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+            f.write(saida.getvalue())
+        return f"{base}.pstats", f"{base}.txt"
+
+    def envolver(self, objeto, nomes: Iterable[str]) -> None:
+        """
+        Substitui métodos do objeto por versões que capturam o perfil.
+
+        Deve ser chamado antes de conectar os sinais, pois a conexão guarda
+        o método encontrado naquele momento.
+
+        Args:
+            objeto: Instância cujos métodos serão envolvidos (ex.: a janela principal)
+            nomes: Nomes dos métodos
+        """
+        for nome in nomes:
+            metodo = getattr(objeto, nome)
+            setattr(objeto, nome, self._envolver_metodo(nome, metodo))
+
+    def _envolver_metodo(self, nome: str, metodo):
+        """Cria o envoltório de um método."""
+        # Sinais do Qt podem enviar argumentos extras (ex.: "checked" do clicked)
+        parametros = inspect.signature(metodo).parameters.values()
+        if any(p.kind == p.VAR_POSITIONAL for p in parametros):
+            quantidade = None
+        else:
+            quantidade = sum(1 for p in parametros if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD))
+
+        @functools.wraps(metodo)
+        def envolvido(*args):
+            return self.perfilar(nome, metodo, *args[:quantidade])
+
+        return envolvido
@@ -0,0 +1,461 @@
+"""
+Serviço de plano de preenchimento da planilha padrão.
+A planilha declara onde vão setor, número e data com marcadores como
+{{setor}}, {{numero}} e {{data:%d/%m/%Y}} ou com nomes definidos (setor,
+numero, data). A tabela de itens é declarada do mesmo modo: {{itens}},
+{{unidade}} e {{quantidade}} no cabeçalho das colunas (os itens começam na
+linha de baixo) ou nomes definidos apontando para a primeira linha de
+itens. A planilha é lida uma única vez para montar o plano, que fica em
+cache enquanto o arquivo não for alterado.
+"""
+
+import os
+import re
+import math
+import threading
+import unicodedata
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from openpyxl import load_workbook
+from openpyxl.cell.cell import MergedCell
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string, get_column_letter
+
+
+class CampoPlano(NamedTuple):
+    """Uma célula do plano: referência na aba ativa e texto com os marcadores."""
+    referencia: str
+    texto: str
+
+
+class TabelaItens(NamedTuple):
+    """Lista de produtos da planilha padrão."""
+    linhas: Dict[str, int]      # descrição normalizada -> linha do produto
+    descricoes: Dict[int, str]  # linha do produto -> descrição como no modelo
+    livres: Tuple[int, ...]     # linhas de preenchimento para itens fora da lista
+    linha_inicial: int          # primeira linha de itens
+    coluna_item: str            # colunas (letras) de descrição, unidade e quantidade
+    coluna_unidade: Optional[str]
+    coluna_quantidade: str
+
+
+class PlanoService:
+    """Monta e aplica o plano de preenchimento das Pedido."""
+
+    CAMPOS = ('setor', 'numero', 'data')
+    CAMPOS_OBRIGATORIOS = ('setor', 'numero')
+    # Colunas da tabela de itens ('unidade' é opcional)
+    CAMPOS_TABELA = ('itens', 'unidade', 'quantidade')
+    CAMPOS_TABELA_OBRIGATORIOS = ('itens', 'quantidade')
+    FORMATO_DATA = '%d/%m/%Y'
+
+    # Planilhas sem marcadores nem nomes definidos: células do formulário original
+    PLANO_PADRAO = (
+        CampoPlano('C4', '{{setor}}'),
+        CampoPlano('H4', '{{numero}}'),
+        CampoPlano('B6', '{{data}}'),
+    )
+
+    _PADRAO_MARCADOR = re.compile(r'\{\{\s*(\w+)\s*(?::([^}]*))?\}\}')
+
+    # Planos já montados: (caminho, tipo) -> (mtime_ns, tamanho, plano)
+    _planos: Dict[tuple, tuple] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def compilar(arquivo: str) -> Tuple[CampoPlano, ...]:
+        """
+        Lê a planilha padrão (aba ativa) e monta o plano de preenchimento.
+
+        Args:
+            arquivo: Caminho da planilha padrão
+
+        Returns:
+            Campos do plano; PLANO_PADRAO se a planilha não declarar nenhum
+        """
+        wb = load_workbook(arquivo, read_only=True)
+        try:
+            ws = wb.active
+            campos = {}
+
+            for linha in ws.iter_rows():
+                for celula in linha:
+                    valor = getattr(celula, 'value', None)
+                    if isinstance(valor, str) and '{{' in valor and PlanoService._PADRAO_MARCADOR.search(valor):
+                        campos[celula.coordinate] = CampoPlano(celula.coordinate, valor)
+
+            # Nomes definidos (ex.: "setor" -> Plan1!$C$4) que apontam para a aba ativa
+            for nome, definido in wb.defined_names.items():
+                if nome.lower() not in PlanoService.CAMPOS:
+                    continue
+                for aba, referencia in definido.destinations:
+                    referencia = referencia.replace('$', '')
+                    if aba == ws.title and ':' not in referencia and referencia not in campos:
+                        campos[referencia] = CampoPlano(referencia, f"{{{{{nome.lower()}}}}}")
+        finally:
+            wb.close()
+
+        return tuple(campos.values()) or PlanoService.PLANO_PADRAO
+
+    @staticmethod
+    def obter_plano(arquivo: str) -> Tuple[CampoPlano, ...]:
+        """
+        Obtém o plano da planilha padrão, montando-o só se o arquivo mudou.
+
+        Args:
+            arquivo: Caminho da planilha padrão
+
+        Returns:
+            Campos do plano
+        """
+        return PlanoService._obter_em_cache(arquivo, PlanoService.compilar)
+
+    @staticmethod
+    def _obter_em_cache(arquivo: str, montar):
+        """Retorna o resultado de montar(arquivo), refeito só quando o arquivo muda."""
+        chave = (os.path.abspath(arquivo), montar.__name__)
+        info = os.stat(arquivo)
+        with PlanoService._lock:
+            guardado = PlanoService._planos.get(chave)
+        if guardado and guardado[:2] == (info.st_mtime_ns, info.st_size):
+            return guardado[2]
+
+        resultado = montar(arquivo)
+        with PlanoService._lock:
+            PlanoService._planos[chave] = (info.st_mtime_ns, info.st_size, resultado)
+        return resultado
+
+    @staticmethod
+    def indice_coluna(letra: str) -> int:
+        """Posição (a partir de 0) de uma coluna nas linhas lidas com values_only."""
+        return column_index_from_string(letra) - 1
+
+    @staticmethod
+    def compilar_tabela_itens(arquivo: str) -> Optional[TabelaItens]:
+        """
+        Localiza e lê a lista de produtos da planilha padrão.
+
+        As colunas vêm dos marcadores {{itens}}, {{unidade}} e {{quantidade}}
+        no cabeçalho ou dos nomes definidos de mesmo nome. A tabela termina
+        na primeira linha com a descrição vazia; o que vem depois (total,
+        assinaturas) nunca recebe itens. Linhas de preenchimento, sem letras
+        nem números (ex.: "¬¬¬¬"), ficam livres para itens fora da lista.
+
+        Returns:
+            Tabela de itens ou None se a planilha não declarar a tabela
+        """
+        wb = load_workbook(arquivo, read_only=True)
+        try:
+            ws = wb.active
+            linhas_planilha = list(ws.iter_rows(values_only=True))
+
+            # Marcadores no cabeçalho: os itens começam na linha de baixo
+            posicoes = {}
+            for numero, linha in enumerate(linhas_planilha, start=1):
+                for indice, valor in enumerate(linha):
+                    if not (isinstance(valor, str) and '{{' in valor):
+                        continue
+                    for m in PlanoService._PADRAO_MARCADOR.finditer(valor):
+                        nome = m.group(1).lower()
+                        if nome in PlanoService.CAMPOS_TABELA:
+                            posicoes.setdefault(nome, (numero + 1, get_column_letter(indice + 1)))
+
+            # Nomes definidos apontando para a primeira linha de itens
+            for nome, definido in wb.defined_names.items():
+                if nome.lower() not in PlanoService.CAMPOS_TABELA:
+                    continue
+                for aba, referencia in definido.destinations:
+                    if aba == ws.title:
+                        coluna, numero = coordinate_from_string(referencia.replace('$', '').split(':')[0])
+                        posicoes.setdefault(nome.lower(), (numero, coluna))
+        finally:
+            wb.close()
+
+        if not all(nome in posicoes for nome in PlanoService.CAMPOS_TABELA_OBRIGATORIOS):
+            return None
+
+        linha_inicial, coluna_item = posicoes['itens']
+        indice_coluna = PlanoService.indice_coluna(coluna_item)
+        linhas, descricoes, livres = {}, {}, []
+        for numero in range(linha_inicial, len(linhas_planilha) + 1):
+            linha = linhas_planilha[numero - 1]
+            descricao = linha[indice_coluna] if len(linha) > indice_coluna else None
+            texto = '' if descricao is None else str(descricao).strip()
+            if not texto:
+                break
+            if not any(c.isalnum() for c in texto):
+                livres.append(numero)
+            else:
+                linhas.setdefault(PlanoService.normalizar_descricao(texto), numero)
+                descricoes[numero] = texto
+
+        return TabelaItens(
+            linhas, descricoes, tuple(livres), linha_inicial, coluna_item,
+            posicoes.get('unidade', (None, None))[1], posicoes['quantidade'][1]
+        )
+
+    @staticmethod
+    def obter_tabela_itens(arquivo: str) -> Optional[TabelaItens]:
+        """
+        Obtém a tabela de itens da planilha padrão, lendo-a só se o arquivo mudou.
+
+        Args:
+            arquivo: Caminho da planilha padrão
+
+        Returns:
+            Tabela de itens ou None se a planilha não declarar a tabela
+        """
+        return PlanoService._obter_em_cache(arquivo, PlanoService.compilar_tabela_itens)
+
+    @staticmethod
+    def normalizar_descricao(texto: str) -> str:
+        """Descrição sem acentos, em maiúsculas e com espaços simples."""
+        decomposto = unicodedata.normalize('NFKD', texto.upper())
+        return ' '.join(''.join(c for c in decomposto if not unicodedata.combining(c)).split())
+
+    @staticmethod
+    def celulas_itens(arquivo: str, itens: list) -> Dict[str, object]:
+        """
+        Calcula as células que registram os itens solicitados.
+
+        Itens que já constam na lista de produtos da planilha usam a linha
+        do produto; os demais ocupam as linhas de preenchimento abaixo da lista.
+
+        Args:
+            arquivo: Planilha padrão
+            itens: Lista de (descricao, unidade, quantidade)
+
+        Returns:
+            Dicionário {referência: valor} para gravar na aba ativa
+
+        Raises:
+            ValueError: Se a planilha não declarar a tabela de itens, se alguma
+                quantidade não for um número positivo ou se os itens fora da
+                lista excederem as linhas livres
+        """
+        tabela = PlanoService.obter_tabela_itens(arquivo)
+        if tabela is None:
+            raise ValueError(
+                "A planilha padrão não indica a tabela de itens "
+                "(marcadores {{itens}} e {{quantidade}} ou nomes definidos)"
+            )
+        livres = list(tabela.livres)
+        quantidades, celulas = {}, {}
+
+        for descricao, unidade, quantidade in itens:
+            if not (isinstance(quantidade, (int, float)) and math.isfinite(quantidade) and quantidade > 0):
+                raise ValueError(f"Quantidade inválida para {descricao}: {quantidade}")
+            chave = PlanoService.normalizar_descricao(descricao)
+            linha = tabela.linhas.get(chave) or quantidades.get(chave, (None,))[0]
+            if linha is None:
+                if not livres:
+                    raise ValueError(
+                        f"A planilha padrão tem apenas {len(tabela.livres)} linhas livres "
+                        f"para itens fora da lista de produtos"
+                    )
+                linha = livres.pop(0)
+                celulas[f"{tabela.coluna_item}{linha}"] = descricao
+                if tabela.coluna_unidade:
+                    # Sem unidade, limpa o preenchimento da coluna
+                    celulas[f"{tabela.coluna_unidade}{linha}"] = unidade or None
+            elif unidade and tabela.coluna_unidade:
+                celulas[f"{tabela.coluna_unidade}{linha}"] = unidade
+
+            total = quantidades.get(chave, (linha, 0))[1] + quantidade
+            quantidades[chave] = (linha, total)
+            celulas[f"{tabela.coluna_quantidade}{linha}"] = int(total) if float(total).is_integer() else total
+
+        return celulas
+
+    @staticmethod
+    def extrair_itens(arquivo: str, celulas: dict) -> List[Tuple[str, float]]:
+        """
+        Lê os itens solicitados nas células gravadas (inverso de celulas_itens).
+
+        Linhas de produto da lista só guardam a quantidade; a descrição vem
+        da planilha padrão.
+
+        Args:
+            arquivo: Planilha padrão usada na criação
+            celulas: Dicionário {referência: valor} da Pedido
+
+        Returns:
+            Lista de (descricao, quantidade)
+        """
+        tabela = PlanoService.obter_tabela_itens(arquivo)
+        if tabela is None:
+            return []
+        itens = []
+        for referencia, quantidade in celulas.items():
+            coluna, linha = coordinate_from_string(referencia)
+            if coluna != tabela.coluna_quantidade or linha < tabela.linha_inicial:
+                continue
+            if isinstance(quantidade, bool) or not isinstance(quantidade, (int, float)) or not quantidade > 0:
+                continue
+            descricao = celulas.get(f"{tabela.coluna_item}{linha}") or tabela.descricoes.get(linha)
+            if descricao:
+                itens.append((str(descricao).strip(), float(quantidade)))
+        return itens
+
+    @staticmethod
+    def _valor_nativo(campo: str, valor):
+        """Valor gravado numa célula que contém só o marcador, sem formato."""
+        if campo == 'data':
+            return valor.replace(microsecond=0)
+        if campo == 'numero':
+            return int(valor)
+        return valor
+
+    @staticmethod
+    def _formatar(campo: str, formato: Optional[str], valor) -> str:
+        """Converte o valor de um campo para texto conforme o formato do marcador."""
+        if campo in PlanoService.CAMPOS_TABELA:
+            return ''
+        if campo == 'data':
+            return valor.strftime(formato or PlanoService.FORMATO_DATA)
+        if formato:
+            if campo == 'numero':
+                return format(int(valor), formato)
+            return format(valor, formato)
+        return str(valor)
+
+    @staticmethod
+    def aplicar(plano: Tuple[CampoPlano, ...], valores: dict) -> dict:
+        """
+        Calcula o conteúdo das células do plano.
+
+        Uma célula com apenas o marcador, sem formato, recebe o valor nativo
+        (data como datetime, número como inteiro) e fica com o formato de
+        número da própria planilha; com formato ou texto em volta, recebe o
+        texto montado. Os marcadores da tabela de itens só indicam as colunas
+        e são retirados do cabeçalho.
+
+        Args:
+            plano: Campos do plano
+            valores: {'setor': str, 'numero': str, 'data': datetime}
+
+        Returns:
+            Dicionário {referência: valor} para gravar na aba ativa
+        """
+        substituir = lambda m: PlanoService._formatar(m.group(1).lower(), m.group(2), valores.get(m.group(1).lower()))
+        celulas = {}
+        for campo in plano:
+            unico = PlanoService._PADRAO_MARCADOR.fullmatch(campo.texto.strip())
+            if unico and not unico.group(2) and unico.group(1).lower() in PlanoService.CAMPOS:
+                nome = unico.group(1).lower()
+                celulas[campo.referencia] = PlanoService._valor_nativo(nome, valores[nome])
+                continue
+            texto = PlanoService._PADRAO_MARCADOR.sub(substituir, campo.texto)
+            if any(
+                m.group(1).lower() in PlanoService.CAMPOS_TABELA
+                for m in PlanoService._PADRAO_MARCADOR.finditer(campo.texto)
+            ):
+                texto = texto.strip() or None
+            celulas[campo.referencia] = texto
+        return celulas
+
+    @staticmethod
+    def extrair(plano: Tuple[CampoPlano, ...], celulas: dict) -> dict:
+        """
+        Recupera setor, número e data a partir das células de uma Pedido.
+
+        Args:
+            plano: Plano da planilha usada na criação
+            celulas: Valores das células do plano ({referência: valor})
+
+        Returns:
+            Dicionário com os campos encontrados ('data' como datetime)
+        """
+        valores = {}
+        for campo in plano:
+            conteudo = celulas.get(campo.referencia)
+            if conteudo is None:
+                continue
+
+            # O texto do modelo vira uma expressão com um grupo por marcador
+            partes, formatos, inicio = [], [], 0
+            for m in PlanoService._PADRAO_MARCADOR.finditer(campo.texto):
+                partes.append(re.escape(campo.texto[inicio:m.start()]))
+                partes.append('(.*?)')
+                formatos.append((m.group(1).lower(), m.group(2)))
+                inicio = m.end()
+            partes.append(re.escape(campo.texto[inicio:]))
+
+            if isinstance(conteudo, datetime) and len(formatos) == 1 and formatos[0][0] == 'data':
+                valores['data'] = conteudo
+                continue
+            if isinstance(conteudo, (int, float)) and len(formatos) == 1 and formatos[0][0] == 'numero':
+                valores['numero'] = f"{int(conteudo):04d}"
+                continue
+
+            encontrado = re.fullmatch(''.join(partes), str(conteudo), re.DOTALL)
+            if not encontrado:
+                continue
+            for (nome, formato), texto in zip(formatos, encontrado.groups()):
+                if nome not in PlanoService.CAMPOS:
+                    continue
+                if nome == 'data':
+                    try:
+                        valores['data'] = datetime.strptime(texto.strip(), formato or PlanoService.FORMATO_DATA)
+                    except ValueError:
+                        pass
+                else:
+                    valores[nome] = texto.strip()
+        return valores
+
+    @staticmethod
+    def validar(arquivo: str) -> Tuple[bool, str]:
+        """
+        Valida o plano de preenchimento da planilha padrão.
+
+        Args:
+            arquivo: Caminho da planilha padrão
+
+        Returns:
+            Tupla (válido, mensagem)
+        """
+        plano = PlanoService.obter_plano(arquivo)
+        tabela = PlanoService.obter_tabela_itens(arquivo)
+        if tabela is None:
+            return False, (
+                "Tabela de itens não encontrada: marque o cabeçalho com {{itens}} e "
+                "{{quantidade}} (e {{unidade}}) ou defina nomes com esses títulos"
+            )
+        descricao_tabela = (
+            f"itens a partir de {tabela.coluna_item}{tabela.linha_inicial}, "
+            f"quantidade em {tabela.coluna_quantidade}"
+        )
+
+        if plano is PlanoService.PLANO_PADRAO:
+            return True, f"Planilha válida (sem marcadores: setor em C4, número em H4 e data em B6; {descricao_tabela})"
+
+        encontrados = {}
+        for campo in plano:
+            for m in PlanoService._PADRAO_MARCADOR.finditer(campo.texto):
+                nome = m.group(1).lower()
+                if nome in PlanoService.CAMPOS_TABELA:
+                    continue
+                if nome not in PlanoService.CAMPOS:
+                    return False, f"Marcador desconhecido em {campo.referencia}: {m.group(0)}"
+                encontrados.setdefault(nome, []).append(campo.referencia)
+
+        ausentes = [c for c in PlanoService.CAMPOS_OBRIGATORIOS if c not in encontrados]
+        if ausentes:
+            return False, "Marcadores ausentes na planilha: " + ", ".join(f"{{{{{c}}}}}" for c in ausentes)
+
+        try:
+            PlanoService.aplicar(plano, {'setor': 'Setor', 'numero': '0001', 'data': datetime.now()})
+        except (ValueError, TypeError) as e:
+            return False, f"Formato de marcador inválido: {str(e)}"
+
+        # Células mescladas só aceitam valor na primeira célula do intervalo
+        wb = load_workbook(arquivo)
+        try:
+            ws = wb.active
+            for campo in plano:
+                if isinstance(ws[campo.referencia], MergedCell):
+                    return False, f"{campo.referencia} faz parte de células mescladas; use a primeira célula"
+        finally:
+            wb.close()
+
+        descricao = "; ".join(f"{nome} em {', '.join(refs)}" for nome, refs in encontrados.items())
+        return True, f"Planilha válida ({descricao}; {descricao_tabela})"
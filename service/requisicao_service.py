@@ -5,39 +5,166 @@ Manipula a lógica de negócio para criar Pedido a partir de planilhas Excel.
 
 import os
 import re
+import threading
 from datetime import datetime
-from typing import Tuple, Optional
+from typing import List, Optional, Tuple
 from openpyxl import load_workbook
 
+from .armazenamento_service import ArmazenamentoService
+from .plano_service import PlanoService
+
 
 class PedidoService:
     """Gerencia a criação de Pedido de almoxarifado."""
     
+    # Um lock por pasta de destino evita disputa entre threads do mesmo
+    # processo; entre processos (aplicativo e API local) o número é
+    # reservado criando o arquivo de forma exclusiva (ver _reservar_arquivo).
+    _locks_pastas = {}
+    _locks_guard = threading.Lock()
+    
+    # Organização dos arquivos na pasta de destino
+    LAYOUT_PLANO = 'plano'      # pasta/0001.xlsx
+    LAYOUT_ANO_MES = 'ano_mes'  # pasta/2026/10/0001.xlsx
+    
+    # Último número usado na pasta (numeração global, em qualquer layout)
+    ARQUIVO_NUMERACAO = '.numeracao'
+    
     @staticmethod
-    def obter_proximo_numero(pasta: str) -> str:
-        """
-        Encontra o próximo número de Pedido baseado nos arquivos existentes.
-        
-        Args:
-            pasta: Caminho da pasta para verificar
-            
-        Returns:
-            Próximo número no formato 0001, 0002, etc.
-        """
+    def _obter_lock_pasta(pasta: str) -> threading.Lock:
+        """Obtém o lock associado à pasta de destino."""
+        chave = os.path.normcase(os.path.abspath(pasta))
+        with PedidoService._locks_guard:
+            lock = PedidoService._locks_pastas.get(chave)
+            if lock is None:
+                lock = threading.Lock()
+                PedidoService._locks_pastas[chave] = lock
+            return lock
+    
+    @staticmethod
+    def _numeros_na_pasta(pasta: str) -> list:
+        """Números das Pedido (.xlsx/.xls/.pedido com 4 dígitos no nome) de uma única pasta."""
         if not os.path.exists(pasta):
-            return "0001"
+            return []
         
         arquivos = os.listdir(pasta)
         numeros = []
         
         # Procurar por arquivos com padrão de 4 dígitos
         for arquivo in arquivos:
-            if arquivo.endswith(('.xlsx', '.xls')):
+            if arquivo.endswith(('.xlsx', '.xls', ArmazenamentoService.EXTENSAO_DELTA)):
                 # Procurar por padrão de 4 dígitos no nome do arquivo
                 match = re.search(r'(\d{4})', arquivo)
                 if match:
                     numeros.append(int(match.group(1)))
         
+        return numeros
+    
+    @staticmethod
+    def obter_pasta_pedido(pasta: str, layout: str = LAYOUT_PLANO, data: Optional[datetime] = None) -> str:
+        """
+        Obtém a pasta onde uma Pedido criada na data informada é gravada.
+        
+        Args:
+            pasta: Pasta de destino (raiz)
+            layout: LAYOUT_PLANO (tudo na raiz) ou LAYOUT_ANO_MES (raiz/AAAA/MM)
+            data: Data de criação (padrão: agora)
+            
+        Returns:
+            Caminho da pasta da Pedido
+        """
+        if layout != PedidoService.LAYOUT_ANO_MES:
+            return pasta
+        data = data or datetime.now()
+        return os.path.join(pasta, f"{data.year:04d}", f"{data.month:02d}")
+    
+    @staticmethod
+    def listar_subpastas_ano_mes(pasta: str) -> list:
+        """
+        Lista as subpastas AAAA/MM existentes na pasta de destino.
+        
+        Args:
+            pasta: Pasta de destino (raiz)
+            
+        Returns:
+            Caminhos das subpastas, em ordem cronológica
+        """
+        subpastas = []
+        if not os.path.isdir(pasta):
+            return subpastas
+        
+        with os.scandir(pasta) as anos:
+            for ano in anos:
+                if not (ano.is_dir() and len(ano.name) == 4 and ano.name.isdigit()):
+                    continue
+                with os.scandir(ano.path) as meses:
+                    subpastas.extend(
+                        mes.path for mes in meses
+                        if mes.is_dir() and len(mes.name) == 2 and mes.name.isdigit()
+                    )
+        
+        return sorted(subpastas)
+    
+    @staticmethod
+    def _ler_numeracao(pasta: str) -> Optional[int]:
+        """Lê o último número registrado no arquivo de numeração da pasta."""
+        try:
+            with open(os.path.join(pasta, PedidoService.ARQUIVO_NUMERACAO), 'r', encoding='utf-8') as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+    
+    @staticmethod
+    def registrar_numeracao(pasta: str, numero: int) -> None:
+        """
+        Grava o último número usado no arquivo de numeração da pasta.
+        
+        A gravação é atômica (arquivo temporário + substituição), para que
+        uma queda no meio não deixe o contador vazio. O contador nunca
+        volta para um número menor que o já registrado.
+        
+        Args:
+            pasta: Pasta de destino (raiz)
+            numero: Último número utilizado
+        """
+        if numero <= (PedidoService._ler_numeracao(pasta) or 0):
+            return
+        caminho = os.path.join(pasta, PedidoService.ARQUIVO_NUMERACAO)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(str(numero))
+        os.replace(temporario, caminho)
+    
+    @staticmethod
+    def obter_proximo_numero(pasta: str, layout: str = LAYOUT_PLANO) -> str:
+        """
+        Encontra o próximo número de Pedido baseado nos arquivos existentes.
+        
+        A numeração é global e vale para os dois layouts: o último número
+        fica registrado em um arquivo de numeração na raiz, e apenas a pasta
+        onde a Pedido será gravada é listada (a raiz ou a subpasta do mês
+        atual). A raiz e as subpastas ano/mês só são percorridas por inteiro
+        se o arquivo de numeração ainda não existir, de modo que trocar de
+        layout não reaproveita números já usados no outro.
+        
+        Args:
+            pasta: Caminho da pasta para verificar
+            layout: LAYOUT_PLANO ou LAYOUT_ANO_MES
+            
+        Returns:
+            Próximo número no formato 0001, 0002, etc.
+        """
+        ultimo = PedidoService._ler_numeracao(pasta)
+        if ultimo is None:
+            numeros = PedidoService._numeros_na_pasta(pasta)
+            for subpasta in PedidoService.listar_subpastas_ano_mes(pasta):
+                numeros.extend(PedidoService._numeros_na_pasta(subpasta))
+        else:
+            # Confere a pasta de gravação caso outra estação tenha gravado sem o contador
+            numeros = [ultimo] + PedidoService._numeros_na_pasta(
+                PedidoService.obter_pasta_pedido(pasta, layout)
+            )
+        
         # Se não encontrou nenhum número, começa com 0001
         if not numeros:
             return "0001"
@@ -46,11 +173,35 @@ class PedidoService:
         proximo = max(numeros) + 1
         return f"{proximo:04d}"
     
+    @staticmethod
+    def _reservar_arquivo(caminho: str) -> bool:
+        """
+        Cria o arquivo vazio de forma exclusiva, reservando o número.
+        
+        Outro processo (ex.: a API local) pode ter escolhido o mesmo número;
+        só um deles consegue criar o arquivo. Um número já usado no outro
+        formato (.xlsx/.pedido) também conta como ocupado.
+        
+        Returns:
+            True se o arquivo foi reservado, False se o número já está em uso
+        """
+        try:
+            os.close(os.open(caminho, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+        if os.path.exists(ArmazenamentoService.nome_alternativo(caminho)):
+            os.remove(caminho)
+            return False
+        return True
+    
     @staticmethod
     def criar_Pedido(
         setor: str,
         pasta_destino: str,
-        arquivo_padrao: str
+        arquivo_padrao: str,
+        layout: str = LAYOUT_PLANO,
+        armazenamento: str = ArmazenamentoService.COMPLETO,
+        itens: Optional[List[tuple]] = None
     ) -> Tuple[bool, str, Optional[str]]:
         """
         Cria uma nova Pedido copiando e preenchendo a planilha padrão.
@@ -59,6 +210,9 @@ class PedidoService:
             setor: Nome do setor
             pasta_destino: Pasta onde salvar a Pedido
             arquivo_padrao: Caminho da planilha padrão
+            layout: LAYOUT_PLANO ou LAYOUT_ANO_MES (subpastas por ano/mês)
+            armazenamento: ArmazenamentoService.COMPLETO (.xlsx) ou COMPACTO (.pedido)
+            itens: Itens solicitados como (descricao, unidade, quantidade)
             
         Returns:
             Tupla (sucesso, mensagem, caminho_arquivo)
@@ -74,23 +228,11 @@ class PedidoService:
             if not os.path.exists(arquivo_padrao):
                 return False, f"Arquivo padrão não encontrado: {arquivo_padrao}", None
             
-            # Obter próximo número
-            numero_Pedido = PedidoService.obter_proximo_numero(pasta_destino)
-            
-            # Carregar arquivo padrão
-            wb = load_workbook(arquivo_padrao)
-            ws = wb.active
-            
-            # Preencher dados
-            ws['C4'] = setor.strip()  # Setor
-            ws['H4'] = numero_Pedido  # Número da Pedido
-            ws['B6'] = datetime.now().strftime('%d/%m/%Y')  # Data atual
-            
-            # Salvar arquivo
-            nome_arquivo = f"{numero_Pedido}.xlsx"
-            caminho_completo = os.path.join(pasta_destino, nome_arquivo)
-            wb.save(caminho_completo)
+            numero_Pedido, caminho_completo = PedidoService._gerar_arquivo(
+                setor, pasta_destino, arquivo_padrao, layout, armazenamento, itens
+            )
             
+            nome_arquivo = os.path.basename(caminho_completo)
             mensagem = (
                 f"Pedido criada com sucesso!\n\n"
                 f"Número: {numero_Pedido}\n"
@@ -103,6 +245,87 @@ class PedidoService:
         except Exception as e:
             return False, f"Erro ao criar Pedido: {str(e)}", None
     
+    @staticmethod
+    def _gerar_arquivo(
+        setor: str,
+        pasta_destino: str,
+        arquivo_padrao: str,
+        layout: str,
+        armazenamento: str = ArmazenamentoService.COMPLETO,
+        itens: Optional[List[tuple]] = None
+    ) -> Tuple[str, str]:
+        """
+        Preenche a planilha padrão e grava a nova Pedido na pasta de destino.
+        
+        As células preenchidas vêm do plano da planilha padrão (marcadores
+        ou nomes definidos), montado uma vez e reaproveitado. No modo
+        compacto a planilha não é carregada: grava-se apenas o registro com
+        as células preenchidas e a referência à planilha padrão.
+        
+        Returns:
+            Tupla (numero, caminho_arquivo)
+        """
+        plano = PlanoService.obter_plano(arquivo_padrao)
+        agora = datetime.now()
+        celulas_itens = PlanoService.celulas_itens(arquivo_padrao, itens) if itens else {}
+        
+        compacto = armazenamento == ArmazenamentoService.COMPACTO
+        if compacto:
+            modelo = ArmazenamentoService.guardar_modelo(pasta_destino, arquivo_padrao)
+            wb = None
+        else:
+            # Carregar arquivo padrão
+            wb = load_workbook(arquivo_padrao)
+        
+        try:
+            # Numeração e gravação sob lock da pasta para evitar números repetidos
+            with PedidoService._obter_lock_pasta(pasta_destino):
+                pasta_arquivo = PedidoService.obter_pasta_pedido(pasta_destino, layout, agora)
+                os.makedirs(pasta_arquivo, exist_ok=True)
+                extensao = ArmazenamentoService.EXTENSAO_DELTA if compacto else '.xlsx'
+                
+                # Obter próximo número e reservá-lo; se outro processo chegou
+                # antes, segue para o número seguinte
+                numero = int(PedidoService.obter_proximo_numero(pasta_destino, layout))
+                while True:
+                    numero_Pedido = f"{numero:04d}"
+                    caminho_completo = os.path.join(pasta_arquivo, f"{numero_Pedido}{extensao}")
+                    if PedidoService._reservar_arquivo(caminho_completo):
+                        break
+                    numero += 1
+                
+                try:
+                    celulas = PlanoService.aplicar(plano, {
+                        'setor': setor.strip(),
+                        'numero': numero_Pedido,
+                        'data': agora
+                    })
+                    celulas.update(celulas_itens)
+                    
+                    # Salvar arquivo (temporário + substituição: o arquivo
+                    # reservado nunca fica com conteúdo pela metade)
+                    if compacto:
+                        ArmazenamentoService.gravar_delta(caminho_completo, modelo, celulas)
+                    else:
+                        ws = wb.active
+                        for referencia, valor in celulas.items():
+                            ws[referencia] = valor
+                        temporario = f"{caminho_completo}.tmp"
+                        wb.save(temporario)
+                        os.replace(temporario, caminho_completo)
+                except BaseException:
+                    for sobra in (caminho_completo, f"{caminho_completo}.tmp"):
+                        if os.path.exists(sobra):
+                            os.remove(sobra)
+                    raise
+                
+                PedidoService.registrar_numeracao(pasta_destino, numero)
+        finally:
+            if wb is not None:
+                wb.close()
+        
+        return numero_Pedido, caminho_completo
+    
     @staticmethod
     def validar_planilha_padrao(arquivo: str) -> Tuple[bool, str]:
         """
@@ -121,15 +344,16 @@ class PedidoService:
             return False, "Arquivo deve ser do tipo Excel (.xlsx ou .xls)"
         
         try:
-            wb = load_workbook(arquivo)
-            ws = wb.active
+            # read_only: basta abrir a estrutura, sem carregar todas as células
+            wb = load_workbook(arquivo, read_only=True)
+            possui_aba = wb.active is not None
+            wb.close()
             
-            # Verificar se possui as células necessárias
-            # Não é necessário que estejam preenchidas, apenas que existam
-            if ws is None:
+            if not possui_aba:
                 return False, "Planilha não possui uma aba ativa"
             
-            return True, "Planilha válida"
+            # Verificar onde setor, número, data e itens serão preenchidos
+            return PlanoService.validar(arquivo)
             
         except Exception as e:
             return False, f"Erro ao validar planilha: {str(e)}"
@@ -0,0 +1,60 @@
+"""
+Trava exclusiva entre processos.
+O aplicativo e a API local (`main.py --api`) rodam em processos separados e
+gravam os mesmos arquivos de configuração; locks de thread não bastam.
+"""
+
+import os
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+class TravaArquivo:
+    """
+    Trava um arquivo auxiliar `<caminho>.lock` enquanto o bloco executa.
+
+    Uso:
+        with TravaArquivo(caminho):
+            ...  # ler, alterar e gravar o arquivo
+    """
+
+    def __init__(self, caminho: str):
+        """
+        Args:
+            caminho: Arquivo protegido (a trava usa o mesmo nome com .lock)
+        """
+        self.caminho = f"{caminho}.lock"
+        self._arquivo = None
+
+    def __enter__(self) -> 'TravaArquivo':
+        self._arquivo = open(self.caminho, 'a+b')
+        try:
+            if os.name == 'nt':
+                self._arquivo.seek(0)
+                while True:
+                    # LK_LOCK desiste após ~10 s; continua tentando até conseguir
+                    try:
+                        msvcrt.locking(self._arquivo.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+            else:
+                fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            self._arquivo.close()
+            raise
+        return self
+
+    def __exit__(self, *exc) -> None:
+        try:
+            if os.name == 'nt':
+                self._arquivo.seek(0)
+                msvcrt.locking(self._arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._arquivo.close()
+            self._arquivo = None
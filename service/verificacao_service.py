@@ -0,0 +1,190 @@
+"""
+Serviço de verificação de integridade dos arquivos de Pedido.
+Confere a estrutura ZIP dos .xlsx (diretório central, CRC de cada membro
+e presença da planilha) sem carregar o openpyxl, lendo os arquivos por
+mapeamento de memória e em paralelo.
+"""
+
+import os
+import re
+import mmap
+import zlib
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from .config_service import ConfigService
+from .requisicao_service import PedidoService
+from .armazenamento_service import ArmazenamentoService
+
+
+class _LeitorMmap:
+    """Adapta um mmap à interface de arquivo esperada pelo zipfile."""
+
+    def __init__(self, mm: mmap.mmap):
+        self.read = mm.read
+        self.seek = mm.seek
+        self.tell = mm.tell
+
+    def seekable(self) -> bool:
+        return True
+
+
+class VerificacaoService:
+    """Verifica arquivos de Pedido truncados ou corrompidos."""
+
+    # Membros sem os quais o Excel não abre a Pedido
+    MEMBROS_OBRIGATORIOS = ('[Content_Types].xml', 'xl/workbook.xml')
+    PREFIXO_PLANILHAS = 'xl/worksheets/sheet'
+
+    # Assinatura do registro "End of Central Directory" do ZIP
+    _ASSINATURA_EOCD = b'PK\x05\x06'
+    # EOCD (22 bytes) + comentário máximo (65535 bytes)
+    _TAMANHO_MAXIMO_EOCD = 22 + 65535
+
+    @staticmethod
+    def verificar_arquivo(caminho: str) -> Tuple[bool, str]:
+        """
+        Verifica a integridade de um arquivo .xlsx.
+
+        O arquivo é mapeado em memória; o diretório central é localizado pelo
+        final do arquivo (um arquivo truncado perde esse registro) e cada
+        membro é descompactado em blocos para conferir o CRC, sem montar o
+        XML na memória.
+
+        Args:
+            caminho: Caminho do arquivo
+
+        Returns:
+            Tupla (válido, motivo)
+        """
+        if ArmazenamentoService.eh_delta(caminho):
+            return VerificacaoService._verificar_delta(caminho)
+
+        try:
+            with open(caminho, 'rb') as f:
+                tamanho = os.fstat(f.fileno()).st_size
+                if tamanho == 0:
+                    return False, "Arquivo vazio"
+
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    inicio_busca = max(0, tamanho - VerificacaoService._TAMANHO_MAXIMO_EOCD)
+                    if mm.rfind(VerificacaoService._ASSINATURA_EOCD, inicio_busca) < 0:
+                        return False, "Arquivo truncado (diretório central ausente)"
+
+                    with zipfile.ZipFile(_LeitorMmap(mm)) as zf:
+                        nomes = set(zf.namelist())
+
+                        for membro in VerificacaoService.MEMBROS_OBRIGATORIOS:
+                            if membro not in nomes:
+                                return False, f"Membro ausente: {membro}"
+                        if not any(n.startswith(VerificacaoService.PREFIXO_PLANILHAS) for n in nomes):
+                            return False, "Nenhuma planilha encontrada"
+
+                        for info in zf.infolist():
+                            # ZipExtFile confere o CRC ao terminar a leitura
+                            with zf.open(info) as membro:
+                                while membro.read(1024 * 1024):
+                                    pass
+
+        except zipfile.BadZipFile as e:
+            return False, f"ZIP inválido: {str(e)}"
+        except (zlib.error, EOFError) as e:
+            return False, f"Conteúdo corrompido: {str(e)}"
+        except (OSError, ValueError) as e:
+            return False, f"Erro ao ler arquivo: {str(e)}"
+
+        return True, "OK"
+
+    @staticmethod
+    def _verificar_delta(caminho: str) -> Tuple[bool, str]:
+        """Verifica um registro do modo compacto e a planilha padrão referenciada."""
+        try:
+            dados = ArmazenamentoService.ler_delta(caminho)
+            ArmazenamentoService.localizar_modelo(caminho, dados['modelo'])
+        except (ValueError, FileNotFoundError) as e:
+            return False, str(e)
+        return True, "OK"
+
+    @staticmethod
+    def listar_arquivos_pedido(pasta: str) -> List[str]:
+        """
+        Lista os arquivos de Pedido (.xlsx ou .pedido com número de 4 dígitos)
+        da pasta, incluindo as subpastas AAAA/MM do layout por ano/mês.
+
+        Args:
+            pasta: Pasta de destino
+
+        Returns:
+            Caminhos completos dos arquivos
+        """
+        padrao = re.compile(r'\d{4}')
+        extensoes = ('.xlsx', ArmazenamentoService.EXTENSAO_DELTA)
+        arquivos = []
+        for diretorio in [pasta] + PedidoService.listar_subpastas_ano_mes(pasta):
+            with os.scandir(diretorio) as it:
+                arquivos.extend(
+                    e.path for e in it
+                    if e.name.lower().endswith(extensoes) and padrao.search(e.name) and e.is_file()
+                )
+        return arquivos
+
+    @staticmethod
+    def verificar_pasta(
+        pasta: str,
+        config_service: Optional[ConfigService] = None,
+        max_workers: Optional[int] = None
+    ) -> dict:
+        """
+        Verifica todas as Pedido de uma pasta e compara com o histórico.
+
+        A descompactação (zlib) libera o GIL, então um pool de threads usa
+        vários núcleos sem o custo de iniciar processos.
+
+        Args:
+            pasta: Pasta de destino a verificar
+            config_service: Se informado, cruza os arquivos com o histórico completo
+            max_workers: Número de threads (padrão: núcleos da máquina)
+
+        Returns:
+            Dicionário com:
+                total: quantidade de arquivos verificados
+                corrompidos: lista de (arquivo, motivo)
+                ausentes: arquivos do histórico que não existem mais no disco
+                fora_historico: arquivos no disco que não constam no histórico
+        """
+        arquivos = VerificacaoService.listar_arquivos_pedido(pasta)
+        workers = max_workers or min(32, (os.cpu_count() or 1) * 2)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            resultados = executor.map(VerificacaoService.verificar_arquivo, arquivos)
+            corrompidos = [
+                (arquivo, motivo)
+                for arquivo, (valido, motivo) in zip(arquivos, resultados)
+                if not valido
+            ]
+
+        relatorio = {
+            'total': len(arquivos),
+            'corrompidos': sorted(corrompidos),
+            'ausentes': [],
+            'fora_historico': []
+        }
+
+        if config_service is not None:
+            normalizar = lambda p: os.path.normcase(os.path.abspath(p))
+            # Sem extensão: a Pedido pode ter sido compactada ou restaurada
+            # depois de registrada (0001.xlsx <-> 0001.pedido)
+            sem_extensao = lambda p: os.path.splitext(normalizar(p))[0]
+            pasta_normalizada = normalizar(pasta)
+            no_disco = {sem_extensao(a): a for a in arquivos}
+
+            no_historico = {}
+            for arquivo, pasta_historico, _, _ in config_service.iterar_historico_completo():
+                if normalizar(pasta_historico) == pasta_normalizada:
+                    no_historico[sem_extensao(arquivo)] = normalizar(arquivo)
+
+            relatorio['ausentes'] = sorted(no_historico[a] for a in no_historico.keys() - no_disco.keys())
+            relatorio['fora_historico'] = sorted(no_disco[a] for a in no_disco.keys() - no_historico.keys())
+
+        return relatorio
@@ -0,0 +1,94 @@
+"""
+Serviço de visualização rápida de Pedido.
+Lê as primeiras linhas da aba ativa em modo read_only (streaming), sem abrir
+o Excel, e mantém em memória as últimas Pedido visualizadas.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from itertools import islice
+from typing import List, Optional
+from openpyxl import load_workbook
+
+from .armazenamento_service import ArmazenamentoService
+
+
+class VisualizacaoService:
+    """Leitura das primeiras linhas de uma Pedido para pré-visualização."""
+
+    LINHAS_PADRAO = 60
+
+    # Pedido visualizadas recentemente: (caminho, mtime_ns, tamanho, linhas) -> tabela
+    LIMITE_CACHE = 8
+    _cache: "OrderedDict[tuple, List[List[str]]]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _formatar(valor) -> str:
+        """Converte o valor de uma célula para exibição."""
+        if valor is None:
+            return ''
+        if isinstance(valor, datetime):
+            return valor.strftime('%d/%m/%Y')
+        if isinstance(valor, float):
+            return f"{valor:g}"
+        return str(valor)
+
+    @staticmethod
+    def ler_linhas(caminho: str, cache_dir: str, linhas: int = LINHAS_PADRAO) -> List[List[str]]:
+        """
+        Lê as primeiras linhas da aba ativa de uma Pedido.
+
+        Pedido compactas são materializadas pelo cache do ArmazenamentoService.
+        Colunas vazias à direita são descartadas.
+
+        Args:
+            caminho: Arquivo da Pedido (.xlsx ou .pedido)
+            cache_dir: Pasta do cache de Pedido materializadas
+            linhas: Quantidade máxima de linhas
+
+        Returns:
+            Linhas com os valores já formatados como texto
+        """
+        info = os.stat(caminho)
+        chave = (os.path.abspath(caminho), info.st_mtime_ns, info.st_size, linhas)
+        with VisualizacaoService._lock:
+            tabela = VisualizacaoService._cache.get(chave)
+            if tabela is not None:
+                VisualizacaoService._cache.move_to_end(chave)
+                return tabela
+
+        arquivo = caminho
+        if ArmazenamentoService.eh_delta(caminho):
+            arquivo = ArmazenamentoService.materializar(caminho, cache_dir)
+
+        wb = load_workbook(arquivo, read_only=True, data_only=True)
+        try:
+            tabela = [
+                [VisualizacaoService._formatar(v) for v in linha]
+                for linha in islice(wb.active.iter_rows(values_only=True), linhas)
+            ]
+        finally:
+            wb.close()
+
+        largura = max((i + 1 for linha in tabela for i, v in enumerate(linha) if v), default=0)
+        tabela = [linha[:largura] + [''] * (largura - len(linha)) for linha in tabela]
+
+        with VisualizacaoService._lock:
+            VisualizacaoService._cache[chave] = tabela
+            while len(VisualizacaoService._cache) > VisualizacaoService.LIMITE_CACHE:
+                VisualizacaoService._cache.popitem(last=False)
+        return tabela
+
+    @staticmethod
+    def obter_em_cache(caminho: str, linhas: int = LINHAS_PADRAO) -> Optional[List[List[str]]]:
+        """Retorna a tabela já lida, se a Pedido não mudou desde então."""
+        try:
+            info = os.stat(caminho)
+        except OSError:
+            return None
+        chave = (os.path.abspath(caminho), info.st_mtime_ns, info.st_size, linhas)
+        with VisualizacaoService._lock:
+            return VisualizacaoService._cache.get(chave)